@@ -4,4 +4,75 @@ from dotenv import load_dotenv
 load_dotenv()
 
 SYNERGY_API_KEY = os.getenv("SYNERGY_API_KEY")
-BASE_URL = "https://api.sportradar.com/synergy/basketball"
\ No newline at end of file
+BASE_URL = "https://api.sportradar.com/synergy/basketball"
+
+# HTTP connection pool for SynergyClient (one keep-alive pool per client).
+SYNERGY_POOL_SIZE = int(os.getenv("SYNERGY_POOL_SIZE", "16"))
+SYNERGY_CONNECT_RETRIES = int(os.getenv("SYNERGY_CONNECT_RETRIES", "3"))
+
+# Proactive Synergy rate limits in requests/sec per endpoint family
+# (see src/ingestion/rate_limit.py). Override with e.g. SYNERGY_RATE_LIMIT_EVENTS=8.
+_SYNERGY_RATE_DEFAULT = float(os.getenv("SYNERGY_RATE_LIMIT", "5"))
+SYNERGY_RATE_LIMITS = {
+    family: float(os.getenv(f"SYNERGY_RATE_LIMIT_{family.upper()}", _SYNERGY_RATE_DEFAULT))
+    for family in ("teams", "games", "events", "video", "default")
+}
+
+# On-disk Synergy response cache (src/ingestion/http_cache.py).
+# TTLs are seconds per endpoint family; events of finished games never expire.
+SYNERGY_CACHE_BYPASS = os.getenv("SYNERGY_CACHE_BYPASS", "0") == "1"
+SYNERGY_CACHE_MAX_MB = int(os.getenv("SYNERGY_CACHE_MAX_MB", "512"))
+SYNERGY_CACHE_TTLS = {
+    "seasons": 7 * 24 * 3600,
+    "teams": 24 * 3600,
+    "games": 6 * 3600,
+    "events": 3600,
+    "video": 24 * 3600,
+    "default": 3600,
+}
+
+# Query-embedding cache (src/processing/embedding_cache.py): in-process LRU
+# size and the on-disk row cap (least recently used rows are evicted).
+EMBEDDING_CACHE_BYPASS = os.getenv("EMBEDDING_CACHE_BYPASS", "0") == "1"
+EMBEDDING_CACHE_MEMORY_ENTRIES = int(os.getenv("EMBEDDING_CACHE_MEMORY_ENTRIES", "2048"))
+EMBEDDING_CACHE_MAX_ROWS = int(os.getenv("EMBEDDING_CACHE_MAX_ROWS", "100000"))
+
+# Text embedding model used to index plays and embed search queries.
+TEXT_EMBEDDING_MODEL = os.getenv("TEXT_EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+
+# generate_embeddings streaming: plays per encode/upsert batch and how many
+# encoded batches may wait for the Chroma writer.
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "256"))
+EMBED_QUEUE_DEPTH = int(os.getenv("EMBED_QUEUE_DEPTH", "2"))
+
+# CPU encode pool (src/processing/encode_pool.py): worker processes, each
+# holding one model copy, and torch intra-op threads per worker
+# (0 = cores / workers).
+EMBED_WORKERS = int(os.getenv("EMBED_WORKERS", "1"))
+EMBED_TORCH_THREADS = int(os.getenv("EMBED_TORCH_THREADS", "0"))
+
+# Inference backend for TEXT_EMBEDDING_MODEL (src/processing/text_backends.py):
+# torch | torch-int8 | onnx | onnx-int8. Compare them with
+# scripts/bench_text_backends.py before switching; a new backend re-embeds
+# every play on the next generate_embeddings run.
+TEXT_EMBEDDING_BACKEND = os.getenv("TEXT_EMBEDDING_BACKEND", "torch")
+# Quantized ONNX file inside the model repo used by the onnx-int8 backend.
+TEXT_EMBEDDING_ONNX_INT8_FILE = os.getenv("TEXT_EMBEDDING_ONNX_INT8_FILE", "onnx/model_qint8_avx512_vnni.onnx")
+
+# Vector store backend (src/search/vector_store.py): "chroma" (PersistentClient
+# collections) or "matrix" (in-process memory-mapped matrix + optional HNSW).
+VECTOR_STORE_BACKEND = os.getenv("VECTOR_STORE_BACKEND", "chroma")
+# matrix backend storage: float32, float16 (1/2 the size) or int8 with a
+# per-vector scale (~1/4); fixed when a store is created. Exact search over
+# int8 runs at about float32 speed; float16 is slower (numpy's half-to-float
+# conversion), so prefer int8 or the HNSW index for large float16 stores.
+VECTOR_STORE_DTYPE = os.getenv("VECTOR_STORE_DTYPE", "float32")
+# matrix backend: use the HNSW graph (needs hnswlib) from this many vectors
+# on; filters matching at most VECTOR_STORE_EXACT_MAX rows are searched exactly.
+VECTOR_STORE_HNSW_MIN = int(os.getenv("VECTOR_STORE_HNSW_MIN", "200000"))
+VECTOR_STORE_EXACT_MAX = int(os.getenv("VECTOR_STORE_EXACT_MAX", "50000"))
+VECTOR_STORE_HNSW_EF = int(os.getenv("VECTOR_STORE_HNSW_EF", "128"))
+# Ingestion writers (vector_store.CollectionWriter) buffer this many records
+# per collection and upsert them in one call (one transaction, one batched
+# embedding-function call) instead of one add() per record.
+VECTOR_WRITE_BATCH_SIZE = int(os.getenv("VECTOR_WRITE_BATCH_SIZE", "500"))
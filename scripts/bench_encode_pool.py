@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""Benchmark: CPU embedding throughput vs EncodePool worker count.
+
+Encodes N synthetic play documents with TEXT_EMBEDDING_MODEL through
+src/processing/encode_pool.EncodePool for each worker count (torch threads
+per worker = cores / workers unless --torch-threads is given), checks that
+every run returns the same vectors in the same order as the in-process run,
+and reports plays/sec plus the speedup over one worker. Model loading is
+excluded from the timing.
+
+Usage:
+    python scripts/bench_encode_pool.py --plays 20000 --workers 1 2 4 8 16 32
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from config.settings import EMBED_BATCH_SIZE, TEXT_EMBEDDING_MODEL  # noqa: E402
+from src.processing.encode_pool import EncodePool  # noqa: E402
+
+ACTIONS = ("Made 3pt Jump Shot", "Missed Layup", "Turnover: Bad Pass", "Offensive Rebound", "Made Dunk (PnR)")
+
+
+def synthetic_documents(n: int) -> list[str]:
+    return [f"{ACTIONS[i % len(ACTIONS)]} by Player {i % 400} [Tags: tag{i % 23}]" for i in range(n)]
+
+
+def run(documents: list[str], workers: int, torch_threads: int, batch_size: int):
+    with EncodePool(TEXT_EMBEDDING_MODEL, workers=workers, torch_threads=torch_threads, batch_size=batch_size) as pool:
+        # Warm-up: workers load the model in their initializer
+        pool.encode(documents[: batch_size * pool.workers])
+        start = time.perf_counter()
+        embeddings = pool.encode(documents)
+        elapsed = time.perf_counter() - start
+    return embeddings, elapsed
+
+
+def main() -> int:
+    import numpy as np
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--plays", type=int, default=20_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--torch-threads", type=int, default=0)
+    parser.add_argument("--batch-size", type=int, default=EMBED_BATCH_SIZE)
+    args = parser.parse_args()
+
+    documents = synthetic_documents(args.plays)
+    print(f"{TEXT_EMBEDDING_MODEL}: {args.plays} plays, {os.cpu_count()} cores, batch size {args.batch_size}")
+
+    baseline_rate = None
+    reference = None
+    for workers in args.workers:
+        embeddings, elapsed = run(documents, workers, args.torch_threads, args.batch_size)
+        if reference is None:
+            reference = embeddings
+        same = embeddings.shape == reference.shape and np.allclose(embeddings, reference, atol=1e-5)
+        rate = args.plays / elapsed
+        baseline_rate = baseline_rate or rate
+        print(
+            f"workers={workers:<3} {rate:10,.0f} plays/s  ({elapsed:.2f}s)  "
+            f"speedup {rate / baseline_rate:5.2f}x  order/values match: {same}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
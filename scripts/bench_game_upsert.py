@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""Microbenchmark: games upsert, per-row INSERT OR REPLACE vs batched ON CONFLICT.
+
+Builds a scratch SQLite DB holding half of N synthetic games (some with a
+linked video_path), then upserts all N games with:
+- legacy: one INSERT OR REPLACE ... COALESCE((SELECT video_path ...)) per row
+- bulk:   pipeline.write_game_rows (executemany INSERT ... ON CONFLICT DO UPDATE)
+Both run in a single transaction. Reports rows/sec and checks that video_path
+survives.
+
+Usage:
+    python scripts/bench_game_upsert.py --games 50000
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.ingestion.db import connect_db, ensure_schema  # noqa: E402
+from src.ingestion.pipeline import write_game_rows  # noqa: E402
+
+LEGACY_SQL = """
+    INSERT OR REPLACE INTO games
+    (game_id, season_id, date, home_team, away_team, home_score, away_score, status, video_path)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, COALESCE((SELECT video_path FROM games WHERE game_id = ?), ?))
+"""
+
+
+def synthetic_rows(n: int, score_offset: int = 0) -> list[tuple]:
+    return [
+        (
+            f"game-{i:07d}",
+            "season-1",
+            f"2025-{1 + i % 12:02d}-{1 + i % 28:02d}",
+            f"Team{i % 360}",
+            f"Team{(i * 7 + 1) % 360}",
+            60 + (i + score_offset) % 40,
+            55 + (i + score_offset) % 45,
+            "GameOver",
+        )
+        for i in range(n)
+    ]
+
+
+def fresh_db(path: str, n: int) -> sqlite3.Connection:
+    if os.path.exists(path):
+        os.remove(path)
+    conn = connect_db(path)
+    ensure_schema(conn)
+    seed = synthetic_rows(n // 2)
+    conn.executemany(
+        "INSERT INTO games VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        [row + (f"/videos/{row[0]}.mp4" if i % 10 == 0 else None,) for i, row in enumerate(seed)],
+    )
+    conn.commit()
+    return conn
+
+
+def legacy_upsert(conn: sqlite3.Connection, rows: list[tuple]) -> None:
+    cur = conn.cursor()
+    for row in rows:
+        cur.execute(LEGACY_SQL, row + (row[0], None))
+    conn.commit()
+
+
+def bulk_upsert(conn: sqlite3.Connection, rows: list[tuple]) -> None:
+    write_game_rows(conn, rows)
+    conn.commit()
+
+
+def timed(label: str, fn, path: str, n: int, rows: list[tuple]) -> float:
+    conn = fresh_db(path, n)
+    start = time.perf_counter()
+    fn(conn, rows)
+    elapsed = time.perf_counter() - start
+
+    linked = conn.execute("SELECT COUNT(*) FROM games WHERE video_path IS NOT NULL").fetchone()[0]
+    total = conn.execute("SELECT COUNT(*) FROM games").fetchone()[0]
+    conn.close()
+
+    rate = n / elapsed
+    print(f"{label:<8} {rate:12,.0f} rows/s  ({elapsed:.2f}s, {total} games, {linked} video links kept)")
+    return rate
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--games", type=int, default=50_000)
+    args = parser.parse_args()
+
+    rows = synthetic_rows(args.games, score_offset=3)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench_games.db")
+        legacy = timed("legacy", legacy_upsert, path, args.games, rows)
+        bulk = timed("bulk", bulk_upsert, path, args.games, rows)
+
+    print(f"speedup  {bulk / legacy:12.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
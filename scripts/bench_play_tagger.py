@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""Benchmark: play tagging throughput, per play vs batched.
+
+Generates N synthetic Synergy-style descriptions ("Made 3pt Jump Shot (Pick
+and Roll Ball Handler) by Player 7") with random game clocks and tags them
+with:
+- tag_play():        one call per play, as the row loops used to
+- tag_plays_batch(): one regex pass per --chunk plays (apply_tags and the
+                     enricher use this)
+
+Reports plays/sec for each and checks that both produce the same tags.
+
+Usage:
+    python scripts/bench_play_tagger.py --plays 1000000
+    python scripts/bench_play_tagger.py --plays 1000000 --chunk 100000
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.processing.play_tagger import tag_play, tag_plays_batch, tags_from_mask  # noqa: E402
+
+ACTIONS = (
+    "Made 3pt Jump Shot", "Missed 3pt Jump Shot", "Made Layup", "Missed Layup", "Made Dunk", "Made Jumper",
+    "Missed Jump Shot", "Turnover: Bad Pass", "Turnover: Lost Ball (Steal)", "Offensive Rebound",
+    "Defensive Rebound", "Shooting Foul", "Free Throw", "Made Three Pointer",
+)
+CONTEXT = (
+    "", "", " (Pick and Roll Ball Handler)", " off Screen", " - Isolation", " Post Up", " on Fast Break",
+    " in Transition", " after Cut", " Drive Left", " (Handoff)", " Spot Up",
+)
+
+
+def synthetic_plays(n: int, seed: int = 1) -> tuple[list[str], list[int]]:
+    rng = random.Random(seed)
+    descriptions = [f"{rng.choice(ACTIONS)}{rng.choice(CONTEXT)} by Player {rng.randint(1, 15)}" for _ in range(n)]
+    clocks = [rng.randint(0, 1200) for _ in range(n)]
+    return descriptions, clocks
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--plays", type=int, default=1_000_000)
+    parser.add_argument("--chunk", type=int, default=10_000, help="plays per tag_plays_batch call")
+    args = parser.parse_args()
+
+    descriptions, clocks = synthetic_plays(args.plays)
+    print(f"{args.plays:,} synthetic plays")
+
+    started = time.perf_counter()
+    single = [tag_play(description, clock) for description, clock in zip(descriptions, clocks, strict=True)]
+    single_s = time.perf_counter() - started
+    print(f"tag_play        {args.plays / single_s:12,.0f} plays/s  ({single_s:.2f}s)")
+
+    started = time.perf_counter()
+    masks = []
+    for start in range(0, args.plays, args.chunk):
+        masks.extend(tag_plays_batch(descriptions[start : start + args.chunk], clocks[start : start + args.chunk]))
+    batch_s = time.perf_counter() - started
+    print(f"tag_plays_batch {args.plays / batch_s:12,.0f} plays/s  ({batch_s:.2f}s, x{single_s / batch_s:.2f})")
+
+    mismatches = sum(tags != tags_from_mask(mask) for tags, mask in zip(single, masks, strict=True))
+    if mismatches:
+        print(f"❌ {mismatches} plays tagged differently by tag_play and tag_plays_batch")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
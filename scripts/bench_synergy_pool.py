@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""Benchmark SynergyClient with and without connection pooling.
+
+Starts a local stand-in Synergy server (HTTP/1.1 keep-alive, canned JSON) and
+reports requests/sec for:
+- one-shot requests (`requests.get` per call, i.e. the old behaviour)
+- the client's pooled keep-alive session
+
+Usage:
+    python scripts/bench_synergy_pool.py --requests 500 --latency-ms 2
+
+Note: the stand-in server speaks plain HTTP, so this measures TCP setup only.
+Against the real API each new connection also pays a TLS handshake, so the
+gap is larger in production.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import requests
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.ingestion.rate_limit import ENDPOINT_FAMILIES, RateLimiter  # noqa: E402
+from src.ingestion.synergy_client import SynergyClient  # noqa: E402
+
+PAYLOAD = json.dumps(
+    {"data": [{"data": {"id": f"game-{i}", "status": "GameOver"}} for i in range(20)]}
+).encode("utf-8")
+
+
+def make_handler(latency_s: float):
+    class StandInSynergyHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def do_GET(self):  # noqa: N802 (http.server API)
+            if latency_s:
+                time.sleep(latency_s)
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(PAYLOAD)))
+            self.end_headers()
+            self.wfile.write(PAYLOAD)
+
+        def log_message(self, *args):
+            pass
+
+    return StandInSynergyHandler
+
+
+class OneShotSession:
+    """Session stand-in that opens a fresh connection per request (no pooling)."""
+
+    def get(self, *args, **kwargs):
+        return requests.get(*args, **kwargs)
+
+    def close(self) -> None:
+        pass
+
+
+def run(client: SynergyClient, n: int) -> float:
+    start = time.perf_counter()
+    # _get logs every request; keep the benchmark output readable.
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i in range(n):
+            client.get_games("ncaamb", "bench-season", limit=20, skip=i)
+    return n / (time.perf_counter() - start)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Simulated server latency")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(args.latency_ms / 1000.0))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    try:
+        # Cache and rate limiter off: measure transport only.
+        common = {"api_key": "bench", "base_url": base_url, "use_cache": False,
+                  "rate_limiter": RateLimiter({f: 1e9 for f in ENDPOINT_FAMILIES})}
+        unpooled = SynergyClient(session=OneShotSession(), **common)
+        pooled = SynergyClient(**common)
+
+        # Warm up both paths once so imports/DNS don't skew the first run.
+        run(unpooled, 5)
+        run(pooled, 5)
+
+        rps_unpooled = run(unpooled, args.requests)
+        rps_pooled = run(pooled, args.requests)
+        pooled.close()
+    finally:
+        server.shutdown()
+
+    print(f"requests:          {args.requests}")
+    print(f"without pooling:   {rps_unpooled:8.1f} req/s")
+    print(f"with pooling:      {rps_pooled:8.1f} req/s")
+    print(f"speedup:           {rps_pooled / rps_unpooled:8.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
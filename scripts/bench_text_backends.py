@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""Benchmark + accuracy check for the text embedding backends.
+
+Samples N play documents ("{description} [Tags: {tags}]", exactly what
+generate_embeddings embeds) from skout.db, or synthetic ones when the DB has
+no plays, and encodes them with every backend in
+src/processing/text_backends.TEXT_BACKENDS. Reports per backend:
+- throughput in plays/sec (model load and warm-up excluded)
+- cosine agreement with the fp32 torch vectors (mean / min / 1st percentile)
+- neighbor overlap: share of each query's top-10 neighbors within the sample
+  that match the torch top-10, for the first --queries documents
+
+Exits 1 when a backend's 1st-percentile cosine is below --min-cosine, so it
+can gate a TEXT_EMBEDDING_BACKEND change.
+
+Usage:
+    python scripts/bench_text_backends.py --plays 5000
+    python scripts/bench_text_backends.py --backends torch onnx-int8 --db data/skout.db
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from config.settings import EMBED_BATCH_SIZE, TEXT_EMBEDDING_MODEL  # noqa: E402
+from src.ingestion.db import connect_db, db_path  # noqa: E402
+from src.processing.text_backends import (  # noqa: E402
+    TEXT_BACKENDS,
+    cosine_agreement,
+    load_text_model,
+)
+
+ACTIONS = ("Made 3pt Jump Shot", "Missed Layup", "Turnover: Bad Pass", "Offensive Rebound", "Made Dunk (PnR)")
+
+
+def sample_documents(path: str, n: int) -> list[str]:
+    if os.path.exists(path):
+        conn = connect_db(path)
+        try:
+            rows = conn.execute(
+                "SELECT description, tags FROM plays WHERE description IS NOT NULL ORDER BY random() LIMIT ?",
+                (n,),
+            ).fetchall()
+        finally:
+            conn.close()
+        if rows:
+            return [f"{desc} [Tags: {tags}]" for desc, tags in rows]
+    print("⚠️  No plays found; using synthetic play documents.")
+    return [f"{ACTIONS[i % len(ACTIONS)]} by Player {i % 400} [Tags: tag{i % 23}]" for i in range(n)]
+
+
+def neighbor_overlap(reference, candidate, queries: int, k: int = 10) -> float:
+    import numpy as np
+
+    def top_k(vectors):
+        vectors = vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+        scores = vectors[:queries] @ vectors.T
+        np.fill_diagonal(scores[:, :queries], -np.inf)
+        return np.argpartition(-scores, k, axis=1)[:, :k]
+
+    ref, cand = top_k(reference), top_k(candidate)
+    return float(np.mean([len(set(a) & set(b)) / k for a, b in zip(ref, cand, strict=True)]))
+
+
+def encode(backend: str, documents: list[str], batch_size: int):
+    started = time.perf_counter()
+    model = load_text_model(TEXT_EMBEDDING_MODEL, backend, device="cpu")
+    load_s = time.perf_counter() - started
+    model.encode(documents[:batch_size], batch_size=batch_size, convert_to_numpy=True)
+    started = time.perf_counter()
+    vectors = model.encode(documents, batch_size=batch_size, convert_to_numpy=True)
+    return vectors, time.perf_counter() - started, load_s
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--plays", type=int, default=5000)
+    parser.add_argument("--backends", nargs="+", choices=TEXT_BACKENDS, default=list(TEXT_BACKENDS))
+    parser.add_argument("--batch-size", type=int, default=EMBED_BATCH_SIZE)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--min-cosine", type=float, default=0.99, help="required 1st-percentile cosine vs torch")
+    parser.add_argument("--db", default=db_path())
+    args = parser.parse_args()
+
+    documents = sample_documents(args.db, args.plays)
+    print(f"{TEXT_EMBEDDING_MODEL}: {len(documents)} plays, {os.cpu_count()} cores, batch size {args.batch_size}")
+
+    reference, ref_elapsed, _ = encode("torch", documents, args.batch_size)
+    queries = min(args.queries, len(documents) - 11)
+    failed = []
+    for backend in args.backends:
+        if backend == "torch":
+            vectors, elapsed, load_s = reference, ref_elapsed, 0.0
+        else:
+            vectors, elapsed, load_s = encode(backend, documents, args.batch_size)
+        agreement = cosine_agreement(reference, vectors)
+        overlap = neighbor_overlap(reference, vectors, queries) if queries > 0 else float("nan")
+        rate = len(documents) / elapsed
+        print(
+            f"{backend:<11} {rate:9,.0f} plays/s  x{ref_elapsed / elapsed:4.2f} vs torch  "
+            f"cosine mean {agreement['mean']:.5f} min {agreement['min']:.5f} p01 {agreement['p01']:.5f}  "
+            f"top10 overlap {overlap:.3f}  (load {load_s:.1f}s)"
+        )
+        if agreement["p01"] < args.min_cosine:
+            failed.append(backend)
+
+    if failed:
+        print(f"❌ Below --min-cosine {args.min_cosine}: {', '.join(failed)}")
+        return 1
+    print("✅ All backends agree with torch fp32.")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""Benchmark: query latency of the vector store backends at scale.
+
+For each corpus size, builds scratch stores of synthetic play embeddings
+(clustered unit vectors, DIM dims, play-like metadata: season, team,
+period, clock and tag_<tag> flags) and times single-query searches:
+- matrix-exact: MatrixStore with exact batched dot-product search
+- matrix-hnsw:  MatrixStore with its HNSW graph (needs hnswlib)
+- chroma:       chromadb PersistentClient collection
+
+Each backend answers the same queries unfiltered and with a season + tag
+filter. Reports p50 / p99 latency in ms, build time and recall@10 against
+the exact results (HNSW and Chroma are approximate).
+
+Usage:
+    python scripts/bench_vector_store.py --plays 1000000 5000000 20000000 --backends matrix-exact matrix-hnsw
+    python scripts/bench_vector_store.py --plays 100000 --dtype int8 --keep /data/bench_stores
+
+The matrix stores need plays x dim x 4 bytes (float32) of disk, ~30 GB at
+20M x 384 (half for float16, a quarter for int8); Chroma needs several
+times that. HNSW graphs (hnswlib and Chroma's) are held in RAM.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.processing.play_tagger import TAG_VOCAB  # noqa: E402
+from src.processing.tag_index import tag_metadata  # noqa: E402
+from src.search.vector_store import VECTOR_DTYPES, MatrixStore, open_collection  # noqa: E402
+
+BACKENDS = ("matrix-exact", "matrix-hnsw", "chroma")
+DIM = 384
+CLUSTERS = 256
+BATCH = 5000
+FILTER = {"$and": [{"season_id": "season-2"}, {"tag_made": True}]}
+
+
+def synthetic_batch(rng, centers, start: int, n: int):
+    import numpy as np
+
+    labels = rng.integers(0, len(centers), n)
+    vectors = centers[labels] + 0.35 * rng.standard_normal((n, centers.shape[1])).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    metadatas = []
+    for i in range(start, start + n):
+        tags = [tag for j, tag in enumerate(TAG_VOCAB) if (i * 2654435761 >> j) % 5 == 0]
+        metadatas.append(
+            {
+                "game_id": f"game-{i // 300}",
+                "season_id": f"season-{i % 4}",
+                "team_id": f"team-{i % 360}",
+                "period": 1 + i % 2,
+                "clock_seconds": i % 1200,
+                **tag_metadata(tags),
+            }
+        )
+    return [f"play-{i}" for i in range(start, start + n)], vectors, metadatas
+
+
+def fill(collection, plays: int, seed: int) -> float:
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((CLUSTERS, DIM)).astype(np.float32)
+    started = time.perf_counter()
+    for start in range(0, plays, BATCH):
+        ids, vectors, metadatas = synthetic_batch(rng, centers, start, min(BATCH, plays - start))
+        collection.upsert(ids=ids, embeddings=vectors, metadatas=metadatas)
+    return time.perf_counter() - started
+
+
+def queries(n: int, seed: int):
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((CLUSTERS, DIM)).astype(np.float32)
+    return synthetic_batch(np.random.default_rng(seed + 1), centers, 0, n)[1]
+
+
+def timed_queries(collection, query_vectors, where) -> tuple[list[float], list[list[str]]]:
+    latencies, results = [], []
+    for vector in query_vectors:
+        started = time.perf_counter()
+        hits = collection.query(query_embeddings=[vector.tolist()], n_results=10, where=where, include=["distances"])
+        latencies.append((time.perf_counter() - started) * 1000)
+        results.append(hits["ids"][0])
+    return latencies, results
+
+
+def percentile(values: list[float], p: float) -> float:
+    import numpy as np
+
+    return float(np.percentile(values, p))
+
+
+def recall(results, exact) -> float:
+    return sum(len(set(a) & set(b)) for a, b in zip(results, exact, strict=True)) / max(1, sum(len(b) for b in exact))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--plays", type=int, nargs="+", default=[1_000_000])
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=list(BACKENDS))
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--dtype", choices=VECTOR_DTYPES, default="float32")
+    parser.add_argument("--keep", help="directory for the stores (default: a temp dir, removed afterwards)")
+    args = parser.parse_args()
+
+    root = args.keep or tempfile.mkdtemp(prefix="bench_vector_store_")
+    query_vectors = queries(args.queries, seed=7)
+    print(f"dim {DIM}, {args.queries} queries, top-10, filter {FILTER}")
+    try:
+        for plays in args.plays:
+            exact: dict[str, list] = {}
+            for backend in args.backends:
+                path = os.path.join(root, f"{backend}-{plays}")
+                if backend == "chroma":
+                    collection = open_collection("bench", path, backend="chroma")
+                else:
+                    collection = MatrixStore(
+                        path,
+                        dtype=args.dtype,
+                        hnsw_min=0 if backend == "matrix-hnsw" else sys.maxsize,
+                        exact_max=0 if backend == "matrix-hnsw" else sys.maxsize,
+                    )
+                if collection.count() < plays:
+                    build_s = fill(collection, plays, seed=plays)
+                    if backend == "matrix-hnsw":
+                        started = time.perf_counter()
+                        collection.build_index()
+                        build_s += time.perf_counter() - started
+                    elif isinstance(collection, MatrixStore):
+                        collection.persist(build_index=False)
+                else:
+                    build_s = float("nan")
+
+                for label, where in (("unfiltered", None), ("filtered", FILTER)):
+                    timed_queries(collection, query_vectors[:5], where)  # warm-up
+                    latencies, results = timed_queries(collection, query_vectors, where)
+                    if backend == "matrix-exact":
+                        exact[label] = results
+                    recall_at_10 = recall(results, exact[label]) if label in exact else float("nan")
+                    print(
+                        f"{plays:>11,} {backend:<13} {label:<10} p50 {percentile(latencies, 50):8.2f} ms  "
+                        f"p99 {percentile(latencies, 99):8.2f} ms  recall@10 {recall_at_10:.3f}  build {build_s:.0f}s"
+                    )
+    finally:
+        if not args.keep:
+            shutil.rmtree(root, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
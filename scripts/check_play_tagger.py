@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""Golden test for the play tagger.
+
+scripts/fixtures/play_tagger_golden.jsonl holds [description, clock, tags]
+cases recorded from the tagger before it was compiled into one regex:
+realistic Synergy descriptions, keyword fragments glued together without
+spaces, keywords overlapping each other ("handoffoul", "isoffensive",
+"postealayupick"), substrings inside other words ("execute", "compost",
+"dismissed"), mixed case, non-ASCII, newlines, NUL characters (the batch
+separator), empty / missing descriptions and boundary clocks. Both
+tag_play() and tag_plays_batch() must reproduce every case exactly; exits 1
+otherwise.
+
+Usage:
+    python scripts/check_play_tagger.py
+    python scripts/check_play_tagger.py --update   # only after an intended rule change
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.processing import play_tagger  # noqa: E402
+
+GOLDEN = Path(__file__).resolve().parent / "fixtures" / "play_tagger_golden.jsonl"
+
+FRAGMENTS = (
+    # Synergy-style descriptions
+    "Made 3pt Jump Shot", "Missed 3pt Jump Shot", "Made 3-pt jumper", "Missed Layup", "Made Layup (Driving)",
+    "Made Dunk", "Missed Dunk", "Jump Shot", "Pull-up Jumper", "Three pointer", "Turnover: Bad Pass",
+    "Turnover: Lost Ball (Steal by #12)", "Steal", "Offensive Rebound", "Defensive Rebound", "Rebound",
+    "Shooting Foul", "Offensive Foul", "Personal foul", "Fast Break", "Transition", "Pick and Roll Ball Handler",
+    "Ball Screen", "Off Screen", "Isolation", "Post Up", "Hand Off", "Handoff", "DHO", "Cut", "Drive Left",
+    "Spot Up", "Free Throw", "Jump Ball", "Timeout",
+    # bare keywords and near-misses
+    "iso", "pick", "post", "drive", "cut", "three", "dunk", "layup", "jumper", "made", "missed", "turnover",
+    "steal", "rebound", "offensive", "foul", "screen", "dho", "3pt", "3-pt", "fast break", "jump shot",
+    "execute", "compost", "picked", "threes", "madeline", "unmade", "dismissed", "steals", "offensively",
+    "fouled", "screening", "drives", "layups", "jump  shot", "fastbreak", "3 pt", "3_pt", "rebounding",
+    # keywords overlapping each other
+    "isoffensive", "handoffoul", "dhoffensive", "posteal", "layupost", "jumperebound", "missedho", "turnoverebound",
+    "stealayup", "foulayup", "3ptransition", "cuturnover", "postealayupick", "madrive", "screenisolation",
+    # non-ASCII and odd input
+    "İSOLATION", "Straße", "MADE ✔", "ﬁrst", "Ⅲ", "jümper", "",
+)
+# tag_plays_batch joins descriptions with NUL: one inside a description must
+# neither shift the plays after it nor join the words around it
+NUL_CASES = (
+    "Made Layup\x00Missed Dunk", "jump\x00shot", "fast\x00break", "pi\x00ck and roll", "\x00",
+    "\x00\x00Turnover: Lost Ball (Steal)\x00", "3pt\x00", "MADE\x00 3PT JUMPER",
+)
+SEPARATORS = (" ", "", ", ", " - ", "\n", ": ")
+CLOCKS = (None, None, None, -1, 0, 1, 2, 2.5, 3, 5, 5.0, 6, 30, 600)
+
+
+def cases(n: int, seed: int = 25) -> list[tuple[str | None, float | None]]:
+    rng = random.Random(seed)
+    out: list[tuple[str | None, float | None]] = [(None, None), ("", 1), (None, 2)]
+    out += [(text, None) for text in NUL_CASES]
+    out += [(fragment, rng.choice(CLOCKS)) for fragment in FRAGMENTS]
+    while len(out) < n:
+        parts = rng.sample(FRAGMENTS, rng.randint(1, 4))
+        text = rng.choice(SEPARATORS).join(parts)
+        text = rng.choice((str, str.upper, str.lower, str.title))(text)
+        out.append((text, rng.choice(CLOCKS)))
+    return out
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--update", action="store_true", help="re-record the fixture from the current tagger")
+    parser.add_argument("--cases", type=int, default=3000, help="cases to record with --update")
+    args = parser.parse_args()
+
+    if args.update:
+        GOLDEN.parent.mkdir(parents=True, exist_ok=True)
+        with open(GOLDEN, "w", encoding="utf-8") as f:
+            for description, clock in cases(args.cases):
+                f.write(json.dumps([description, clock, play_tagger.tag_play(description, clock)], ensure_ascii=False) + "\n")
+        print(f"📝 Recorded {args.cases} cases to {GOLDEN}")
+        return 0
+
+    with open(GOLDEN, encoding="utf-8") as f:
+        golden = [json.loads(line) for line in f]
+    descriptions = [case[0] for case in golden]
+    clocks = [case[1] for case in golden]
+    batch = [play_tagger.tags_from_mask(mask) for mask in play_tagger.tag_plays_batch(descriptions, clocks)]
+
+    failures = 0
+    for (description, clock, expected), batch_tags in zip(golden, batch, strict=True):
+        single = play_tagger.tag_play(description, clock)
+        if single != expected or batch_tags != expected:
+            failures += 1
+            if failures <= 10:
+                print(f"❌ {description!r} @ {clock}: expected {expected}, tag_play {single}, batch {batch_tags}")
+
+    if failures:
+        print(f"❌ {failures}/{len(golden)} cases differ from the golden tags.")
+        return 1
+    print(f"✅ {len(golden)} golden cases match (tag_play and tag_plays_batch).")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
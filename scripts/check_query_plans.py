@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""Fail if any hot skout.db query plans a full table scan.
+
+Runs EXPLAIN QUERY PLAN for the queries the pipeline, dashboard and search
+paths issue on every request/game and exits non-zero if a plan contains a
+SCAN step (i.e. no index serves it). By default the check runs against a
+scratch database built with ensure_schema(), so it validates the schema
+migrations; pass --db to check an existing database (opened read-only).
+
+Usage:
+    python scripts/check_query_plans.py
+    python scripts/check_query_plans.py --db data/skout.db
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import re
+import sqlite3
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.ingestion.db import connect_db, ensure_schema, schema_version  # noqa: E402
+
+# label -> SQL. Keep in sync with the queries in src/ when adding hot paths.
+HOT_QUERIES = {
+    "game by id (search hits)": "SELECT video_path, home_team, away_team FROM games WHERE game_id = ?",
+    "games in season (pipeline)": "SELECT game_id FROM games WHERE season_id = ?",
+    "games with video (get_linked_games)": (
+        "SELECT game_id, home_team, away_team FROM games WHERE video_path IS NOT NULL"
+    ),
+    "games for team": "SELECT game_id FROM games WHERE home_team = ? OR away_team = ?",
+    "plays for game in order": (
+        "SELECT play_id, description FROM plays WHERE game_id = ? ORDER BY period, clock_seconds"
+    ),
+    "plays for team": "SELECT play_id FROM plays WHERE team_id = ?",
+    "plays joined to season games": (
+        "SELECT p.play_id, g.home_team, g.away_team FROM plays p "
+        "JOIN games g ON g.game_id = p.game_id WHERE g.season_id = ?"
+    ),
+    "plays with all tags (tag_index)": (
+        "SELECT play_id FROM play_tags WHERE tag = ? AND (tag_mask & ?) = ? AND (tag_mask & ?) = 0"
+    ),
+    "tags of a play": "SELECT tag FROM play_tags WHERE play_id = ?",
+    "keyword search (plays_fts bm25)": (
+        "SELECT p.play_id FROM (SELECT plays_fts.rowid AS play_rowid, bm25(plays_fts) AS r "
+        "FROM plays_fts WHERE plays_fts MATCH ? ORDER BY r LIMIT ?) AS ranked "
+        "JOIN plays p ON p.rowid = ranked.play_rowid"
+    ),
+    "games to fetch (ingest_state)": (
+        "SELECT game_id, payload_hash FROM ingest_state WHERE season_id = ? AND status != ?"
+    ),
+}
+
+
+def plan(conn: sqlite3.Connection, sql: str) -> list[str]:
+    params = (None,) * sql.count("?")
+    return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+
+
+def full_scans(steps: list[str]) -> list[str]:
+    # FTS5 reports MATCH lookups as "SCAN <t> VIRTUAL TABLE INDEX n:M...";
+    # scans of a materialized (LIMITed) subquery don't touch a table either
+    materialized = {step.split()[1] for step in steps if step.startswith("MATERIALIZE ")}
+    return [
+        step
+        for step in steps
+        if step.startswith("SCAN ")
+        and not re.search(r"VIRTUAL TABLE INDEX \d+:\S*M", step)
+        and step.split()[1] not in materialized
+    ]
+
+
+def check(conn: sqlite3.Connection) -> int:
+    failures = 0
+    for label, sql in HOT_QUERIES.items():
+        steps = plan(conn, sql)
+        scans = full_scans(steps)
+        status = "FAIL" if scans else "OK"
+        print(f"[{status}] {label}")
+        for step in steps:
+            print(f"       {step}")
+        failures += bool(scans)
+    return failures
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--db", help="Existing database to check (default: scratch DB from ensure_schema)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.db:
+            conn = sqlite3.connect(f"file:{os.path.abspath(args.db)}?mode=ro", uri=True)
+        else:
+            conn = connect_db(os.path.join(tmp, "plans.db"))
+            ensure_schema(conn)
+        print(f"schema version {schema_version(conn)}")
+        failures = check(conn)
+        conn.close()
+
+    if failures:
+        print(f"\n{failures} hot quer{'y' if failures == 1 else 'ies'} fall back to a full scan")
+        return 1
+    print("\nAll hot queries use an index.")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""Recall check for compressed MatrixStore dtypes (float16, int8).
+
+Loads N play embeddings from the skout_plays collection (whatever
+VECTOR_STORE_BACKEND holds), or synthetic clustered 384-dim vectors when
+there is none, writes them into scratch MatrixStores of each dtype and
+runs the same exact top-10 queries against each. Reports per dtype:
+- matrix size (vectors + int8 scales) and bytes per vector
+- recall@10 against the float32 results
+- mean / max absolute distance error of the returned neighbors
+- p50 query latency
+
+Queries are held-out embeddings (not stored), so every result is a real
+neighbor search. Exits 1 when a dtype's recall@10 is below --min-recall,
+so it can gate a VECTOR_STORE_DTYPE change.
+
+Usage:
+    python scripts/check_vector_compression.py --plays 200000
+    python scripts/check_vector_compression.py --dtypes float16 int8 --min-recall 0.97
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.search.hybrid import PLAYS_COLLECTION, VECTOR_DB_PATH  # noqa: E402
+from src.search.vector_store import VECTOR_DTYPES, MatrixStore, open_collection  # noqa: E402
+
+BATCH = 5000
+
+
+def load_vectors(n: int):
+    import numpy as np
+
+    try:
+        collection = open_collection(PLAYS_COLLECTION, VECTOR_DB_PATH, create=False)
+        chunks = []
+        for offset in range(0, n, BATCH):
+            page = collection.get(limit=min(BATCH, n - offset), offset=offset, include=["embeddings"])
+            if not len(page["ids"]):
+                break
+            chunks.append(np.asarray(page["embeddings"], dtype=np.float32))
+        if chunks:
+            return np.concatenate(chunks), PLAYS_COLLECTION
+    except Exception as e:
+        print(f"⚠️  Could not read {PLAYS_COLLECTION}: {e}")
+
+    print("⚠️  No play embeddings found; using synthetic clustered vectors.")
+    rng = np.random.default_rng(0)
+    centers = rng.standard_normal((256, 384)).astype(np.float32)
+    vectors = centers[rng.integers(0, 256, n)] + 0.35 * rng.standard_normal((n, 384)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True), "synthetic"
+
+
+def build(path: str, dtype: str, vectors) -> MatrixStore:
+    store = MatrixStore(path, dtype=dtype, hnsw_min=sys.maxsize)
+    for start in range(0, len(vectors), BATCH):
+        stop = min(start + BATCH, len(vectors))
+        store.upsert(ids=[str(i) for i in range(start, stop)], embeddings=vectors[start:stop])
+    store.persist(build_index=False)
+    return store
+
+
+def vector_bytes(dtype: str, dim: int) -> int:
+    """Bytes per stored vector (the .npy files also hold spare capacity)."""
+    import numpy as np
+
+    return np.dtype(dtype).itemsize * dim + (4 if dtype == "int8" else 0)
+
+
+def search(store: MatrixStore, queries) -> tuple[list[list[str]], list[list[float]], list[float]]:
+    ids, distances, latencies = [], [], []
+    for query in queries:
+        started = time.perf_counter()
+        hits = store.query(query_embeddings=[query], n_results=10, include=["distances"])
+        latencies.append((time.perf_counter() - started) * 1000)
+        ids.append(hits["ids"][0])
+        distances.append(hits["distances"][0])
+    return ids, distances, latencies
+
+
+def main() -> int:
+    import numpy as np
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--plays", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--dtypes", nargs="+", choices=VECTOR_DTYPES, default=list(VECTOR_DTYPES))
+    parser.add_argument("--min-recall", type=float, default=0.95, help="required recall@10 vs float32")
+    args = parser.parse_args()
+
+    vectors, source = load_vectors(args.plays + args.queries)
+    queries, vectors = vectors[: args.queries], vectors[args.queries :]
+    print(f"{source}: {len(vectors):,} vectors x {vectors.shape[1]} dims, {len(queries)} held-out queries, top-10")
+
+    root = tempfile.mkdtemp(prefix="check_vector_compression_")
+    failed = []
+    try:
+        reference_store = build(os.path.join(root, "float32"), "float32", vectors)
+        reference_ids, reference_distances, _ = search(reference_store, queries)
+        reference_bytes = vector_bytes("float32", vectors.shape[1])
+        for dtype in args.dtypes:
+            store = reference_store if dtype == "float32" else build(os.path.join(root, dtype), dtype, vectors)
+            ids, distances, latencies = search(store, queries)
+            recall = np.mean([len(set(a) & set(b)) / 10 for a, b in zip(ids, reference_ids, strict=True)])
+            errors = np.abs(np.array(distances) - np.array(reference_distances))
+            size = vector_bytes(dtype, vectors.shape[1])
+            print(
+                f"{dtype:<8} {size * len(vectors) / 2**20:9,.1f} MB  {size:5d} B/vector  x{reference_bytes / size:4.2f}  "
+                f"recall@10 {recall:.4f}  distance error mean {errors.mean():.5f} max {errors.max():.5f}  "
+                f"p50 {np.percentile(latencies, 50):.2f} ms"
+            )
+            if recall < args.min_recall:
+                failed.append(dtype)
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    if failed:
+        print(f"❌ Below --min-recall {args.min_recall}: {', '.join(failed)}")
+        return 1
+    print("✅ All dtypes keep recall@10 within bounds.")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -68,14 +68,22 @@ st.caption("Scan your Synergy key to see exactly what data you can access, then
 
 # Import here to keep Streamlit page load snappy
 from src.ingestion.capabilities import discover_capabilities  # noqa: E402
+from src.ingestion.synergy_client import SynergyClient  # noqa: E402
 
 api_key_for_scan = cloud_key or local_key
 
+@st.cache_resource(show_spinner=False)
+def _synergy_client(api_key: str) -> SynergyClient:
+    # One pooled keep-alive client per key, shared by the scan and the pipeline.
+    return SynergyClient(api_key=api_key)
+
 @st.cache_data(ttl=60 * 15, show_spinner=False)
 def _cached_capabilities(api_key: str):
     # Avoid caching on full key string in clear: Streamlit cache is server-side, but we still
     # want to keep the object small. The api_key must still be used for requests.
-    return discover_capabilities(api_key=api_key, league_code="ncaamb")
+    return discover_capabilities(
+        api_key=api_key, league_code="ncaamb", client=_synergy_client(api_key)
+    )
 
 scan_col1, scan_col2 = st.columns([1, 3])
 with scan_col1:
@@ -224,7 +232,12 @@ if report:
                 )
 
                 try:
-                    result = run_pipeline(plan=plan, api_key=api_key_for_scan, progress_cb=_cb)
+                    result = run_pipeline(
+                        plan=plan,
+                        api_key=api_key_for_scan,
+                        progress_cb=_cb,
+                        client=_synergy_client(api_key_for_scan),
+                    )
                     status.update(label="Pipeline complete", state="complete")
                     prog.progress(100)
                     st.success(
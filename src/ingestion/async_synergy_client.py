@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, TypeVar
+
+from config.settings import SYNERGY_POOL_SIZE
+from src.ingestion.http_cache import MISS
+from src.ingestion.synergy_client import SynergyClient
+
+T = TypeVar("T")
+
+DEFAULT_CONCURRENCY = 8
+
+
+def _unwrap_page(payload: Any) -> list[dict]:
+    if isinstance(payload, dict):
+        items = payload.get("data", [])
+    elif isinstance(payload, list):
+        items = payload
+    else:
+        return []
+    out: list[dict] = []
+    for item in items:
+        if isinstance(item, dict):
+            out.append(item.get("data", item))
+    return out
+
+
+class AsyncSynergyClient:
+    """Asyncio front-end for the Synergy API with a global in-flight cap.
+
+    Requests run on the wrapped SynergyClient's pooled session from a private
+    thread pool of `concurrency` workers, so no more than `concurrency` calls
+    are ever in flight no matter how many tasks await this client. Retry and
+    status handling are shared with the synchronous client, which stays the
+    entry point for the CLI scripts.
+
+    Usage:
+        async with AsyncSynergyClient(api_key, concurrency=16) as api:
+            async for game_id, payload in api.gather_game_events("ncaamb", ids):
+                ...
+    """
+
+    def __init__(
+        self,
+        api_key: str | None = None,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        client: SynergyClient | None = None,
+    ):
+        if concurrency < 1:
+            raise ValueError("concurrency must be >= 1")
+
+        self.concurrency = concurrency
+        self._owns_client = client is None
+        self.client = client or SynergyClient(
+            api_key=api_key, pool_size=max(concurrency, SYNERGY_POOL_SIZE)
+        )
+        self._executor = ThreadPoolExecutor(
+            max_workers=concurrency, thread_name_prefix="synergy"
+        )
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+        if self._owns_client:
+            self.client.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self.close()
+
+    async def _get(self, endpoint: str, params: dict | None = None, immutable: bool = False) -> Any:
+        cached = self.client._cache_get(endpoint, params)
+        if cached is not MISS:
+            return cached
+
+        # Wait for a rate-limit token on the loop so idle waiting doesn't
+        # occupy one of the `concurrency` request slots.
+        await self.client.rate_limiter.acquire_async(endpoint)
+        loop = asyncio.get_running_loop()
+        payload = await loop.run_in_executor(
+            self._executor, partial(self.client._fetch, endpoint, params, reserved=True)
+        )
+        self.client._cache_put(endpoint, params, payload, immutable=immutable)
+        return payload
+
+    # --------------------------------------------------
+    # ENDPOINTS (same surface as SynergyClient)
+    # --------------------------------------------------
+    async def get_seasons(self, league_code="ncaamb"):
+        return await self._get(f"/{league_code}/seasons")
+
+    async def get_teams(self, league_code, season_id, limit=500, skip: int | None = None):
+        params = {"seasonId": season_id, "take": limit}
+        if skip is not None:
+            params["skip"] = skip
+        return await self._get(f"/{league_code}/teams", params=params)
+
+    async def get_games(self, league_code, season_id, team_id=None, limit=20, skip: int | None = None):
+        params = {"seasonId": season_id, "take": limit}
+        if skip is not None:
+            params["skip"] = skip
+        if team_id:
+            params["teamId"] = team_id
+        return await self._get(f"/{league_code}/games", params=params)
+
+    async def get_game_events(self, league_code, game_id, final: bool = False):
+        return await self._get(f"/{league_code}/games/{game_id}/events", immutable=final)
+
+    async def get_play_video(self, league_code, play_id):
+        return await self._get(f"/{league_code}/plays/{play_id}/video")
+
+    # --------------------------------------------------
+    # PAGINATED ITERATORS
+    # --------------------------------------------------
+    async def iter_teams(self, league_code, season_id, take=500, max_pages=20) -> AsyncIterator[dict]:
+        skip = 0
+        for _ in range(max_pages):
+            page = _unwrap_page(await self.get_teams(league_code, season_id, limit=take, skip=skip))
+            for team in page:
+                yield team
+            if len(page) < take:
+                break
+            skip += take
+
+    async def iter_games(
+        self,
+        league_code,
+        season_id,
+        team_id=None,
+        take=100,
+        max_pages=50,
+    ) -> AsyncIterator[dict]:
+        skip = 0
+        for _ in range(max_pages):
+            payload = await self.get_games(
+                league_code, season_id, team_id=team_id, limit=take, skip=skip
+            )
+            page = _unwrap_page(payload)
+            for game in page:
+                yield game
+            if len(page) < take:
+                break
+            skip += take
+
+    # --------------------------------------------------
+    # FAN-OUT
+    # --------------------------------------------------
+    async def imap(
+        self,
+        fn: Callable[[T], Awaitable[Any]],
+        items: Iterable[T],
+    ) -> AsyncIterator[tuple[T, Any]]:
+        """Yield (item, result) as calls complete, in completion order.
+
+        At most 2 * concurrency calls are scheduled at once, so huge inputs
+        don't pile up thousands of pending tasks.
+        """
+
+        window = 2 * self.concurrency
+        pending: dict[asyncio.Task, T] = {}
+        it = iter(items)
+
+        def _fill():
+            for item in it:
+                pending[asyncio.ensure_future(fn(item))] = item
+                if len(pending) >= window:
+                    break
+
+        _fill()
+        try:
+            while pending:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    item = pending.pop(task)
+                    yield item, task.result()
+                _fill()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def gather_game_events(
+        self, league_code: str, game_ids: Iterable[str], final: bool = False
+    ) -> AsyncIterator[tuple[str, Any]]:
+        """Yield (game_id, payload) for each game as its events arrive."""
+
+        async for game_id, payload in self.imap(
+            partial(self.get_game_events, league_code, final=final), game_ids
+        ):
+            yield game_id, payload
@@ -3,19 +3,257 @@ from __future__ import annotations
 import os
 import sqlite3
 
+# Applied to every connection from connect_db():
+# - WAL lets the dashboard read while the pipeline writes.
+# - synchronous=NORMAL is durable under WAL (no fsync per commit, only at
+#   checkpoints), which is what bulk ingestion wants.
+# - negative cache_size is KiB (64 MB page cache); mmap for read-heavy queries.
+PRAGMAS = (
+    ("journal_mode", "WAL"),
+    ("synchronous", "NORMAL"),
+    ("cache_size", -64000),
+    ("mmap_size", 256 * 1024 * 1024),
+    ("temp_store", "MEMORY"),
+)
+
+BUSY_TIMEOUT_S = 30.0
+
+PLAYS_INDEXES = (
+    # plays for a game in game order; also serves plays JOIN games
+    "CREATE INDEX IF NOT EXISTS idx_plays_game_clock ON plays(game_id, period, clock_seconds)",
+    "CREATE INDEX IF NOT EXISTS idx_plays_team ON plays(team_id)",
+)
+
+# Keep plays_fts (external content, keyed on plays.rowid) in sync with plays.
+PLAYS_FTS_TRIGGERS = (
+    """
+    CREATE TRIGGER IF NOT EXISTS plays_fts_ins AFTER INSERT ON plays BEGIN
+        INSERT INTO plays_fts (rowid, description, tags)
+        VALUES (new.rowid, new.description, new.tags);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS plays_fts_del AFTER DELETE ON plays BEGIN
+        INSERT INTO plays_fts (plays_fts, rowid, description, tags)
+        VALUES ('delete', old.rowid, old.description, old.tags);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS plays_fts_upd AFTER UPDATE OF description, tags ON plays BEGIN
+        INSERT INTO plays_fts (plays_fts, rowid, description, tags)
+        VALUES ('delete', old.rowid, old.description, old.tags);
+        INSERT INTO plays_fts (rowid, description, tags)
+        VALUES (new.rowid, new.description, new.tags);
+    END
+    """,
+)
+
+# Schema migrations, applied in order by ensure_schema() and tracked in
+# PRAGMA user_version. Version 1 is the base tables created below; append new
+# (version, statements) entries here, never edit an entry that has shipped.
+# A statement naming a DATA_MIGRATIONS entry runs that Python function.
+MIGRATIONS: list[tuple[int, tuple[str, ...]]] = [
+    (
+        2,
+        (
+            *PLAYS_INDEXES,
+            "CREATE INDEX IF NOT EXISTS idx_games_season ON games(season_id)",
+            "CREATE INDEX IF NOT EXISTS idx_games_home_team ON games(home_team)",
+            "CREATE INDEX IF NOT EXISTS idx_games_away_team ON games(away_team)",
+            # only the (few) games with a linked video
+            "CREATE INDEX IF NOT EXISTS idx_games_video ON games(video_path) WHERE video_path IS NOT NULL",
+            "CREATE INDEX IF NOT EXISTS idx_ingest_state_season ON ingest_state(season_id, status)",
+        ),
+    ),
+    (
+        3,
+        (
+            # Inverted tag index (see src/processing/tag_index.py). Clustered
+            # on (tag, play_id) so each tag is one contiguous range; tag_mask
+            # holds all of the play's tags as bits so multi-tag filters scan
+            # only the rarest tag's range.
+            """
+            CREATE TABLE IF NOT EXISTS play_tags (
+                tag TEXT NOT NULL,
+                play_id TEXT NOT NULL,
+                tag_mask INTEGER NOT NULL,
+                PRIMARY KEY (tag, play_id)
+            ) WITHOUT ROWID
+            """,
+            "CREATE INDEX IF NOT EXISTS idx_play_tags_play ON play_tags(play_id)",
+            # Per-tag row counts, kept exact by triggers, for picking the rarest tag.
+            """
+            CREATE TABLE IF NOT EXISTS play_tag_counts (
+                tag TEXT PRIMARY KEY,
+                n INTEGER NOT NULL
+            ) WITHOUT ROWID
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS play_tags_count_ins AFTER INSERT ON play_tags BEGIN
+                INSERT INTO play_tag_counts (tag, n) VALUES (new.tag, 1)
+                ON CONFLICT(tag) DO UPDATE SET n = n + 1;
+            END
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS play_tags_count_del AFTER DELETE ON play_tags BEGIN
+                UPDATE play_tag_counts SET n = n - 1 WHERE tag = old.tag;
+            END
+            """,
+            "backfill_play_tags",
+        ),
+    ),
+    (
+        4,
+        (
+            # Full-text index over plays.description and plays.tags (see
+            # src/search/keyword.py). External content: the text lives only
+            # in plays, PLAYS_FTS_TRIGGERS keep the index in sync. Writers
+            # must upsert plays with ON CONFLICT DO UPDATE rather than
+            # INSERT OR REPLACE, whose implicit delete skips the triggers.
+            # '_' is a token character so tags such as post_up stay whole.
+            """
+            CREATE VIRTUAL TABLE IF NOT EXISTS plays_fts USING fts5(
+                description,
+                tags,
+                content='plays',
+                content_rowid='rowid',
+                tokenize="unicode61 remove_diacritics 2 tokenchars '_'"
+            )
+            """,
+            *PLAYS_FTS_TRIGGERS,
+            # Per-term document counts for BM25 idf
+            "CREATE VIRTUAL TABLE IF NOT EXISTS plays_fts_vocab USING fts5vocab(plays_fts, 'row')",
+            "INSERT INTO plays_fts (plays_fts) VALUES ('rebuild')",
+        ),
+    ),
+    (
+        5,
+        (
+            # Per-play hashes of what is in the skout_plays vector collection
+            # (see src/processing/embedding_state.py).
+            """
+            CREATE TABLE IF NOT EXISTS embedding_state (
+                play_id TEXT PRIMARY KEY,
+                content_hash TEXT NOT NULL,
+                meta_hash TEXT NOT NULL,
+                embedded_at TEXT
+            ) WITHOUT ROWID
+            """,
+        ),
+    ),
+    (
+        6,
+        (
+            # plays_fts is keyed on plays.rowid, but a TEXT-keyed rowid table
+            # may get its rowids renumbered by VACUUM, silently desyncing the
+            # index. Rebuild plays with play_rowid INTEGER PRIMARY KEY (an
+            # alias of rowid, which VACUUM keeps), copying the current rowids.
+            # play_id stays unique for the ON CONFLICT(play_id) upserts.
+            "DROP TABLE IF EXISTS plays_v6",
+            """
+            CREATE TABLE plays_v6 (
+                play_id TEXT UNIQUE,
+                game_id TEXT,
+                period INTEGER,
+                clock_seconds INTEGER,
+                clock_display TEXT,
+                description TEXT,
+                team_id TEXT,
+                x_loc INTEGER,
+                y_loc INTEGER,
+                tags TEXT,
+                play_rowid INTEGER PRIMARY KEY,
+                FOREIGN KEY(game_id) REFERENCES games(game_id)
+            )
+            """,
+            """
+            INSERT INTO plays_v6
+            (play_rowid, play_id, game_id, period, clock_seconds, clock_display,
+             description, team_id, x_loc, y_loc, tags)
+            SELECT rowid, play_id, game_id, period, clock_seconds, clock_display,
+                   description, team_id, x_loc, y_loc, tags
+            FROM plays
+            """,
+            # Also drops the old indexes and triggers on plays
+            "DROP TABLE plays",
+            "ALTER TABLE plays_v6 RENAME TO plays",
+            *PLAYS_INDEXES,
+            *PLAYS_FTS_TRIGGERS,
+            # Re-sync in case an earlier VACUUM already renumbered rows
+            "INSERT INTO plays_fts (plays_fts) VALUES ('rebuild')",
+            # keyword_search ranks with bm25() and no longer reads term counts
+            "DROP TABLE IF EXISTS plays_fts_vocab",
+        ),
+    ),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def _backfill_play_tags(conn: sqlite3.Connection) -> None:
+    from src.processing.tag_index import backfill_play_tags
+
+    backfill_play_tags(conn)
+
+
+DATA_MIGRATIONS = {
+    "backfill_play_tags": _backfill_play_tags,
+}
+
 
 def project_root() -> str:
-    return os.path.abspath(os.path.join(os.path.dirname(__file__), "../../.."))
+    # src/ingestion/db.py -> repo root is two levels up
+    return os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
+
+
+def data_dir() -> str:
+    return os.path.join(project_root(), "data")
 
 
 def db_path() -> str:
-    return os.path.join(project_root(), "data", "skout.db")
+    return os.getenv("SKOUT_DB_PATH") or os.path.join(data_dir(), "skout.db")
+
+
+def connect_db(
+    path: str | None = None,
+    timeout: float = BUSY_TIMEOUT_S,
+    check_same_thread: bool = True,
+) -> sqlite3.Connection:
+    """Open skout.db (or `path`) with the shared performance profile.
+
+    Every module should get its SQLite connections here rather than calling
+    sqlite3.connect directly, so they all agree on the file and pragmas.
+    """
+
+    path = path or db_path()
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    conn = sqlite3.connect(path, timeout=timeout, check_same_thread=check_same_thread)
+    conn.execute(f"PRAGMA busy_timeout = {int(timeout * 1000)}")
+    for name, value in PRAGMAS:
+        conn.execute(f"PRAGMA {name} = {value}")
+    return conn
+
+
+def schema_version(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
 
 
-def connect_db() -> sqlite3.Connection:
-    path = db_path()
-    os.makedirs(os.path.dirname(path), exist_ok=True)
-    return sqlite3.connect(path)
+def migrate(conn: sqlite3.Connection) -> int:
+    """Apply pending MIGRATIONS; returns the resulting schema version."""
+
+    version = schema_version(conn)
+    for target, statements in MIGRATIONS:
+        if target <= version:
+            continue
+        with conn:
+            for sql in statements:
+                if sql in DATA_MIGRATIONS:
+                    DATA_MIGRATIONS[sql](conn)
+                else:
+                    conn.execute(sql)
+            conn.execute(f"PRAGMA user_version = {target}")
+        version = target
+    return version
 
 
 def ensure_schema(conn: sqlite3.Connection) -> None:
@@ -55,4 +293,39 @@ def ensure_schema(conn: sqlite3.Connection) -> None:
         """
     )
 
+    # Per-game checkpoint for the events stage (see ingest_state.py).
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS ingest_state (
+            game_id TEXT PRIMARY KEY,
+            league_code TEXT,
+            season_id TEXT,
+            status TEXT,
+            game_hash TEXT,
+            payload_hash TEXT,
+            play_count INTEGER,
+            attempts INTEGER DEFAULT 0,
+            last_error TEXT,
+            changed_at TEXT,
+            fetched_at TEXT
+        )
+        """
+    )
+
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS pipeline_runs (
+            run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            league_code TEXT,
+            season_id TEXT,
+            started_at TEXT,
+            finished_at TEXT,
+            status TEXT,
+            inserted_games INTEGER,
+            inserted_plays INTEGER
+        )
+        """
+    )
+
     conn.commit()
+    migrate(conn)
@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any
+from urllib.parse import urlencode
+
+from config.settings import SYNERGY_CACHE_MAX_MB, SYNERGY_CACHE_TTLS
+from src.ingestion.db import connect_db, data_dir
+from src.ingestion.rate_limit import endpoint_family
+
+# Sentinel for "not in cache" (None is a legitimate cached payload).
+MISS = object()
+
+
+def cache_path() -> str:
+    return os.path.join(data_dir(), "synergy_cache.db")
+
+
+def cache_family(endpoint: str) -> str:
+    """TTL family for an endpoint: the rate-limit family, plus "seasons"."""
+    parts = [p for p in endpoint.split("/") if p]
+    if parts and parts[-1] == "seasons":
+        return "seasons"
+    return endpoint_family(endpoint)
+
+
+def cache_key(endpoint: str, params: dict | None, namespace: str = "") -> str:
+    query = urlencode(sorted((params or {}).items()))
+    return f"{namespace}|{endpoint}?{query}"
+
+
+class ResponseCache:
+    """Persistent, size-bounded (LRU) cache of Synergy GET responses.
+
+    Entries are keyed by (namespace, endpoint, params) and expire after the
+    family TTL from config.settings.SYNERGY_CACHE_TTLS. Entries stored with
+    immutable=True (events of finished games) never expire; they can still
+    be evicted when the cache exceeds `max_bytes`.
+
+    Backed by SQLite so it survives process restarts and can be shared by the
+    dashboard and CLI runs.
+    """
+
+    def __init__(
+        self,
+        path: str | None = None,
+        max_bytes: int = SYNERGY_CACHE_MAX_MB * 1024 * 1024,
+        ttls: dict[str, float] | None = None,
+    ):
+        self.path = path or cache_path()
+        self.max_bytes = max_bytes
+        self.ttls = {**SYNERGY_CACHE_TTLS, **(ttls or {})}
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._conn = connect_db(self.path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                endpoint TEXT,
+                body TEXT,
+                size INTEGER,
+                stored_at REAL,
+                expires_at REAL,
+                accessed_at REAL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses(accessed_at)")
+        self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def get(self, key: str) -> Any:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, expires_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or (row[1] is not None and row[1] < now):
+                self.misses += 1
+                return MISS
+            self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, key: str, endpoint: str, payload: Any, immutable: bool = False) -> None:
+        ttl = self.ttls.get(cache_family(endpoint), self.ttls["default"])
+        if ttl <= 0 and not immutable:
+            return
+
+        body = json.dumps(payload, separators=(",", ":"))
+        now = time.time()
+        expires_at = None if immutable else now + ttl
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT OR REPLACE INTO responses
+                (key, endpoint, body, size, stored_at, expires_at, accessed_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                (key, endpoint, body, len(body), now, expires_at, now),
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        """Drop expired rows, then least-recently-used rows down to 90% of max_bytes."""
+        self._conn.execute(
+            "DELETE FROM responses WHERE expires_at IS NOT NULL AND expires_at < ?", (time.time(),)
+        )
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        target = int(self.max_bytes * 0.9)
+        doomed = []
+        for key, size in self._conn.execute("SELECT key, size FROM responses ORDER BY accessed_at"):
+            if total <= target:
+                break
+            doomed.append((key,))
+            total -= size
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", doomed)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+        return {"hits": self.hits, "misses": self.misses, "entries": entries, "bytes": size}
+
+
+def key_namespace(api_key: str) -> str:
+    """Keys with different entitlements must not share entries; never store the raw key."""
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
@@ -1,7 +1,6 @@
 import argparse
 import os
 import sys
-import sqlite3
 from dotenv import load_dotenv
 
 # 1. Load Environment Variables
@@ -11,34 +10,19 @@ load_dotenv(ENV_PATH)
 # Add project root to path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
 
+from src.ingestion.db import connect_db, ensure_schema  # noqa: E402
+from src.ingestion.ingest_state import record_scheduled_games  # noqa: E402
+from src.ingestion.pipeline import batched, game_row, iter_games, write_game_rows  # noqa: E402
 from src.ingestion.synergy_client import SynergyClient  # noqa: E402
 
 # Defaults (only used if no discovery data is available)
 DEFAULT_SEASON_ID = "6085b5d0e6c2413bc4ba9122"  # legacy guess: 2021-2022
 
-PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../.."))
-DB_PATH = os.path.join(PROJECT_ROOT, "data", "skout.db")
-
 
 def setup_db():
-    """Ensures the games table exists."""
-    os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS games (
-            game_id TEXT PRIMARY KEY,
-            season_id TEXT,
-            date TEXT,
-            home_team TEXT,
-            away_team TEXT,
-            home_score INTEGER,
-            away_score INTEGER,
-            status TEXT,
-            video_path TEXT
-        )
-    ''')
-    conn.commit()
+    """Ensures the skout.db schema exists."""
+    conn = connect_db()
+    ensure_schema(conn)
     return conn
 
 def _unwrap_list_payload(payload):
@@ -68,15 +52,25 @@ def discover_accessible_seasons(client: SynergyClient, league_code: str = "ncaam
 
 
 def fetch_season_games(season_id: str, league_code: str = "ncaamb"):
-    """Fetches games for a season. If the API key is limited, surface what it *can* access."""
+    """Streams finished-game rows for a season, page by page.
+
+    If the API key is limited, surface what it *can* access.
+    """
     client = SynergyClient()
 
     print(f"📡 Fetching schedule for Season ID: {season_id}...")
-    games_payload = client.get_games(league_code=league_code, season_id=season_id, team_id=None, limit=100)
-
-    # If this returned None, SynergyClient already printed details.
+    seen_any = False
+    found = 0
+    for game in iter_games(client, league_code, season_id, None):
+        seen_any = True
+        row = game_row(game, season_id)
+        if row is not None:
+            found += 1
+            yield row
+
+    # If nothing came back, SynergyClient already printed details.
     # Provide a helpful next step: list accessible seasons.
-    if not games_payload:
+    if not seen_any:
         print("\nℹ️  Could not fetch games for that season with this API key.")
         print("    Attempting to discover accessible seasons...")
         seasons = discover_accessible_seasons(client, league_code=league_code)
@@ -92,54 +86,22 @@ def fetch_season_games(season_id: str, league_code: str = "ncaamb"):
                 print(f"   ... and {len(seasons) - 25} more")
         else:
             print("⚠️  No seasons discovered. This key may not have access to /seasons either.")
-        return []
+        return
 
-    games = []
-    for game in _unwrap_list_payload(games_payload):
-        if not isinstance(game, dict):
-            continue
-
-        status = game.get("status")
-        if status not in ["GameOver", "Final", "Closed"]:
-            continue
-
-        home_team = game.get("homeTeam", {}).get("name", "Unknown")
-        away_team = game.get("awayTeam", {}).get("name", "Unknown")
-
-        games.append(
-            (
-                game.get("id"),
-                season_id,
-                game.get("date"),
-                home_team,
-                away_team,
-                game.get("homeScore", 0),
-                game.get("awayScore", 0),
-                status,
-                None,
-            )
-        )
-
-    print(f"✅ Found {len(games)} valid games (sampled page).")
-    print("ℹ️  Note: this script currently fetches a first page/sample of games.")
-    print("    We'll upgrade it to full pagination + team-scoped crawling as part of the new pipeline UI.")
-    return games
-
-def save_schedule(games):
+    print(f"✅ Found {found} valid games.")
+
+def save_schedule(games, batch_size: int = 200, league_code: str = "ncaamb"):
+    """Writes game rows as they stream in, committing every `batch_size` rows."""
     conn = setup_db()
-    cursor = conn.cursor()
-    
+
     count = 0
-    for game in games:
-        # Use INSERT OR REPLACE to update stats if we re-run it
-        cursor.execute('''
-            INSERT OR REPLACE INTO games 
-            (game_id, season_id, date, home_team, away_team, home_score, away_score, status, video_path)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, COALESCE((SELECT video_path FROM games WHERE game_id = ?), ?))
-        ''', game[:8] + (game[0], None)) # This complex logic preserves existing video_path links if they exist
-        count += 1
-        
-    conn.commit()
+    for rows in batched(games, batch_size):
+        # Upsert keeps existing video_path links if they exist
+        count += write_game_rows(conn, rows)
+        # New/changed games become pending for the pipeline's events stage
+        record_scheduled_games(conn, league_code, rows)
+        conn.commit()
+
     conn.close()
     print(f"💾 Successfully cached {count} games into skout.db")
 
@@ -149,6 +111,4 @@ if __name__ == "__main__":
     parser.add_argument("--league", type=str, default="ncaamb")
     args = parser.parse_args()
 
-    games_list = fetch_season_games(args.season_id, league_code=args.league)
-    if games_list:
-        save_schedule(games_list)
+    save_schedule(fetch_season_games(args.season_id, league_code=args.league), league_code=args.league)
@@ -8,11 +8,13 @@ from tqdm import tqdm
 # Add project root to path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
 
+from src.ingestion.pipeline import iter_schedule
 from src.ingestion.synergy_client import SynergyClient
+from src.search.vector_store import CollectionWriter
 
 class GameIngester:
-    def __init__(self):
-        self.client = SynergyClient()
+    def __init__(self, client: SynergyClient | None = None):
+        self.client = client or SynergyClient()
         
         # Initialize Vector DB for Metadata Storage
         db_path = os.path.join(os.getcwd(), "data/vector_db")
@@ -21,6 +23,7 @@ class GameIngester:
         
         # We use a separate collection for Game Metadata
         self.meta_collection = self.chroma_client.get_or_create_collection(name="skout_game_metadata")
+        self.meta_writer = CollectionWriter(self.meta_collection, skip_invalid=True)
 
     def get_season_id(self, target_year):
         """Finds the Synergy Season ID for a given year."""
@@ -114,59 +117,34 @@ class GameIngester:
         if not season_id:
             return
 
-        teams = self.fetch_all_teams(season_id)
-        
-        if not teams:
-            print("❌ No teams found. Check API permissions or Season ID.")
-            return
-
-        print(f"✅ Found {len(teams)} total teams. Starting Schedule Crawl...")
-        
+        # One season-wide crawl is far cheaper than crawling every team.
+        print("\n📅 Crawling season schedule...")
         processed_game_ids = set()
-        
-        for team in tqdm(teams, desc="Scanning Teams", unit="team"):
-            team_id = team.get("id")
-            if not team_id:
-                continue
 
-            # Pagination for games
-            skip = 0
-            take = 50 
-            
-            while True:
-                # Manually call _get to support skip logic since get_games might hardcode params
-                params = {"seasonId": season_id, "teamId": team_id, "take": take, "skip": skip}
-                games_response = self.client._get("/ncaamb/games", params=params)
-                
-                if not games_response:
-                    break
-                
-                game_wrappers = []
-                if isinstance(games_response, dict):
-                    game_wrappers = games_response.get('data', [])
-                elif isinstance(games_response, list):
-                    game_wrappers = games_response
-                
-                if not game_wrappers:
-                    break
-
-                for game_wrapper in game_wrappers:
-                    game = game_wrapper.get('data', game_wrapper) if isinstance(game_wrapper, dict) else game_wrapper
-                    
-                    if not isinstance(game, dict):
-                        continue
-                    
-                    game_id = game.get('id')
-                    if not game_id or game_id in processed_game_ids:
-                        continue
-                    
-                    self.save_game_metadata(game, season_id)
-                    processed_game_ids.add(game_id)
-                
-                if len(game_wrappers) < take:
-                    break
-                skip += take
-                
+        for game in tqdm(iter_schedule(self.client, "ncaamb", season_id, []), desc="Indexing Games", unit="game"):
+            self.save_game_metadata(game, season_id)
+            processed_game_ids.add(game["id"])
+
+        if not processed_game_ids:
+            # Some keys only list games per team: fall back to a team crawl.
+            teams = self.fetch_all_teams(season_id)
+
+            if not teams:
+                print("❌ No teams found. Check API permissions or Season ID.")
+                return
+
+            print(f"✅ Found {len(teams)} total teams. Starting Schedule Crawl...")
+            team_ids = [team["id"] for team in teams]
+
+            for game in tqdm(
+                iter_schedule(self.client, "ncaamb", season_id, team_ids, strategy="team"),
+                desc="Scanning Teams",
+                unit="game",
+            ):
+                self.save_game_metadata(game, season_id)
+                processed_game_ids.add(game["id"])
+
+        self.meta_writer.flush()
         print(f"\n🎉 Ingestion Complete. {len(processed_game_ids)} unique games indexed.")
 
     def save_game_metadata(self, game_data, season_id):
@@ -182,16 +160,16 @@ class GameIngester:
             date = game_data.get('date', game_data.get('scheduled', 'Unknown Date'))
             description = f"{home_team} vs {away_team} on {date}"
             
-            self.meta_collection.add(
-                ids=[game_id],
-                documents=[description],
-                metadatas=[{
+            self.meta_writer.add(
+                game_id,
+                document=description,
+                metadata={
                     "season_id": str(season_id),
                     "game_date": str(date),
                     "home_team": str(home_team),
                     "away_team": str(away_team),
                     "status": str(game_data.get('status', 'unknown'))
-                }]
+                }
             )
         except Exception:
             # Non-fatal: skip malformed items
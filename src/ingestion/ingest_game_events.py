@@ -1,68 +1,47 @@
 import os
-import requests
-import sqlite3
-import time
+import sys
 from dotenv import load_dotenv
 
 # Load environment variables from project root .env (works locally and on Streamlit Cloud)
 ENV_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../..", ".env"))
 load_dotenv(ENV_PATH)
 
-DB_PATH = os.path.join(os.getcwd(), "data/skout.db")
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
+
+from src.ingestion.db import connect_db, ensure_schema  # noqa: E402
+from src.ingestion.ingest_state import mark_all_pending  # noqa: E402
+from src.ingestion.pipeline import write_play_rows  # noqa: E402
+from src.ingestion.synergy_client import SynergyClient  # noqa: E402
+
 API_KEY = os.getenv("SYNERGY_API_KEY")
 
 def setup_db():
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    # We drop the table to clear the "Unknown Play" junk data
-    cursor.execute("DROP TABLE IF EXISTS plays")
-    cursor.execute('''
-        CREATE TABLE plays (
-            play_id TEXT PRIMARY KEY,
-            game_id TEXT,
-            period INTEGER,
-            clock_seconds INTEGER,
-            clock_display TEXT,
-            description TEXT,
-            team_id TEXT,
-            x_loc INTEGER,
-            y_loc INTEGER,
-            tags TEXT, 
-            FOREIGN KEY(game_id) REFERENCES games(game_id)
-        )
-    ''')
+    conn = connect_db()
+    ensure_schema(conn)
+    # Clear the "Unknown Play" junk data (DELETE, not DROP, so the
+    # indexes created by the schema migrations survive)
+    conn.execute("DELETE FROM plays")
+    conn.execute("DELETE FROM play_tags")
+    # The plays are gone, so no game's events count as fetched any more
+    mark_all_pending(conn)
     conn.commit()
     return conn
 
 def get_linked_games():
-    conn = sqlite3.connect(DB_PATH)
+    conn = connect_db()
     cursor = conn.cursor()
     cursor.execute("SELECT game_id, home_team, away_team FROM games WHERE video_path IS NOT NULL")
-    return cursor.fetchall()
+    rows = cursor.fetchall()
+    conn.close()
+    return rows
 
-def retry_request(url, headers, max_retries=5):
-    for attempt in range(max_retries):
-        try:
-            time.sleep(1.5)
-            response = requests.get(url, headers=headers)
-            if response.status_code == 200:
-                return response.json().get('data', [])
-            if response.status_code == 429:
-                wait_time = (attempt + 1) * 5
-                print(f"   ⏳ Rate limited. Cooling down for {wait_time}s...")
-                time.sleep(wait_time)
-                continue
-            response.raise_for_status()
-        except Exception as e:
-            print(f"   ❌ Network error: {e}")
-            time.sleep(2)
+def fetch_game_events(client, game_id):
+    # Pacing and 429 backoff are handled by the client's rate limiter.
+    response = client.get_game_events(league_code="ncaamb", game_id=game_id)
+    if isinstance(response, dict):
+        return response.get('data', [])
     return []
 
-def fetch_game_events(game_id):
-    url = f"https://api.sportradar.com/synergy/basketball/ncaamb/games/{game_id}/events"
-    headers = {"x-api-key": API_KEY}
-    return retry_request(url, headers)
-
 def process_events(events, game_id):
     parsed_plays = []
     for item in events:
@@ -101,9 +80,9 @@ def process_events(events, game_id):
     return parsed_plays
 
 def ingest_events():
-    conn = setup_db() # This will DROP and RECREATE the table
-    cursor = conn.cursor()
+    conn = setup_db() # This will clear the plays table
     
+    client = SynergyClient(api_key=API_KEY)
     games = get_linked_games()
     print(f"🎯 Re-Ingesting plays for {len(games)} games (fixing descriptions)...")
     
@@ -112,15 +91,11 @@ def ingest_events():
     for game in games:
         g_id, home, away = game
         print(f"📥 Fetching: {home} vs {away}...")
-        events = fetch_game_events(g_id)
+        events = fetch_game_events(client, g_id)
         
         if events:
             rows = process_events(events, g_id)
-            cursor.executemany('''
-                INSERT OR REPLACE INTO plays 
-                (play_id, game_id, period, clock_seconds, clock_display, description, team_id, x_loc, y_loc, tags)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', rows)
+            write_play_rows(conn, rows)
             total_new_plays += len(rows)
             conn.commit()
             print(f"   ✅ Saved {len(rows)} plays.")
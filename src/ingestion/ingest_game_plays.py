@@ -1,17 +1,17 @@
 import os
 import sys
 import argparse
-import time
 import chromadb
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
 
 from src.ingestion.synergy_client import SynergyClient
+from src.search.vector_store import CollectionWriter
 
 
 class GamePlayIngester:
-    def __init__(self):
-        self.client = SynergyClient()
+    def __init__(self, client: SynergyClient | None = None):
+        self.client = client or SynergyClient()
 
         db_path = os.path.join(os.getcwd(), "data/vector_db")
         os.makedirs(db_path, exist_ok=True)
@@ -20,6 +20,7 @@ class GamePlayIngester:
         self.play_collection = self.chroma_client.get_or_create_collection(
             name="skout_game_plays"
         )
+        self.play_writer = CollectionWriter(self.play_collection)
 
     # --------------------------------------------------
     # FETCH PLAYS (LICENSE-SAFE)
@@ -52,7 +53,6 @@ class GamePlayIngester:
                 break
 
             skip += take
-            time.sleep(0.3)
 
         print(f"✅ Retrieved {len(all_plays)} plays")
         return all_plays
@@ -70,6 +70,7 @@ class GamePlayIngester:
         for wrapper in plays:
             play = wrapper.get("data", wrapper)
             self.save_play(play, game_id)
+        self.play_writer.flush()
 
         print(f"🎉 Play ingestion complete for game {game_id}")
 
@@ -88,15 +89,13 @@ class GamePlayIngester:
             "clock": play.get("clock"),
             "period": play.get("period"),
             "sequence": play.get("sequence"),
+            # PlayEnricher picks up plays that are not enriched yet
+            "is_enriched": False,
         }
 
         document = play.get("description", "Unknown play")
 
-        self.play_collection.add(
-            ids=[play_id],
-            documents=[document],
-            metadatas=[metadata]
-        )
+        self.play_writer.add(play_id, document=document, metadata=metadata)
 
 
 # --------------------------------------------------
@@ -9,6 +9,7 @@ from tqdm import tqdm
 # Add project root to path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
 from src.processing.vibe_check import get_image_embedding
+from src.search.vector_store import CollectionWriter
 
 # --- CONFIGURATION ---
 VIDEO_FOLDER = "data/video_clips"
@@ -33,6 +34,7 @@ def process_video(filepath, collection):
     
     # Batch processing loop with Progress Bar
     success_count = 0
+    writer = CollectionWriter(collection)
     
     for current_time in tqdm.tqdm(timestamps, desc="Indexing Game", unit="clips"):
         # Jump specifically to this timestamp (ms)
@@ -55,21 +57,22 @@ def process_video(filepath, collection):
         try:
             vector = get_image_embedding(pil_image)
             
-            # Save to Database
-            collection.add(
-                ids=[clip_id],
-                embeddings=[vector],
-                metadatas=[{
+            # Save to Database (buffered, upserted in batches)
+            writer.add(
+                clip_id,
+                embedding=vector,
+                metadata={
                     "source_video": filename,
                     "timestamp": current_time,
                     "description": f"Game Action at {current_time}s"
-                }]
+                }
             )
             success_count += 1
         except Exception as e:
             print(f"Error indexing frame: {e}")
 
     cap.release()
+    writer.close()
     print(f"✅ Indexed {success_count} searchable moments from this game.")
 
 def run_local_ingestion():
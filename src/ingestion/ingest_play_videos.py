@@ -1,17 +1,21 @@
 import os
 import sys
-import time
+import asyncio
 import argparse
+from functools import partial
+
 import chromadb
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
 
+from src.ingestion.async_synergy_client import DEFAULT_CONCURRENCY, AsyncSynergyClient
 from src.ingestion.synergy_client import SynergyClient
+from src.search.vector_store import CollectionWriter
 
 
 class PlayVideoIngester:
-    def __init__(self):
-        self.client = SynergyClient()
+    def __init__(self, client: SynergyClient | None = None):
+        self.client = client or SynergyClient()
 
         db_path = os.path.join(os.getcwd(), "data/vector_db")
         os.makedirs(db_path, exist_ok=True)
@@ -25,14 +29,13 @@ class PlayVideoIngester:
         self.video_collection = self.chroma_client.get_or_create_collection(
             name="skout_play_videos"
         )
+        self.video_writer = CollectionWriter(self.video_collection)
 
     # --------------------------------------------------
     # FETCH VIDEO FOR A SINGLE PLAY
     # --------------------------------------------------
     def fetch_play_video(self, play_id):
-        response = self.client._get(
-            f"/ncaamb/plays/{play_id}/video"
-        )
+        response = self.client.get_play_video("ncaamb", play_id)
 
         # Licensed endpoint may return None / 404
         if not response:
@@ -44,7 +47,7 @@ class PlayVideoIngester:
     # --------------------------------------------------
     # INGEST ALL PLAY VIDEOS
     # --------------------------------------------------
-    def ingest_all(self, limit=None):
+    def ingest_all(self, limit=None, concurrency=DEFAULT_CONCURRENCY):
         print("\n🎥 Linking play → video assets\n")
 
         play_ids = self.play_collection.get()["ids"]
@@ -56,24 +59,32 @@ class PlayVideoIngester:
         if limit:
             play_ids = play_ids[:limit]
 
-        total_videos = 0
+        total_videos = asyncio.run(self._ingest_videos(play_ids, concurrency))
+        self.video_writer.flush()
 
-        for idx, play_id in enumerate(play_ids, 1):
-            print(f"[{idx}/{len(play_ids)}] Processing play {play_id}")
+        print(f"\n🎉 Video ingestion complete: {total_videos} videos linked")
 
-            videos = self.fetch_play_video(play_id)
+    async def _ingest_videos(self, play_ids, concurrency):
+        """Fetch video links with `concurrency` requests in flight; store as they arrive."""
+        total_videos = 0
 
-            if not videos:
-                continue
+        async with AsyncSynergyClient(client=self.client, concurrency=concurrency) as api:
+            fetch = partial(api.get_play_video, "ncaamb")
 
-            for wrapper in videos:
-                video = wrapper.get("data", wrapper)
-                self.save_video(video, play_id)
-                total_videos += 1
+            done = 0
+            async for play_id, response in api.imap(fetch, play_ids):
+                done += 1
+                print(f"[{done}/{len(play_ids)}] Processing play {play_id}")
 
-            time.sleep(0.25)
+                # Licensed endpoint may return None / 404
+                videos = response.get("data", []) if isinstance(response, dict) else []
 
-        print(f"\n🎉 Video ingestion complete: {total_videos} videos linked")
+                for wrapper in videos:
+                    video = wrapper.get("data", wrapper)
+                    self.save_video(video, play_id)
+                    total_videos += 1
+
+        return total_videos
 
     # --------------------------------------------------
     # STORAGE
@@ -94,11 +105,7 @@ class PlayVideoIngester:
 
         document = f"Video for play {play_id}"
 
-        self.video_collection.add(
-            ids=[video_id],
-            documents=[document],
-            metadatas=[metadata]
-        )
+        self.video_writer.add(video_id, document=document, metadata=metadata)
 
 
 # --------------------------------------------------
@@ -114,8 +121,14 @@ if __name__ == "__main__":
         help="Limit number of plays (for testing)",
         default=None
     )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        help="Max video requests in flight",
+        default=DEFAULT_CONCURRENCY
+    )
 
     args = parser.parse_args()
 
     ingester = PlayVideoIngester()
-    ingester.ingest_all(limit=args.limit)
+    ingester.ingest_all(limit=args.limit, concurrency=args.concurrency)
@@ -1,7 +1,6 @@
 import os
 import sys
 import argparse
-import time
 import re
 import chromadb
 
@@ -9,6 +8,7 @@ import chromadb
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
 
 from src.ingestion.synergy_client import SynergyClient
+from src.search.vector_store import CollectionWriter
 
 from config.ncaa_di_mens_basketball import NCAA_DI_MENS_BASKETBALL
 from config.ncaa_dii_mens_basketball import NCAA_DII_MENS_BASKETBALL
@@ -36,8 +36,8 @@ DIVISION_MAP = {
 # INGESTER
 # --------------------------------------------------
 class SingleTeamIngester:
-    def __init__(self):
-        self.client = SynergyClient()
+    def __init__(self, client: SynergyClient | None = None):
+        self.client = client or SynergyClient()
 
         db_path = os.path.join(os.getcwd(), "data/vector_db")
         os.makedirs(db_path, exist_ok=True)
@@ -46,6 +46,7 @@ class SingleTeamIngester:
         self.meta_collection = self.chroma_client.get_or_create_collection(
             name="skout_game_metadata"
         )
+        self.meta_writer = CollectionWriter(self.meta_collection)
 
     # --------------------------------------------------
     # INTERACTIVE SELECTION
@@ -116,7 +117,6 @@ class SingleTeamIngester:
                 break
 
             skip += take
-            time.sleep(0.2)
 
         raise RuntimeError(f"Team '{team_name}' not found in Synergy team list")
 
@@ -176,8 +176,8 @@ class SingleTeamIngester:
                     break
 
                 skip += take
-                time.sleep(0.2)
 
+        self.meta_writer.flush()
         print(f"\n🎉 Ingestion complete: {total} games indexed for {team_name}")
 
     # --------------------------------------------------
@@ -191,16 +191,16 @@ class SingleTeamIngester:
 
         description = f"{home} vs {away} on {date}"
 
-        self.meta_collection.add(
-            ids=[game_id],
-            documents=[description],
-            metadatas=[{
+        self.meta_writer.add(
+            game_id,
+            document=description,
+            metadata={
                 "season_id": season_id,
                 "home_team": home,
                 "away_team": away,
                 "game_date": date,
                 "status": game.get("status")
-            }]
+            }
         )
 
 
@@ -0,0 +1,167 @@
+"""Checkpoint state for resumable, incremental pipeline runs.
+
+ingest_state holds one row per finished game:
+- status: pending (needs events) | done | failed
+- game_hash: hash of the schedule row; when it changes the game goes back
+  to pending and changed_at is bumped
+- payload_hash / play_count / fetched_at: last successful events fetch
+
+State updates are written without committing so they land in the same
+transaction as the plays they describe: after a crash a game is either
+fully ingested and marked done, or still pending.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from datetime import datetime, timezone
+from typing import Any
+
+PENDING = "pending"
+DONE = "done"
+FAILED = "failed"
+
+
+def utc_now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+def payload_hash(payload: Any) -> str:
+    body = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha1(body.encode("utf-8")).hexdigest()
+
+
+def game_hash(row: tuple) -> str:
+    """Hash of a games row tuple (everything except video_path)."""
+    return payload_hash(list(row))
+
+
+def record_scheduled_games(conn, league_code: str, rows: list[tuple]) -> None:
+    """Track games rows (game_id, season_id, ...); new or changed games become pending."""
+    now = utc_now()
+    conn.executemany(
+        """
+        INSERT INTO ingest_state (game_id, league_code, season_id, status, game_hash, changed_at)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ON CONFLICT(game_id) DO UPDATE SET
+            status = excluded.status,
+            game_hash = excluded.game_hash,
+            changed_at = excluded.changed_at
+        WHERE ingest_state.game_hash IS NOT excluded.game_hash
+        """,
+        [(r[0], league_code, r[1], PENDING, game_hash(r), now) for r in rows],
+    )
+
+
+def track_untracked_games(conn, league_code: str, season_id: str) -> None:
+    """Add games rows of this season that have no ingest_state row yet, as pending.
+
+    Covers games written outside upsert_games (older databases, schedule-only
+    scripts), so the events stage still sees them.
+    """
+    rows = conn.execute(
+        """
+        SELECT g.game_id, g.season_id, g.date, g.home_team, g.away_team,
+               g.home_score, g.away_score, g.status
+        FROM games g
+        WHERE g.season_id = ?
+          AND NOT EXISTS (SELECT 1 FROM ingest_state s WHERE s.game_id = g.game_id)
+        """,
+        (season_id,),
+    ).fetchall()
+    if rows:
+        record_scheduled_games(conn, league_code, rows)
+
+
+def mark_all_pending(conn) -> None:
+    """Forget every events fetch (e.g. after the plays table was cleared)."""
+    conn.execute(
+        "UPDATE ingest_state SET status = ?, payload_hash = NULL, play_count = NULL, fetched_at = NULL",
+        (PENDING,),
+    )
+
+
+def games_to_fetch(
+    conn,
+    season_id: str,
+    since: str | None = None,
+    refetch: bool = False,
+    league_code: str = "ncaamb",
+) -> dict[str, str | None]:
+    """game_id -> previous payload_hash for games whose events need fetching.
+
+    Default: games not yet done (new, changed or previously failed).
+    since: only games added/changed at or after this ISO timestamp.
+    refetch: every game in the season, regardless of status.
+    Season games without a state row are tracked (as pending) first.
+    """
+
+    track_untracked_games(conn, league_code, season_id)
+    sql = "SELECT game_id, payload_hash FROM ingest_state WHERE season_id = ?"
+    params: list[Any] = [season_id]
+    if not refetch:
+        sql += " AND status != ?"
+        params.append(DONE)
+    if since:
+        sql += " AND changed_at >= ?"
+        params.append(since)
+    return dict(conn.execute(sql, params).fetchall())
+
+
+def mark_fetched(conn, game_id: str, new_hash: str, play_count: int | None) -> None:
+    """play_count=None keeps the previous count (payload unchanged)."""
+    conn.execute(
+        """
+        UPDATE ingest_state
+        SET status = ?, payload_hash = ?, play_count = COALESCE(?, play_count),
+            attempts = attempts + 1, last_error = NULL, fetched_at = ?
+        WHERE game_id = ?
+        """,
+        (DONE, new_hash, play_count, utc_now(), game_id),
+    )
+
+
+def mark_failed(conn, game_id: str, error: str | None) -> None:
+    conn.execute(
+        """
+        UPDATE ingest_state
+        SET status = ?, attempts = attempts + 1, last_error = ?
+        WHERE game_id = ?
+        """,
+        (FAILED, error, game_id),
+    )
+
+
+def start_run(conn, league_code: str, season_id: str) -> tuple[int, str]:
+    started_at = utc_now()
+    cur = conn.execute(
+        "INSERT INTO pipeline_runs (league_code, season_id, started_at, status) VALUES (?, ?, ?, ?)",
+        (league_code, season_id, started_at, "running"),
+    )
+    conn.commit()
+    return cur.lastrowid, started_at
+
+
+def finish_run(conn, run_id: int, status: str, inserted_games: int = 0, inserted_plays: int = 0) -> None:
+    conn.execute(
+        """
+        UPDATE pipeline_runs
+        SET finished_at = ?, status = ?, inserted_games = ?, inserted_plays = ?
+        WHERE run_id = ?
+        """,
+        (utc_now(), status, inserted_games, inserted_plays, run_id),
+    )
+    conn.commit()
+
+
+def last_successful_run(conn, league_code: str, season_id: str) -> str | None:
+    """started_at of the most recent successful run for this season, if any."""
+    row = conn.execute(
+        """
+        SELECT MAX(started_at) FROM pipeline_runs
+        WHERE league_code = ? AND season_id = ? AND status = 'success'
+        """,
+        (league_code, season_id),
+    ).fetchone()
+    return row[0] if row else None
@@ -1,5 +1,6 @@
 import chromadb
 from src.processing.play_tagger import tag_play
+from src.search.vector_store import CollectionWriter
 
 DB_PATH = "data/vector_db"
 
@@ -8,6 +9,9 @@ client = chromadb.PersistentClient(path=DB_PATH)
 clip_collection = client.get_or_create_collection(
     name="skout_video_clips"
 )
+# Flushed every VECTOR_WRITE_BATCH_SIZE clips and at exit; call
+# clip_writer.flush() to make clips searchable sooner
+clip_writer = CollectionWriter(clip_collection)
 
 def ingest_clip(
     clip_id: str,
@@ -20,8 +24,8 @@ def ingest_clip(
         "tags": tags
     }
 
-    clip_collection.add(
-        ids=[clip_id],
-        documents=[description or "Basketball clip"],
-        metadatas=[enriched_metadata]
+    clip_writer.add(
+        clip_id,
+        document=description or "Basketball clip",
+        metadata=enriched_metadata
     )
@@ -1,8 +1,11 @@
 import os
-import sqlite3
+import sys
 import re
 
-DB_PATH = os.path.join(os.getcwd(), "data/skout.db")
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from src.ingestion.db import connect_db  # noqa: E402
+
 VIDEO_DIR = os.path.join(os.getcwd(), "data/video_clips")
 
 # 🛠 CONFIGURATION: Map Filename Terms -> Official DB Names (Exact Matches from your list)
@@ -83,7 +86,7 @@ def link_videos():
         print(f"❌ Video directory not found: {VIDEO_DIR}")
         return
 
-    conn = sqlite3.connect(DB_PATH)
+    conn = connect_db()
     cursor = conn.cursor()
     
     files = [f for f in os.listdir(VIDEO_DIR) if f.endswith(('.mp4', '.mkv', '.webm'))]
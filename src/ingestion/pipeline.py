@@ -1,9 +1,25 @@
 from __future__ import annotations
 
+import asyncio
+import queue
+import threading
+from collections.abc import Iterable, Iterator
 from dataclasses import dataclass
-from typing import Any, Iterable
+from itertools import islice
+from typing import Any
 
+from src.ingestion.async_synergy_client import DEFAULT_CONCURRENCY, AsyncSynergyClient
 from src.ingestion.db import connect_db, ensure_schema
+from src.ingestion.ingest_state import (
+    finish_run,
+    games_to_fetch,
+    last_successful_run,
+    mark_failed,
+    mark_fetched,
+    payload_hash,
+    record_scheduled_games,
+    start_run,
+)
 from src.ingestion.synergy_client import SynergyClient
 
 
@@ -13,6 +29,10 @@ class PipelinePlan:
     season_id: str
     team_ids: list[str]  # empty => all accessible teams (if possible)
     ingest_events: bool = True
+    event_concurrency: int = DEFAULT_CONCURRENCY  # event requests in flight
+    write_batch_size: int = 5000  # plays per transaction in the events stage
+    since: str | None = None  # ISO timestamp or "last": only games added/changed since then
+    refetch: bool = False  # ignore checkpoints and refetch every game's events
 
 
 def _unwrap_list_payload(payload: Any) -> list[Any]:
@@ -40,7 +60,7 @@ def iter_games(
     season_id: str,
     team_id: str | None,
     take: int = 100,
-    max_pages: int = 50,
+    max_pages: int = 200,
 ) -> Iterable[dict]:
     """Paginate through games using skip/take.
 
@@ -72,45 +92,150 @@ def iter_games(
         skip += take
 
 
-def upsert_games(conn, season_id: str, games: list[dict]) -> int:
-    cur = conn.cursor()
-    count = 0
+# A per-team crawl costs about one page per team. A season-wide crawl costs
+# ceil(season games / take) pages, roughly 60 for all of DI at take=100, so
+# it is the cheaper one once about that many teams are selected.
+SEASON_CRAWL_MIN_TEAMS = 60
+
+
+def _game_team_ids(game: dict) -> set[str]:
+    return {
+        str((game.get(side) or {}).get("id"))
+        for side in ("homeTeam", "awayTeam")
+        if (game.get(side) or {}).get("id")
+    }
+
+
+def iter_schedule(
+    client: SynergyClient,
+    league_code: str,
+    season_id: str,
+    team_ids: list[str],
+    take: int = 100,
+    strategy: str = "auto",
+) -> Iterable[dict]:
+    """Yield every game for the selected teams (or whole season) exactly once.
+
+    strategy="auto" picks the cheaper crawl: per-team pages for a handful of
+    teams, or one season-wide crawl filtered to the selection when many teams
+    (or none, meaning all) are selected. "team" forces per-team crawls. A
+    seen-set drops games that show up for both teams of a matchup.
+    """
+
+    seen: set[str] = set()
+
+    def _first_sighting(game: dict) -> bool:
+        gid = game.get("id")
+        if not gid or gid in seen:
+            return False
+        seen.add(gid)
+        return True
+
+    season_wide = not team_ids or len(team_ids) >= SEASON_CRAWL_MIN_TEAMS
+    if strategy == "auto" and season_wide:
+        wanted = {str(t) for t in team_ids}
+        for game in iter_games(client, league_code, season_id, None, take=take):
+            if wanted and not (_game_team_ids(game) & wanted):
+                continue
+            if _first_sighting(game):
+                yield game
+        if not wanted or seen:
+            return
+        # Nothing matched: the key may only list games per team, fall through.
+
+    for tid in team_ids:
+        for game in iter_games(client, league_code, season_id, tid, take=take):
+            if _first_sighting(game):
+                yield game
+
+
+FINAL_STATUSES = {"GameOver", "Final", "Closed"}
+
+
+def game_row(game: dict, season_id: str) -> tuple | None:
+    """Project a Synergy game to a games row (without video_path); None if not final."""
+    status = game.get("status")
+    if status not in FINAL_STATUSES:
+        return None
+
+    home_team = (game.get("homeTeam") or {}).get("name", "Unknown")
+    away_team = (game.get("awayTeam") or {}).get("name", "Unknown")
+
+    return (
+        game.get("id"),
+        season_id,
+        game.get("date"),
+        home_team,
+        away_team,
+        game.get("homeScore", 0),
+        game.get("awayScore", 0),
+        status,
+    )
+
 
+def iter_game_rows(games: Iterable[dict], season_id: str) -> Iterator[tuple]:
     for game in games:
-        status = game.get("status")
-        if status not in {"GameOver", "Final", "Closed"}:
-            continue
+        row = game_row(game, season_id)
+        if row is not None:
+            yield row
 
-        home_team = (game.get("homeTeam") or {}).get("name", "Unknown")
-        away_team = (game.get("awayTeam") or {}).get("name", "Unknown")
 
-        cur.execute(
-            """
-            INSERT OR REPLACE INTO games
-            (game_id, season_id, date, home_team, away_team, home_score, away_score, status, video_path)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, COALESCE((SELECT video_path FROM games WHERE game_id = ?), ?))
-            """,
-            (
-                game.get("id"),
-                season_id,
-                game.get("date"),
-                home_team,
-                away_team,
-                game.get("homeScore", 0),
-                game.get("awayScore", 0),
-                status,
-                game.get("id"),
-                None,
-            ),
-        )
-        count += 1
+def batched(items: Iterable, size: int) -> Iterator[list]:
+    it = iter(items)
+    while batch := list(islice(it, size)):
+        yield batch
+
+
+def write_game_rows(conn, rows: list[tuple]) -> int:
+    """Upsert games rows in the caller's transaction; does not commit.
+
+    ON CONFLICT DO UPDATE rewrites the row in place, so there is no
+    delete + reinsert (no primary-key index churn). video_path is not in the
+    column list, so existing video links are kept.
+    """
+    conn.executemany(
+        """
+        INSERT INTO games
+        (game_id, season_id, date, home_team, away_team, home_score, away_score, status)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(game_id) DO UPDATE SET
+            season_id = excluded.season_id,
+            date = excluded.date,
+            home_team = excluded.home_team,
+            away_team = excluded.away_team,
+            home_score = excluded.home_score,
+            away_score = excluded.away_score,
+            status = excluded.status
+        """,
+        rows,
+    )
+    return len(rows)
+
+
+def upsert_games(
+    conn,
+    season_id: str,
+    games: Iterable[dict],
+    league_code: str = "ncaamb",
+    batch_size: int = 200,
+) -> int:
+    """Stream finished games into SQLite in bounded batches.
+
+    `games` may be a lazy iterator (e.g. iter_schedule): each batch is
+    written and committed as soon as it fills, so memory stays flat and the
+    first rows land while later pages are still being fetched. Games are
+    also tracked in ingest_state (new/changed => pending).
+    """
 
-    conn.commit()
+    count = 0
+    for rows in batched(iter_game_rows(games, season_id), batch_size):
+        count += write_game_rows(conn, rows)
+        record_scheduled_games(conn, league_code, rows)
+        conn.commit()
     return count
 
 
-def upsert_plays(conn, game_id: str, events: list[dict]) -> int:
-    cur = conn.cursor()
+def play_rows(game_id: str, events: list[dict]) -> list[tuple]:
     rows = []
 
     for evt in events:
@@ -143,28 +268,182 @@ def upsert_plays(conn, game_id: str, events: list[dict]) -> int:
             )
         )
 
+    return rows
+
+
+PLAY_UPSERT_SQL = """
+    INSERT INTO plays
+    (play_id, game_id, period, clock_seconds, clock_display, description, team_id, x_loc, y_loc, tags)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(play_id) DO UPDATE SET
+        game_id = excluded.game_id,
+        period = excluded.period,
+        clock_seconds = excluded.clock_seconds,
+        clock_display = excluded.clock_display,
+        description = excluded.description,
+        team_id = excluded.team_id,
+        x_loc = excluded.x_loc,
+        y_loc = excluded.y_loc,
+        tags = excluded.tags
+"""
+
+
+def write_play_rows(conn, rows: list[tuple]) -> int:
+    """Upsert play rows without committing; the caller owns the transaction.
+
+    An in-place update (not INSERT OR REPLACE) so the plays_fts triggers see
+    the change.
+    """
     if not rows:
         return 0
 
-    cur.executemany(
-        """
-        INSERT OR REPLACE INTO plays
-        (play_id, game_id, period, clock_seconds, clock_display, description, team_id, x_loc, y_loc, tags)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """,
-        rows,
-    )
-    conn.commit()
+    conn.executemany(PLAY_UPSERT_SQL, rows)
     return len(rows)
 
 
-def run_pipeline(plan: PipelinePlan, api_key: str, progress_cb=None) -> dict:
+def upsert_plays(conn, game_id: str, events: list[dict]) -> int:
+    count = write_play_rows(conn, play_rows(game_id, events))
+    if count:
+        conn.commit()
+    return count
+
+
+_FETCH_DONE = object()
+
+
+def _put(out: queue.Queue, item, stop: threading.Event) -> bool:
+    """Blocking put that gives up once the consumer has stopped."""
+    while not stop.is_set():
+        try:
+            out.put(item, timeout=0.5)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _fetch_events_worker(
+    client: SynergyClient,
+    league_code: str,
+    game_ids: list[str],
+    concurrency: int,
+    out: queue.Queue,
+    stop: threading.Event,
+) -> None:
+    """Producer: fetch events with `concurrency` requests in flight, push (game_id, payload)."""
+
+    async def _run():
+        async with AsyncSynergyClient(client=client, concurrency=concurrency) as api:
+            # games only holds finished games (see upsert_games), so events are immutable
+            async for gid, payload in api.gather_game_events(league_code, game_ids, final=True):
+                if not _put(out, (gid, payload), stop):
+                    return
+
+    try:
+        asyncio.run(_run())
+    except BaseException as e:  # surfaced by the writer
+        _put(out, e, stop)
+    finally:
+        _put(out, _FETCH_DONE, stop)
+
+
+def run_events_stage(
+    conn,
+    client: SynergyClient,
+    plan: PipelinePlan,
+    game_ids: list[str],
+    tick,
+    known_hashes: dict[str, str | None] | None = None,
+) -> int:
+    """Events stage: concurrent fetchers feed a single writer.
+
+    A background thread fetches events for `game_ids` concurrently and hands
+    payloads over a bounded queue. The calling thread is the only writer: it
+    turns payloads into play rows and commits them in transactions of about
+    `plan.write_batch_size` plays. Progress ticks are emitted from the calling
+    thread so UI callbacks (Streamlit) stay on their own thread.
+
+    Each game's ingest_state row is updated in the same transaction as its
+    plays, so an interrupted run resumes exactly where it stopped. Payloads
+    whose hash matches `known_hashes` are not rewritten.
+    """
+
+    known_hashes = known_hashes or {}
+    total = len(game_ids)
+    results: queue.Queue = queue.Queue(maxsize=4 * plan.event_concurrency)
+    stop = threading.Event()
+    fetcher = threading.Thread(
+        target=_fetch_events_worker,
+        args=(client, plan.league_code, game_ids, plan.event_concurrency, results, stop),
+        name="events-fetch",
+        daemon=True,
+    )
+    fetcher.start()
+
+    inserted = 0
+    pending: list[tuple] = []
+    done = 0
+    error: BaseException | None = None
+
+    try:
+        tick("events:progress", current=0, total=total)
+        while True:
+            item = results.get()
+            if item is _FETCH_DONE:
+                break
+            if isinstance(item, BaseException):
+                error = item
+                continue
+
+            gid, payload = item
+            done += 1
+            if payload is None:
+                mark_failed(conn, gid, "no events response")
+            else:
+                new_hash = payload_hash(payload)
+                play_count = None
+                if new_hash != known_hashes.get(gid):
+                    events = [e for e in _unwrap_list_payload(payload) if isinstance(e, dict)]
+                    rows = play_rows(gid, events)
+                    pending.extend(rows)
+                    play_count = len(rows)
+                mark_fetched(conn, gid, new_hash, play_count)
+
+            if len(pending) >= plan.write_batch_size:
+                inserted += write_play_rows(conn, pending)
+                conn.commit()
+                pending = []
+
+            if done % 10 == 0 or done == total:
+                tick("events:progress", current=done, total=total)
+
+        inserted += write_play_rows(conn, pending)
+        conn.commit()
+    finally:
+        stop.set()
+        fetcher.join()
+
+    if error is not None:
+        raise error
+    return inserted
+
+
+def run_pipeline(
+    plan: PipelinePlan,
+    api_key: str,
+    progress_cb=None,
+    client: SynergyClient | None = None,
+) -> dict:
     """Run a minimal end-to-end ingestion pipeline.
 
     progress_cb(step:str, info:dict) is optional.
+    client lets callers share one pooled SynergyClient across runs; if omitted
+    a client is created for (and closed after) this run.
     """
 
-    client = SynergyClient(api_key=api_key)
+    owns_client = client is None
+    if client is None:
+        client = SynergyClient(api_key=api_key)
 
     conn = connect_db()
     ensure_schema(conn)
@@ -173,45 +452,91 @@ def run_pipeline(plan: PipelinePlan, api_key: str, progress_cb=None) -> dict:
         if progress_cb:
             progress_cb(step, info)
 
-    # 1) Games
-    tick("schedule:start", season_id=plan.season_id)
-    games: list[dict] = []
+    since = plan.since
+    if since == "last":
+        # No previous successful run => nothing to diff against, fetch everything pending.
+        since = last_successful_run(conn, plan.league_code, plan.season_id)
 
-    if plan.team_ids:
-        for tid in plan.team_ids:
-            for g in iter_games(client, plan.league_code, plan.season_id, tid):
-                games.append(g)
-    else:
-        for g in iter_games(client, plan.league_code, plan.season_id, None):
-            games.append(g)
-
-    inserted_games = upsert_games(conn, plan.season_id, games)
-    tick("schedule:done", inserted_games=inserted_games)
-
-    # 2) Events
+    run_id, _ = start_run(conn, plan.league_code, plan.season_id)
+    inserted_games = 0
     inserted_plays = 0
-    if plan.ingest_events:
-        tick("events:start")
-        cur = conn.cursor()
-        cur.execute("SELECT game_id FROM games WHERE season_id = ?", (plan.season_id,))
-        game_ids = [r[0] for r in cur.fetchall()]
-
-        for idx, gid in enumerate(game_ids):
-            if idx % 10 == 0:
-                tick("events:progress", current=idx, total=len(game_ids))
-
-            payload = client.get_game_events(plan.league_code, gid)
-            if not payload:
-                continue
+    try:
+        # 1) Games
+        tick("schedule:start", season_id=plan.season_id)
+        games = iter_schedule(client, plan.league_code, plan.season_id, plan.team_ids)
+        inserted_games = upsert_games(conn, plan.season_id, games, league_code=plan.league_code)
+        tick("schedule:done", inserted_games=inserted_games)
+
+        # 2) Events (only games not yet checkpointed as done, unless refetching)
+        if plan.ingest_events:
+            to_fetch = games_to_fetch(
+                conn, plan.season_id, since=since, refetch=plan.refetch, league_code=plan.league_code
+            )
+            tick("events:start", total=len(to_fetch), since=since)
 
-            events = [e for e in _unwrap_list_payload(payload) if isinstance(e, dict)]
-            inserted_plays += upsert_plays(conn, gid, events)
+            inserted_plays = run_events_stage(
+                conn, client, plan, list(to_fetch), tick, known_hashes=to_fetch
+            )
+
+            tick("events:done", inserted_plays=inserted_plays)
+    except BaseException:
+        finish_run(conn, run_id, "failed", inserted_games, inserted_plays)
+        conn.close()
+        raise
 
-        tick("events:done", inserted_plays=inserted_plays)
+    # Schedule-only runs don't count as a baseline for since="last".
+    finish_run(
+        conn, run_id, "success" if plan.ingest_events else "schedule_only", inserted_games, inserted_plays
+    )
 
     conn.close()
+    rate_limit = client.rate_limiter.stats()
+    if owns_client:
+        client.close()
 
     return {
         "inserted_games": inserted_games,
         "inserted_plays": inserted_plays,
+        "rate_limit": rate_limit,
     }
+
+
+if __name__ == "__main__":
+    import argparse
+    import os
+
+    parser = argparse.ArgumentParser(
+        description="PortalRecruit – Season Pipeline (schedule → events), resumable"
+    )
+    parser.add_argument("--league", type=str, default="ncaamb")
+    parser.add_argument("--season-id", type=str, required=True)
+    parser.add_argument("--team-id", action="append", default=[], help="Repeat for several teams")
+    parser.add_argument("--no-events", action="store_true", help="Schedule only")
+    parser.add_argument(
+        "--since",
+        type=str,
+        default=None,
+        help='Only fetch events for games added/changed since an ISO timestamp, or "last" '
+        "for the last successful run",
+    )
+    parser.add_argument("--refetch", action="store_true", help="Ignore checkpoints")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    args = parser.parse_args()
+
+    def _print_progress(step: str, info: dict):
+        print(f"[{step}] {info}")
+
+    result = run_pipeline(
+        PipelinePlan(
+            league_code=args.league,
+            season_id=args.season_id,
+            team_ids=args.team_id,
+            ingest_events=not args.no_events,
+            event_concurrency=args.concurrency,
+            since=args.since,
+            refetch=args.refetch,
+        ),
+        api_key=os.getenv("SYNERGY_API_KEY", ""),
+        progress_cb=_print_progress,
+    )
+    print(result)
@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from dataclasses import asdict, dataclass
+from email.utils import parsedate_to_datetime
+
+from config.settings import SYNERGY_RATE_LIMITS
+
+# Endpoint families that get their own bucket. Anything unrecognised
+# (e.g. /seasons) falls into "default".
+ENDPOINT_FAMILIES = ("teams", "games", "events", "video", "default")
+
+
+def endpoint_family(endpoint: str) -> str:
+    """Map a Synergy endpoint path to its rate-limit family.
+
+    /ncaamb/teams                 -> teams
+    /ncaamb/games                 -> games
+    /ncaamb/games/{id}/events     -> events
+    /ncaamb/games/{id}/plays      -> events
+    /ncaamb/plays/{id}/video      -> video
+    """
+
+    parts = [p for p in endpoint.split("/") if p]
+    if parts and parts[-1] == "video":
+        return "video"
+    if parts and parts[-1] in {"events", "plays"}:
+        return "events"
+    if "games" in parts:
+        return "games"
+    if "teams" in parts:
+        return "teams"
+    return "default"
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Parse a Retry-After header (delta-seconds or HTTP-date) into seconds."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled at `rate` tokens/sec up to `capacity`.
+
+    `reserve()` takes a token immediately (the balance may go negative) and
+    returns how long the caller must wait before using it. The lock is never
+    held while sleeping, so one bucket can be shared by threads and asyncio
+    tasks alike.
+    """
+
+    def __init__(self, rate: float, capacity: float | None = None):
+        if rate <= 0:
+            raise ValueError("rate must be > 0")
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1.0, rate))
+        self._tokens = self.capacity
+        # Tokens accrue from this instant; it moves into the future while a
+        # Retry-After block is in force.
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens: float = 1.0) -> float:
+        with self._lock:
+            now = time.monotonic()
+            if now > self._updated:
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+            self._tokens -= tokens
+
+            deficit = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            return max(0.0, self._updated - now) + deficit
+
+    def block_for(self, seconds: float) -> None:
+        """Hold every caller for `seconds` (server asked us to back off)."""
+        with self._lock:
+            # Drop any burst allowance and restart the refill after the block,
+            # so queued callers are spaced out instead of released at once.
+            self._tokens = min(self._tokens, 0.0)
+            self._updated = max(self._updated, time.monotonic() + seconds)
+
+
+@dataclass
+class RateLimitStats:
+    tokens_consumed: int = 0
+    # Summed across callers, so concurrent waits overlap.
+    wait_seconds: float = 0.0
+    # Requests that would have gone out over quota without the limiter.
+    avoided_429s: int = 0
+    # 429s the server still returned (should stay near zero when tuned).
+    received_429s: int = 0
+
+
+class RateLimiter:
+    """Per-endpoint-family token buckets for Synergy requests.
+
+    rates maps family -> requests/sec (see ENDPOINT_FAMILIES); missing
+    families use rates["default"]. Share one instance between clients to
+    enforce a single quota across threads and asyncio tasks.
+    """
+
+    def __init__(self, rates: dict[str, float] | None = None, burst: float | None = None):
+        rates = {**SYNERGY_RATE_LIMITS, **(rates or {})}
+        default_rate = rates.get("default", 5.0)
+        self.buckets = {
+            family: TokenBucket(rates.get(family, default_rate), burst)
+            for family in ENDPOINT_FAMILIES
+        }
+        self._stats = RateLimitStats()
+        self._stats_lock = threading.Lock()
+
+    def _reserve(self, endpoint: str) -> float:
+        wait = self.buckets[endpoint_family(endpoint)].reserve()
+        with self._stats_lock:
+            self._stats.tokens_consumed += 1
+            if wait > 0:
+                self._stats.wait_seconds += wait
+                self._stats.avoided_429s += 1
+        return wait
+
+    def acquire(self, endpoint: str) -> None:
+        """Block the calling thread until a request to `endpoint` may go out."""
+        wait = self._reserve(endpoint)
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self, endpoint: str) -> None:
+        """Asyncio variant of acquire(); sleeps without blocking the loop."""
+        wait = self._reserve(endpoint)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def on_rate_limited(self, endpoint: str, retry_after: float | None, fallback: float) -> float:
+        """Record a 429 and pause the family for Retry-After (or `fallback`) seconds."""
+        delay = retry_after if retry_after is not None else fallback
+        self.buckets[endpoint_family(endpoint)].block_for(delay)
+        with self._stats_lock:
+            self._stats.received_429s += 1
+        return delay
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            return asdict(self._stats)
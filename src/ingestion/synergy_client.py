@@ -2,29 +2,145 @@ import os
 import time
 
 import requests
-
-from config.settings import BASE_URL
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from config.settings import (
+    BASE_URL,
+    SYNERGY_CACHE_BYPASS,
+    SYNERGY_CONNECT_RETRIES,
+    SYNERGY_POOL_SIZE,
+)
+from src.ingestion.http_cache import MISS, ResponseCache, cache_key, key_namespace
+from src.ingestion.rate_limit import RateLimiter, parse_retry_after
+
+
+def build_session(
+    pool_size: int = SYNERGY_POOL_SIZE,
+    connect_retries: int = SYNERGY_CONNECT_RETRIES,
+) -> requests.Session:
+    """Create a keep-alive session with a connection pool of `pool_size`.
+
+    The adapter only retries connection/read failures (with a short backoff).
+    HTTP statuses such as 429/5xx are left to `SynergyClient._get` so callers
+    still see `last_status_code`.
+    """
+
+    retry = Retry(
+        total=connect_retries,
+        connect=connect_retries,
+        read=connect_retries,
+        status=0,
+        backoff_factor=0.5,
+        allowed_methods=frozenset({"GET"}),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers["Connection"] = "keep-alive"
+    return session
 
 
 class SynergyClient:
-    def __init__(self, api_key: str | None = None):
+    """Synergy API client.
+
+    Each client owns a pooled keep-alive session; create one per run and pass
+    it to the ingesters (`client=...`) so every request reuses the same
+    TCP/TLS connections. For concurrent fetching wrap it in
+    `AsyncSynergyClient(client=...)`.
+
+    Requests are paced by a token-bucket RateLimiter (per endpoint family,
+    see config.settings.SYNERGY_RATE_LIMITS). Pass the same `rate_limiter`
+    to several clients to make them share one quota.
+
+    Successful responses go through a persistent ResponseCache under data/
+    (per-endpoint TTLs; events of finished games are kept indefinitely).
+    Disable it with use_cache=False or SYNERGY_CACHE_BYPASS=1.
+
+    `last_status_code` / `last_error` describe the most recently completed
+    request, which is only meaningful for sequential callers.
+    """
+
+    def __init__(
+        self,
+        api_key: str | None = None,
+        session: requests.Session | None = None,
+        pool_size: int = SYNERGY_POOL_SIZE,
+        base_url: str | None = None,
+        rate_limiter: RateLimiter | None = None,
+        cache: ResponseCache | None = None,
+        use_cache: bool = not SYNERGY_CACHE_BYPASS,
+    ):
         self.api_key = api_key or os.getenv("SYNERGY_API_KEY")
         if not self.api_key:
             raise ValueError("❌ ERROR: SYNERGY_API_KEY not found (env/secrets missing)")
 
-        self.base_url = BASE_URL
+        self.base_url = base_url or BASE_URL
         self.headers = {
             "x-api-key": self.api_key,
             "Content-Type": "application/json",
         }
+        self.session = session or build_session(pool_size=pool_size)
+        self.rate_limiter = rate_limiter or RateLimiter()
+        self.cache = (cache or ResponseCache()) if use_cache else None
+        self._cache_ns = key_namespace(self.api_key)
 
         # Introspection for callers (capabilities, UI, etc.)
         self.last_status_code: int | None = None
         self.last_error: str | None = None
 
-    def _get(self, endpoint, params=None, retries=4):
+    def close(self) -> None:
+        self.session.close()
+        if self.cache is not None:
+            self.cache.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _get(self, endpoint, params=None, retries=4, reserved=False, immutable=False):
+        """Cached GET: serve from the response cache, else fetch and store.
+
+        immutable=True marks the response as never changing (e.g. events of a
+        finished game) so its cache entry does not expire.
+        """
+
+        cached = self._cache_get(endpoint, params)
+        if cached is not MISS:
+            return cached
+
+        payload = self._fetch(endpoint, params, retries=retries, reserved=reserved)
+        self._cache_put(endpoint, params, payload, immutable=immutable)
+        return payload
+
+    def _cache_get(self, endpoint, params=None):
+        if self.cache is None:
+            return MISS
+        cached = self.cache.get(cache_key(endpoint, params, self._cache_ns))
+        if cached is not MISS:
+            print(f"  = Cached: {endpoint} with params: {params}")
+            self.last_status_code = 200
+            self.last_error = None
+        return cached
+
+    def _cache_put(self, endpoint, params, payload, immutable=False) -> None:
+        if self.cache is None or payload is None:
+            return
+        self.cache.put(cache_key(endpoint, params, self._cache_ns), endpoint, payload, immutable=immutable)
+
+    def _fetch(self, endpoint, params=None, retries=4, reserved=False):
         """Executes a GET request with strict 429 Rate Limit handling.
 
+        Every attempt first takes a token from the rate limiter; pass
+        reserved=True if the caller already acquired one for the first attempt.
+        A 429 pauses the endpoint family for Retry-After seconds (or a linear
+        backoff when the header is missing).
+
         Returns:
             Parsed JSON (dict/list) on success, else None.
 
@@ -38,16 +154,21 @@ class SynergyClient:
         self.last_error = None
 
         for attempt in range(retries):
+            if attempt > 0 or not reserved:
+                self.rate_limiter.acquire(endpoint)
             try:
-                response = requests.get(url, headers=self.headers, params=params, timeout=30)
+                response = self.session.get(url, headers=self.headers, params=params, timeout=30)
                 self.last_status_code = response.status_code
                 print(f"  < Status Code: {response.status_code}")
 
                 # 1. Handle Rate Limiting (429)
                 if response.status_code == 429:
-                    wait_time = (attempt + 1) * 2.5  # Backoff: 2.5s, 5s, 7.5s...
-                    print(f"      ⚠️ Rate limit hit (429). Pausing for {wait_time}s...")
-                    time.sleep(wait_time)
+                    wait_time = self.rate_limiter.on_rate_limited(
+                        endpoint,
+                        parse_retry_after(response.headers.get("Retry-After")),
+                        fallback=(attempt + 1) * 2.5,  # Backoff: 2.5s, 5s, 7.5s...
+                    )
+                    print(f"      ⚠️ Rate limit hit (429). Pausing for {wait_time:.1f}s...")
                     continue
 
                 # 2. Handle Server Errors (5xx)
@@ -85,10 +206,12 @@ class SynergyClient:
         # Spec: GET /{league}/seasons
         return self._get(f"/{league_code}/seasons")
 
-    def get_teams(self, league_code, season_id):
+    def get_teams(self, league_code, season_id, limit=500, skip: int | None = None):
         # Spec: GET /{league}/teams
         # We limit 'take' to 500 to avoid timeouts/heavy rate limits
-        params = {"seasonId": season_id, "take": 500} 
+        params = {"seasonId": season_id, "take": limit}
+        if skip is not None:
+            params["skip"] = skip
         return self._get(f"/{league_code}/teams", params=params)
 
     def get_games(self, league_code, season_id, team_id=None, limit=20, skip: int | None = None):
@@ -104,6 +227,11 @@ class SynergyClient:
 
         return self._get(f"/{league_code}/games", params=params)
 
-    def get_game_events(self, league_code, game_id):
+    def get_game_events(self, league_code, game_id, final: bool = False):
         # Spec: GET /{league}/games/{gameId}/events
-        return self._get(f"/{league_code}/games/{game_id}/events")
+        # Events of a finished game never change, so cache them indefinitely.
+        return self._get(f"/{league_code}/games/{game_id}/events", immutable=final)
+
+    def get_play_video(self, league_code, play_id):
+        # Licensed endpoint: GET /{league}/plays/{playId}/video
+        return self._get(f"/{league_code}/plays/{play_id}/video")
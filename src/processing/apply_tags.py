@@ -1,50 +1,64 @@
 import os
 import sys
-import sqlite3
 
 # Add project root to path so we can import the tagger
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
 
-from src.processing.play_tagger import tag_play
+from src.ingestion.db import connect_db, ensure_schema
+from src.processing.play_tagger import tag_plays_batch, tags_from_mask
+from src.processing.tag_index import write_play_tags
 
-DB_PATH = os.path.join(os.getcwd(), "data/skout.db")
+# Plays read, tagged and written per round; bounds memory on large databases
+BATCH_SIZE = 50_000
 
-def apply_tags():
+def apply_tags(batch_size=BATCH_SIZE):
     print("🧠 Starting Smart Tagging Process...")
-    conn = sqlite3.connect(DB_PATH)
+    conn = connect_db()
+    ensure_schema(conn)
     cursor = conn.cursor()
 
-    # 1. Fetch all plays that haven't been tagged yet (or all if you want to re-run)
-    # We grab the ID, Description, and Clock
-    cursor.execute("SELECT play_id, description, clock_seconds FROM plays")
-    all_plays = cursor.fetchall()
-    
-    print(f"📦 Processing {len(all_plays)} plays...")
-    
-    updates = []
+    total = cursor.execute("SELECT COUNT(*) FROM plays").fetchone()[0]
+    print(f"📦 Processing {total} plays...")
+
+    # Every play is re-tagged, so rebuild the index from scratch. plays.tags
+    # and play_tags change in one transaction, committed at the end.
+    if total:
+        print("💾 Saving tags to database...")
+        cursor.execute("DELETE FROM play_tags")
+
+    # 1. Stream all plays (re-run safe): the ID, Description, and Clock
+    reader = conn.execute("SELECT play_id, description, clock_seconds FROM plays")
     tagged_count = 0
-    
-    for row in all_plays:
-        p_id, desc, clock = row
-        
-        # Run the Tagger Logic
+    while True:
+        plays = reader.fetchmany(batch_size)
+        if not plays:
+            break
+
+        # Run the Tagger Logic: one pass over the batch's descriptions
         # Ensure clock is an int (it might be None in DB)
-        c_val = int(clock) if clock is not None and str(clock).isdigit() else None
-        
-        tags_list = tag_play(desc, c_val)
-        
-        if tags_list:
-            # Convert list ['3pt', 'missed'] -> string "3pt, missed"
+        clocks = [int(clock) if clock is not None and str(clock).isdigit() else None for _, _, clock in plays]
+        masks = tag_plays_batch([desc for _, desc, _ in plays], clocks)
+
+        updates = []
+        tag_rows = []
+        for (p_id, _, _), mask in zip(plays, masks, strict=True):
+            tags_list = tags_from_mask(mask)
+            # Always recorded, so plays that lost their tags drop out of the index
+            tag_rows.append((p_id, tags_list))
+
+            # Convert list ['3pt', 'missed'] -> string "3pt, missed"; untagged
+            # plays get "" (as ingestion writes them) so a stale string is cleared
             tags_str = ", ".join(tags_list)
-            updates.append((tags_str, p_id))
-            tagged_count += 1
+            updates.append((tags_str, p_id, tags_str))
+            if tags_list:
+                tagged_count += 1
 
-    # 2. Bulk Update
-    if updates:
-        print("💾 Saving tags to database...")
-        cursor.executemany("UPDATE plays SET tags = ? WHERE play_id = ?", updates)
-        conn.commit()
-    
+        # 2. Bulk Update (plays.tags string + play_tags index)
+        # Unchanged rows are skipped, so they don't churn the plays_fts triggers
+        cursor.executemany("UPDATE plays SET tags = ? WHERE play_id = ? AND tags IS NOT ?", updates)
+        write_play_tags(conn, tag_rows, replace=False)
+
+    conn.commit()
     conn.close()
     print(f"✅ Successfully tagged {tagged_count} plays.")
     print("   (Example: A play was labeled: '3pt, jumpshot, late_clock, missed')")
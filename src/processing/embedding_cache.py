@@ -0,0 +1,252 @@
+"""Query-embedding cache.
+
+Scouts re-issue the same handful of searches ("pick and roll ball handler",
+"post up", ...). EmbeddingCache keeps text -> embedding in an in-process
+LRU backed by a small SQLite file, so a warm query skips model inference
+entirely, also after a restart. Entries are keyed by model id (name plus
+revision, see model_id()), so changing the model never serves vectors from
+the old one. One file holds every model: the sentence-transformer search
+path and the CLIP text path (vibe_check) share it.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Callable
+
+from config.settings import (
+    EMBEDDING_CACHE_BYPASS,
+    EMBEDDING_CACHE_MAX_ROWS,
+    EMBEDDING_CACHE_MEMORY_ENTRIES,
+    TEXT_EMBEDDING_BACKEND,
+    TEXT_EMBEDDING_MODEL,
+)
+from src.ingestion.db import connect_db, data_dir
+
+
+def cache_path() -> str:
+    return os.path.join(data_dir(), "embedding_cache.db")
+
+
+def model_id(name: str, revision: str | None = None) -> str:
+    """Cache key prefix for a model; include the revision when it is known."""
+    return f"{name}@{revision}" if revision else name
+
+
+@lru_cache(maxsize=None)
+def hub_revision(repo_id: str, cache_dir: str | None = None) -> str | None:
+    """Commit hash of the Hugging Face snapshot `repo_id` loads from.
+
+    Read from the local hub cache; a model that was never downloaded gets
+    its config.json fetched to pin the revision. None for local model
+    directories, or when the hub cannot be reached.
+    """
+    if os.path.isdir(repo_id):
+        return None
+    try:
+        from huggingface_hub import hf_hub_download, try_to_load_from_cache
+
+        path = try_to_load_from_cache(repo_id, "config.json", cache_dir=cache_dir)
+        if not isinstance(path, str):
+            path = hf_hub_download(repo_id, "config.json", cache_dir=cache_dir)
+    except Exception:
+        return None
+    # <cache>/models--org--name/snapshots/<commit>/config.json
+    return os.path.basename(os.path.dirname(path))
+
+
+def text_model_id(backend: str = TEXT_EMBEDDING_BACKEND) -> str:
+    """Id of the sentence-transformer that indexes plays and embeds queries.
+
+    Includes the hub revision, so an upgraded checkpoint under the same
+    name gets a new id. Non-default inference backends (see text_backends)
+    get their own id, their vectors are close to but not identical with the
+    torch ones.
+    """
+    name = f"sentence-transformers/{TEXT_EMBEDDING_MODEL}"
+    # Bare names resolve to the sentence-transformers org, as in SentenceTransformer()
+    repo_id = TEXT_EMBEDDING_MODEL if "/" in TEXT_EMBEDDING_MODEL else name
+    revision = hub_revision(repo_id, os.getenv("SENTENCE_TRANSFORMERS_HOME"))
+    return model_id(name if backend == "torch" else f"{name}+{backend}", revision)
+
+
+class EmbeddingCache:
+    """Two-level (memory LRU, then SQLite) cache of text embeddings.
+
+    Vectors are stored as float32, which is what the models produce, so a
+    cached vector is identical to a freshly computed one. Thread-safe.
+    """
+
+    def __init__(
+        self,
+        path: str | None = None,
+        memory_entries: int = EMBEDDING_CACHE_MEMORY_ENTRIES,
+        max_rows: int = EMBEDDING_CACHE_MAX_ROWS,
+    ):
+        self.path = path or cache_path()
+        self.memory_entries = memory_entries
+        self.max_rows = max_rows
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        self._memory: OrderedDict[tuple[str, str], array] = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = connect_db(self.path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embeddings (
+                model TEXT NOT NULL,
+                text TEXT NOT NULL,
+                vector BLOB NOT NULL,
+                accessed_at REAL,
+                PRIMARY KEY (model, text)
+            ) WITHOUT ROWID
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_accessed ON embeddings(accessed_at)")
+        self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # ----------------------------
+    # Lookup
+    # ----------------------------
+
+    def get(self, model: str, text: str) -> list[float] | None:
+        key = (model, text)
+        with self._lock:
+            vector = self._memory.get(key)
+            if vector is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return vector.tolist()
+
+            row = self._conn.execute(
+                "SELECT vector FROM embeddings WHERE model = ? AND text = ?", key
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute(
+                "UPDATE embeddings SET accessed_at = ? WHERE model = ? AND text = ?",
+                (time.time(), model, text),
+            )
+            self._conn.commit()
+            vector = array("f")
+            vector.frombytes(row[0])
+            self._remember(key, vector)
+            self.hits += 1
+            self.disk_hits += 1
+        return vector.tolist()
+
+    def put(self, model: str, text: str, embedding) -> list[float]:
+        """Store an embedding; returns it as cached (float32-rounded)."""
+        vector = array("f", embedding)
+        with self._lock:
+            self._remember((model, text), vector)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO embeddings (model, text, vector, accessed_at) VALUES (?, ?, ?, ?)",
+                (model, text, vector.tobytes(), time.time()),
+            )
+            self._evict()
+            self._conn.commit()
+        return vector.tolist()
+
+    def get_or_compute(self, model: str, text: str, compute: Callable[[str], list[float]]) -> list[float]:
+        if EMBEDDING_CACHE_BYPASS:
+            return compute(text)
+        embedding = self.get(model, text)
+        if embedding is None:
+            # Return the stored value so cold and warm calls agree bit for bit.
+            embedding = self.put(model, text, compute(text))
+        return embedding
+
+    # ----------------------------
+    # Housekeeping
+    # ----------------------------
+
+    def _remember(self, key: tuple[str, str], vector: array) -> None:
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _evict(self) -> None:
+        """Drop least-recently-used rows down to 90% of max_rows."""
+        total = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        if total <= self.max_rows:
+            return
+        self._conn.execute(
+            """
+            DELETE FROM embeddings WHERE (model, text) IN (
+                SELECT model, text FROM embeddings ORDER BY accessed_at LIMIT ?
+            )
+            """,
+            (total - int(self.max_rows * 0.9),),
+        )
+
+    def clear(self, model: str | None = None) -> None:
+        with self._lock:
+            if model is None:
+                self._memory.clear()
+                self._conn.execute("DELETE FROM embeddings")
+            else:
+                for key in [k for k in self._memory if k[0] == model]:
+                    del self._memory[key]
+                self._conn.execute("DELETE FROM embeddings WHERE model = ?", (model,))
+            self._conn.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            rows = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "memory_hits": self.hits - self.disk_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "disk_entries": rows,
+            }
+
+
+_shared: dict[str, EmbeddingCache] = {}
+_shared_lock = threading.Lock()
+
+
+def shared_cache(path: str | None = None) -> EmbeddingCache:
+    """The process-wide cache for `path` (default data/embedding_cache.db)."""
+    path = path or cache_path()
+    with _shared_lock:
+        cache = _shared.get(path)
+        if cache is None:
+            cache = _shared[path] = EmbeddingCache(path)
+        return cache
+
+
+class CachedEmbedder:
+    """text -> embedding callable that only runs `encode` on a cache miss.
+
+    `encode` may load its model lazily, so a process that only sees warm
+    queries never loads the model at all.
+    """
+
+    def __init__(self, model: str, encode: Callable[[str], list[float]], cache: EmbeddingCache | None = None):
+        self.model = model
+        self.encode = encode
+        self.cache = cache or shared_cache()
+
+    def __call__(self, text: str) -> list[float]:
+        return self.cache.get_or_compute(self.model, text, self.encode)
+
+    def stats(self) -> dict:
+        return self.cache.stats()
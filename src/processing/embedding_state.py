@@ -0,0 +1,72 @@
+"""What is already in the skout_plays vector collection, per play.
+
+embedding_state holds one row per embedded play:
+- content_hash: hash of the model id and the exact embedded document
+  ("{description} [Tags: {tags}]"); when it changes the play is re-encoded
+- meta_hash: hash of the play fields stored as Chroma metadata; when only
+  this changes the metadata is updated without re-encoding
+- embedded_at: last time the row was written to Chroma
+
+generate_embeddings compares every play against its state row, so a run
+after a small ingest only encodes the new or edited plays and deletes the
+vectors of plays that are gone.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from typing import Iterable
+
+from src.ingestion.ingest_state import utc_now
+
+
+def content_hash(document: str, model: str) -> str:
+    return hashlib.sha1(f"{model}\0{document}".encode("utf-8")).hexdigest()
+
+
+def meta_hash(fields: tuple) -> str:
+    # Row values are str/int/float/None, whose repr is stable; cheaper than
+    # JSON on a full scan of plays.
+    return hashlib.sha1(repr(tuple(fields)).encode("utf-8")).hexdigest()
+
+
+def record_embedded(conn, rows: Iterable[tuple[str, str, str]]) -> None:
+    """Upsert (play_id, content_hash, meta_hash) rows. Does not commit."""
+    now = utc_now()
+    conn.executemany(
+        """
+        INSERT INTO embedding_state (play_id, content_hash, meta_hash, embedded_at)
+        VALUES (?, ?, ?, ?)
+        ON CONFLICT(play_id) DO UPDATE SET
+            content_hash = excluded.content_hash,
+            meta_hash = excluded.meta_hash,
+            embedded_at = excluded.embedded_at
+        """,
+        [(play_id, chash, mhash, now) for play_id, chash, mhash in rows],
+    )
+
+
+def removed_play_ids(conn) -> list[str]:
+    """Embedded plays that no longer exist in plays."""
+    return [
+        row[0]
+        for row in conn.execute(
+            """
+            SELECT s.play_id FROM embedding_state s
+            WHERE NOT EXISTS (SELECT 1 FROM plays p WHERE p.play_id = s.play_id)
+            """
+        )
+    ]
+
+
+def forget(conn, play_ids: Iterable[str]) -> None:
+    conn.executemany("DELETE FROM embedding_state WHERE play_id = ?", [(p,) for p in play_ids])
+
+
+def embedded_count(conn) -> int:
+    return conn.execute("SELECT COUNT(*) FROM embedding_state").fetchone()[0]
+
+
+def reset(conn) -> None:
+    """Forget everything (forces a full re-index on the next run)."""
+    conn.execute("DELETE FROM embedding_state")
@@ -0,0 +1,136 @@
+"""Multi-process CPU encoding for sentence-transformers.
+
+One SentenceTransformer.encode call uses a single process, which leaves most
+cores of a GPU-less ingest box idle. EncodePool starts `workers` processes,
+each loading its own copy of the model once (pool initializer) and pinned to
+`torch_threads` intra-op threads, so N workers x T threads roughly matches
+the core count instead of N processes all fighting over every core.
+
+Batches are encoded concurrently but always handed back in submission order,
+so callers can keep play ids next to each batch and zip them back up.
+With workers <= 1 everything runs in-process with the same interface. The
+model is loaded through text_backends, so TEXT_EMBEDDING_BACKEND applies.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Callable, Iterable, Iterator, Sequence
+
+from config.settings import (
+    EMBED_BATCH_SIZE,
+    EMBED_TORCH_THREADS,
+    EMBED_WORKERS,
+    TEXT_EMBEDDING_BACKEND,
+)
+from src.processing.text_backends import load_text_model
+
+_model = None
+
+
+def default_torch_threads(workers: int) -> int:
+    return max(1, (os.cpu_count() or 1) // max(1, workers))
+
+
+def _init_worker(model_name: str, backend: str, torch_threads: int) -> None:
+    global _model
+    _model = load_text_model(model_name, backend, device="cpu", torch_threads=torch_threads)
+
+
+def _encode_in_worker(texts: Sequence[str], batch_size: int):
+    return _model.encode(list(texts), batch_size=batch_size, convert_to_numpy=True)
+
+
+class EncodePool:
+    """Encode texts with `model_name` across worker processes.
+
+    torch_threads=0 splits the cores evenly between workers (and leaves torch
+    alone when running in-process).
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        workers: int = EMBED_WORKERS,
+        torch_threads: int = EMBED_TORCH_THREADS,
+        batch_size: int = EMBED_BATCH_SIZE,
+        backend: str = TEXT_EMBEDDING_BACKEND,
+    ):
+        self.model_name = model_name
+        self.backend = backend
+        self.workers = max(1, workers)
+        self.batch_size = batch_size
+        self.torch_threads = torch_threads
+        if self.workers > 1 and not torch_threads:
+            self.torch_threads = default_torch_threads(self.workers)
+        # Two batches per worker keeps every worker busy while results are collected
+        self.max_in_flight = 2 * self.workers
+
+        self._model = None
+        self._executor = None
+        if self.workers > 1:
+            # spawn: forking a process that already runs torch threads can deadlock
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(model_name, backend, self.torch_threads),
+            )
+        else:
+            self._model = load_text_model(model_name, backend, device="cpu", torch_threads=self.torch_threads)
+
+    def submit(self, texts: Sequence[str]) -> Future:
+        """Encode one batch; the Future resolves to a (len(texts), dim) array."""
+        if self._executor is not None:
+            return self._executor.submit(_encode_in_worker, list(texts), self.batch_size)
+        future: Future = Future()
+        try:
+            future.set_result(self._model.encode(list(texts), batch_size=self.batch_size, convert_to_numpy=True))
+        except Exception as exc:
+            future.set_exception(exc)
+        return future
+
+    def imap(self, batches: Iterable[Any], texts: Callable[[Any], Sequence[str]]) -> Iterator[tuple[Any, Any]]:
+        """Yield (batch, embeddings) in input order for each batch.
+
+        `texts(batch)` gives the strings to encode. At most max_in_flight
+        batches are pending at once, so a streaming input stays streaming.
+        """
+
+        if self._executor is None:
+            for batch in batches:
+                yield batch, self.submit(texts(batch)).result()
+            return
+
+        pending: deque[tuple[Any, Future]] = deque()
+        for batch in batches:
+            pending.append((batch, self.submit(texts(batch))))
+            if len(pending) >= self.max_in_flight:
+                done, future = pending.popleft()
+                yield done, future.result()
+        while pending:
+            done, future = pending.popleft()
+            yield done, future.result()
+
+    def encode(self, texts: Sequence[str]):
+        """Encode a list of any length, split into batches across the workers."""
+        import numpy as np
+
+        chunks = [list(texts[i : i + self.batch_size]) for i in range(0, len(texts), self.batch_size)]
+        if not chunks:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.concatenate([emb for _, emb in self.imap(chunks, texts=lambda chunk: chunk)])
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+    def __enter__(self) -> EncodePool:
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
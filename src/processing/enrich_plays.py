@@ -1,17 +1,29 @@
+import argparse
 import os
 import sys
+import threading
+
 import chromadb
 from tqdm import tqdm
 
 # Add project root to path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
 
-from src.processing.play_tagger import tag_play
+from config.settings import (
+    EMBED_QUEUE_DEPTH,
+    EMBED_TORCH_THREADS,
+    EMBED_WORKERS,
+    TEXT_EMBEDDING_MODEL,
+)
+from src.processing.play_tagger import tag_plays_batch, tags_from_mask
+from src.processing.streaming import BackgroundWriter, Throughput, peak_rss_mb
 
 # Try importing simple embedding model (SentenceTransformers)
 # If not installed, we fallback to simple tagging only.
 try:
-    from sentence_transformers import SentenceTransformer
+    import sentence_transformers  # noqa: F401
+
+    from src.processing.encode_pool import EncodePool
     HAS_ML = True
 except ImportError:
     HAS_ML = False
@@ -19,7 +31,7 @@ except ImportError:
     print("  pip install sentence-transformers")
 
 class PlayEnricher:
-    def __init__(self):
+    def __init__(self, workers=EMBED_WORKERS, torch_threads=EMBED_TORCH_THREADS):
         db_path = os.path.join(os.getcwd(), "data/vector_db")
         self.client = chromadb.PersistentClient(path=db_path)
         
@@ -27,74 +39,118 @@ class PlayEnricher:
         self.collection = self.client.get_collection(name="skout_game_plays")
         
         # Load Model (Small, fast, local model for sports text)
+        # workers > 1 encodes in that many processes, one model copy each
         if HAS_ML:
-            print("🔄 Loading AI Embedding Model (all-MiniLM-L6-v2)...")
-            self.model = SentenceTransformer('all-MiniLM-L6-v2')
+            print(f"🔄 Loading AI Embedding Model ({TEXT_EMBEDDING_MODEL}, {workers} worker(s))...")
+            self.pool = EncodePool(TEXT_EMBEDDING_MODEL, workers=workers, torch_threads=torch_threads, batch_size=100)
+
+    def close(self):
+        if HAS_ML:
+            self.pool.close()
+
+    def _pages(self, where, page_size):
+        """Yield (ids, documents, metadatas) pages of the plays matching `where`.
 
-    def enrich_all(self):
+        Pages are read while earlier ones are still being encoded or written.
+        With a filter, every written page drops out of the result set, so the
+        offset only skips pages that are read but not yet written back
+        (_write_back lowers it under the same lock).
+        """
+        while True:
+            with self._cursor_lock:
+                page = self.collection.get(
+                    where=where, limit=page_size, offset=self._offset, include=["documents", "metadatas"]
+                )
+                self._offset += len(page["ids"])
+            if not page["ids"]:
+                return
+            yield page["ids"], page["documents"], page["metadatas"]
+
+    def _write_back(self, update, filtered):
+        with self._cursor_lock:
+            self.collection.update(**update)
+            if filtered:
+                self._offset -= len(update["ids"])
+
+    def enrich_all(self, page_size=500, queue_depth=EMBED_QUEUE_DEPTH, full=False):
+        """Tag and embed plays page by page.
+
+        Only plays without is_enriched=True are read unless `full`, so an
+        interrupted run resumes after the last page written back. At most
+        the pages being encoded plus `queue_depth` waiting for write-back
+        are held in memory.
+        """
         print("\n🚀 Starting Play Enrichment (Tagging + Embeddings)...")
-        
-        # 1. Fetch all plays
-        # Note: In production with millions of plays, use pagination (limit/offset)
-        existing_data = self.collection.get()
-        ids = existing_data['ids']
-        documents = existing_data['documents']
-        metadatas = existing_data['metadatas']
-        
-        if not ids:
+
+        # `$ne` also matches plays ingested before is_enriched was written
+        where = None if full else {"is_enriched": {"$ne": True}}
+        total = self.collection.count()
+        if not total:
             print("❌ No plays found in database. Run ingestion first.")
             return
+        print(f"📦 {total} plays in collection; enriching {'all' if full else 'un-enriched'} plays "
+              f"(page size {page_size}).")
 
-        total = len(ids)
-        print(f"📦 Found {total} plays to process.")
+        self._offset = 0
+        self._cursor_lock = threading.Lock()
+        pages = self._pages(where, page_size)
 
-        # 2. Process Batch
-        # We update in batches to be safe
-        batch_size = 100
-        
-        for i in tqdm(range(0, total, batch_size), desc="Enriching Plays"):
-            batch_ids = ids[i : i + batch_size]
-            batch_docs = documents[i : i + batch_size]
-            batch_metas = metadatas[i : i + batch_size]
-            
-            # Arrays for update
-            new_embeddings = []
-            updated_metas = []
-
-            # A. Generate Embeddings (if ML available)
-            if HAS_ML:
-                # Embed the descriptions directly
-                embeddings = self.model.encode(batch_docs).tolist()
-                new_embeddings.extend(embeddings)
-
-            # B. Generate Tags
-            for j, doc in enumerate(batch_docs):
-                current_meta = batch_metas[j]
-                clock = current_meta.get("clock", None)
-                
-                # Run rule-based tagger
-                tags = tag_play(doc, clock)
-                
-                # Update Metadata
-                # Convert list to string for simple storage/filtering if needed, 
-                # or keep specific keys. Chroma handles basic lists, but comma-string is safer for some UIs.
-                current_meta["tags"] = ", ".join(tags)
-                current_meta["is_enriched"] = True
-                updated_metas.append(current_meta)
-
-            # 3. Write Updates back to Chroma
-            # valid args depend on what we have. If no ML, don't pass embeddings.
-            update_args = {
-                "ids": batch_ids,
-                "metadatas": updated_metas
-            }
-            if HAS_ML:
-                update_args["embeddings"] = new_embeddings
-
-            self.collection.update(**update_args)
-
-        print(f"\n✅ Successfully enriched {total} plays with AI & Tactics.")
+        # A. Generate Embeddings (if ML available)
+        # Embed the descriptions directly; the pool encodes ahead in its workers
+        # and hands pages back in order
+        if HAS_ML:
+            encoded = self.pool.imap(pages, texts=lambda page: page[1])
+        else:
+            encoded = ((page, None) for page in pages)
+
+        # C. Write updates back to Chroma on a background thread
+        speed = Throughput()
+        with tqdm(unit="play", desc="Enriching Plays") as progress, \
+                BackgroundWriter(lambda update: self._write_back(update, where is not None),
+                                 depth=queue_depth, name="enrich-update") as writer:
+            for (page_ids, page_docs, page_metas), embeddings in encoded:
+                # Arrays for update
+                updated_metas = []
+
+                # B. Generate Tags (rule-based tagger, one pass per page)
+                page_metas = [meta or {} for meta in page_metas]
+                masks = tag_plays_batch(page_docs, [meta.get("clock", None) for meta in page_metas])
+                for current_meta, mask in zip(page_metas, masks, strict=True):
+                    tags = tags_from_mask(mask)
+
+                    # Update Metadata
+                    # Convert list to string for simple storage/filtering if needed,
+                    # or keep specific keys. Chroma handles basic lists, but comma-string is safer for some UIs.
+                    current_meta["tags"] = ", ".join(tags)
+                    current_meta["is_enriched"] = True
+                    updated_metas.append(current_meta)
+
+                # valid args depend on what we have. If no ML, don't pass embeddings.
+                update_args = {
+                    "ids": page_ids,
+                    "metadatas": updated_metas
+                }
+                if HAS_ML:
+                    update_args["embeddings"] = embeddings
+
+                writer.submit(update_args)
+                speed.add(len(page_ids))
+                progress.update(len(page_ids))
+
+        print(f"\n✅ Successfully enriched {speed.count} plays with AI & Tactics in {speed.elapsed:.1f}s "
+              f"({speed.rate:.0f} plays/sec, peak RSS {peak_rss_mb():.0f} MB).")
 
 if __name__ == "__main__":
-    enricher = PlayEnricher()
-    enricher.enrich_all()
+    parser = argparse.ArgumentParser(description="Tag and embed the plays in skout_game_plays")
+    parser.add_argument("--page-size", type=int, default=500, help="plays read, encoded and written per page")
+    parser.add_argument("--queue-depth", type=int, default=EMBED_QUEUE_DEPTH, help="pages buffered for write-back")
+    parser.add_argument("--full", action="store_true", help="re-enrich every play, not only un-enriched ones")
+    parser.add_argument("--workers", type=int, default=EMBED_WORKERS, help="encode worker processes (1 = in-process)")
+    parser.add_argument("--torch-threads", type=int, default=EMBED_TORCH_THREADS, help="torch threads per worker (0 = cores / workers)")
+    args = parser.parse_args()
+
+    enricher = PlayEnricher(workers=args.workers, torch_threads=args.torch_threads)
+    try:
+        enricher.enrich_all(page_size=args.page_size, queue_depth=args.queue_depth, full=args.full)
+    finally:
+        enricher.close()
@@ -1,58 +1,173 @@
+import argparse
 import os
-import sqlite3
-import chromadb
-from sentence_transformers import SentenceTransformer
+import sys
 from tqdm import tqdm
 
-DB_PATH = os.path.join(os.getcwd(), "data/skout.db")
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from config.settings import (  # noqa: E402
+    EMBED_BATCH_SIZE,
+    EMBED_QUEUE_DEPTH,
+    EMBED_TORCH_THREADS,
+    EMBED_WORKERS,
+    TEXT_EMBEDDING_BACKEND,
+    TEXT_EMBEDDING_MODEL,
+)
+from src.ingestion.db import connect_db, ensure_schema  # noqa: E402
+from src.processing import embedding_state  # noqa: E402
+from src.processing.embedding_cache import text_model_id  # noqa: E402
+from src.processing.encode_pool import EncodePool  # noqa: E402
+from src.processing.streaming import BackgroundWriter, Throughput, iter_batches, peak_rss_mb  # noqa: E402
+from src.processing.tag_index import split_tags, tag_metadata  # noqa: E402
+from src.processing.text_backends import TEXT_BACKENDS  # noqa: E402
+from src.search.vector_store import MatrixStore, open_collection  # noqa: E402
+
 VECTOR_DB_PATH = os.path.join(os.getcwd(), "data/vector_db")
 
-def generate_embeddings():
-    print("🧠 Loading AI Model (all-MiniLM-L6-v2)...")
+# Play rows (the layout play_metadata expects) plus the stored hashes of
+# what is already embedded (NULL for new plays)
+PLAY_ROWS_SQL = """
+    SELECT p.play_id, p.description, p.tags, p.game_id, p.clock_display,
+           g.season_id, p.team_id, p.period, p.clock_seconds,
+           s.content_hash, s.meta_hash
+    FROM plays p
+    LEFT JOIN games g ON g.game_id = p.game_id
+    LEFT JOIN embedding_state s ON s.play_id = p.play_id
+"""
+
+def play_document(row):
+    # We combine description + tags to give the AI maximum context
+    # e.g. "Missed 3pt Jump Shot (PnR) [Tags: 3pt, pnr, missed]"
+    return f"{row[1]} [Tags: {row[2]}]"
+
+def play_metadata(row):
+    """Chroma metadata for a play row; the structured fields back search filters
+    (see src/search/filters.PlayFilters.chroma_where)."""
+    play_id, desc, tags, game_id, clock, season_id, team_id, period, clock_seconds = row[:9]
+    meta = {"game_id": game_id, "clock": clock, "tags": tags, "original_desc": desc}
+    # Chroma rejects None metadata values
+    for key, value in (("season_id", season_id), ("team_id", team_id), ("period", period), ("clock_seconds", clock_seconds)):
+        if value is not None:
+            meta[key] = value
+    meta.update(tag_metadata(split_tags(tags)))
+    return meta
+
+def remove_deleted_plays(conn, collection, batch_size):
+    """Drop the vectors of plays that no longer exist in skout.db."""
+    removed = embedding_state.removed_play_ids(conn)
+    for i in range(0, len(removed), batch_size):
+        chunk = removed[i:i + batch_size]
+        collection.delete(ids=chunk)
+        embedding_state.forget(conn, chunk)
+        conn.commit()
+    return len(removed)
+
+def generate_embeddings(batch_size=EMBED_BATCH_SIZE, queue_depth=EMBED_QUEUE_DEPTH, full=False,
+                        workers=EMBED_WORKERS, torch_threads=EMBED_TORCH_THREADS, backend=TEXT_EMBEDDING_BACKEND):
+    print(f"🧠 Loading AI Model ({TEXT_EMBEDDING_MODEL} on {backend}, {workers} worker(s))...")
     # This acts as a local, offline "Brain" for the system
-    model = SentenceTransformer('all-MiniLM-L6-v2')
-    
-    # Initialize Vector DB
-    client = chromadb.PersistentClient(path=VECTOR_DB_PATH)
-    collection = client.get_or_create_collection(name="skout_plays")
-
-    # Fetch Data
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute("SELECT play_id, description, tags, game_id, clock_display FROM plays")
-    rows = cursor.fetchall()
+    # (search queries are embedded with the same model, see src/search/hybrid.py)
+    pool = EncodePool(TEXT_EMBEDDING_MODEL, workers=workers, torch_threads=torch_threads, batch_size=batch_size, backend=backend)
+    model_key = text_model_id(backend)
+
+    # Initialize Vector DB (Chroma or the in-process matrix store, see VECTOR_STORE_BACKEND)
+    collection = open_collection("skout_plays", VECTOR_DB_PATH)
+
+    conn = connect_db()
+    ensure_schema(conn)
+    if full or (collection.count() == 0 and embedding_state.embedded_count(conn)):
+        # Forced, or the collection was wiped: the recorded state no longer describes it
+        print("♻️  Full re-index: clearing embedding state.")
+        embedding_state.reset(conn)
+        conn.commit()
+
+    removed = remove_deleted_plays(conn, collection, batch_size)
+
+    # Stream plays with a cursor: only one batch of rows is in memory at a time
+    total = conn.execute("SELECT COUNT(*) FROM plays").fetchone()[0]
+    cursor = conn.execute(PLAY_ROWS_SQL)
+
+    print(f"📦 Checking {total} plays against the Vector Database (batch size {batch_size})...")
+
+    # State is recorded only after Chroma accepted the batch, from the writer thread
+    state_conn = connect_db(check_same_thread=False)
+
+    def write(batch):
+        ids, embeddings, documents, metadatas, hashes = batch
+        if embeddings is None:
+            collection.update(ids=ids, metadatas=metadatas)
+        else:
+            collection.upsert(ids=ids, embeddings=embeddings, documents=documents, metadatas=metadatas)
+        embedding_state.record_embedded(state_conn, hashes)
+        state_conn.commit()
+
+    def submit(items, embeddings):
+        # items: (play_id, document, metadata, content_hash, meta_hash)
+        writer.submit((
+            [item[0] for item in items], embeddings, [item[1] for item in items] if embeddings is not None else None,
+            [item[2] for item in items], [(item[0], item[3], item[4]) for item in items],
+        ))
+
+    counts = {"updated": 0, "unchanged": 0}
+
+    def changed_batches():
+        """Batches of plays to (re-)embed; metadata-only changes go straight to the writer."""
+        to_embed, to_update = [], []
+        for batch in iter_batches(cursor, batch_size):
+            for row in batch:
+                document = play_document(row)
+                chash = embedding_state.content_hash(document, model_key)
+                mhash = embedding_state.meta_hash(row[1:9])
+                if chash == row[9] and mhash == row[10]:
+                    counts["unchanged"] += 1
+                    continue
+                item = (row[0], document, play_metadata(row), chash, mhash)
+                if chash != row[9]:
+                    to_embed.append(item)
+                else:
+                    to_update.append(item)
+                    counts["updated"] += 1
+            if len(to_embed) >= batch_size:
+                yield to_embed
+                to_embed = []
+            if len(to_update) >= batch_size:
+                submit(to_update, None)
+                to_update = []
+            progress.update(len(batch))
+        if to_embed:
+            yield to_embed
+        if to_update:
+            submit(to_update, None)
+
+    # Batches are encoded (in the pool) while earlier ones are written to Chroma;
+    # results come back in order, still paired with their play ids
+    speed = Throughput()
+    with pool, tqdm(total=total, unit="play") as progress, \
+            BackgroundWriter(write, depth=queue_depth, name="chroma-upsert") as writer:
+        for items, embeddings in pool.imap(changed_batches(), texts=lambda items: [item[1] for item in items]):
+            submit(items, embeddings)
+            speed.add(len(items))
     conn.close()
+    state_conn.close()
+    if isinstance(collection, MatrixStore):
+        # Saves the filter columns and (once large enough) the HNSW graph
+        collection.persist()
 
-    print(f"📦 Indexing {len(rows)} plays into Vector Database...")
-
-    batch_size = 100
-    for i in tqdm(range(0, len(rows), batch_size)):
-        batch = rows[i:i+batch_size]
-        
-        ids = [r[0] for r in batch]
-        
-        # We combine description + tags to give the AI maximum context
-        # e.g. "Missed 3pt Jump Shot (PnR) [Tags: 3pt, pnr, missed]"
-        documents = [f"{r[1]} [Tags: {r[2]}]" for r in batch]
-        
-        metadatas = [
-            {"game_id": r[3], "clock": r[4], "tags": r[2], "original_desc": r[1]} 
-            for r in batch
-        ]
-
-        # Generate Embeddings
-        embeddings = model.encode(documents).tolist()
-
-        # Save to Chroma
-        collection.upsert(
-            ids=ids,
-            embeddings=embeddings,
-            documents=documents,
-            metadatas=metadatas
-        )
-
-    print(f"✅ Successfully indexed {len(rows)} plays.")
+    print(f"✅ Embedded {speed.count} new/changed plays in {speed.elapsed:.1f}s "
+          f"({speed.rate:.0f} plays/sec, peak RSS {peak_rss_mb():.0f} MB).")
+    print(f"   {counts['updated']} metadata updates, {counts['unchanged']} unchanged, {removed} removed.")
     print("   The system is now ready for Semantic Search.")
 
 if __name__ == "__main__":
-    generate_embeddings()
+    parser = argparse.ArgumentParser(description="Embed plays into the Chroma vector DB")
+    parser.add_argument("--batch-size", type=int, default=EMBED_BATCH_SIZE, help="plays per encode/upsert batch")
+    parser.add_argument("--queue-depth", type=int, default=EMBED_QUEUE_DEPTH, help="encoded batches buffered for the writer")
+    parser.add_argument("--full", action="store_true", help="re-embed every play, ignoring the stored hashes")
+    parser.add_argument("--workers", type=int, default=EMBED_WORKERS, help="encode worker processes (1 = in-process)")
+    parser.add_argument("--torch-threads", type=int, default=EMBED_TORCH_THREADS, help="torch threads per worker (0 = cores / workers)")
+    parser.add_argument("--backend", choices=TEXT_BACKENDS, default=TEXT_EMBEDDING_BACKEND,
+                        help="inference backend; must match the one search queries use")
+    args = parser.parse_args()
+    generate_embeddings(batch_size=args.batch_size, queue_depth=args.queue_depth, full=args.full,
+                        workers=args.workers, torch_threads=args.torch_threads, backend=args.backend)
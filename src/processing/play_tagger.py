@@ -1,69 +1,294 @@
-def tag_play(description: str, clock_seconds: int = None) -> list[str]:
+"""Rule-based tactical tags for play descriptions.
+
+The rules are data: KEYWORDS maps each feature to the substrings that
+signal it, TAG_RULES says which features a tag needs and which ones
+suppress it, and CLOCK_RULES adds the end-of-period tags. All keywords are
+compiled into one regex that finds every feature in a single pass over the
+lowercased description, with plain substring semantics even where keywords
+overlap (see _compile_tokens). Feature sets resolve to tags once and are
+cached.
+
+tag_plays_batch() tags many plays with one regex pass over the joined
+descriptions and returns TAG_BITS bitmasks; tag_play() wraps it for one
+play. scripts/check_play_tagger.py holds both to a golden fixture recorded
+from the original if/elif tagger.
+"""
+
+from __future__ import annotations
+
+import re
+from functools import lru_cache
+from typing import Iterable, Sequence
+
+# Every tag tag_play() can emit, in a fixed order. Filters and the play_tags
+# index validate against this list; add new tags here when adding rules.
+TAG_VOCAB = (
+    "pnr",
+    "iso",
+    "handoff",
+    "post_up",
+    "drive",
+    "cut",
+    "3pt",
+    "jumpshot",
+    "dunk",
+    "layup",
+    "rim_finish",
+    "made",
+    "score",
+    "missed",
+    "turnover",
+    "live_ball_turnover",
+    "rebound",
+    "oreb",
+    "dreb",
+    "foul",
+    "transition",
+    "late_clock",
+    "buzzer_beater_scenario",
+)
+
+# Bit positions are stored in skout.db, so TAG_VOCAB is append-only.
+TAG_BITS = {tag: 1 << i for i, tag in enumerate(TAG_VOCAB)}
+
+# feature -> substrings of the lowercased description that signal it
+KEYWORDS = {
+    "pnr": ("screen", "pick"),
+    "iso": ("isolation", "iso"),
+    "handoff": ("handoff", "dho"),
+    "post": ("post",),
+    "drive": ("drive",),
+    "cut": ("cut",),
+    "three": ("3pt", "3-pt", "three"),
+    "dunk": ("dunk",),
+    "layup": ("layup",),
+    "jumper": ("jumper", "jump shot"),
+    "made": ("made",),
+    "missed": ("missed",),
+    "turnover": ("turnover",),
+    "steal": ("steal",),
+    "rebound": ("rebound",),
+    "offensive": ("offensive",),
+    "foul": ("foul",),
+    "transition": ("fast break", "transition"),
+}
+
+# (tag, features that must all be present, features that must be absent).
+# A tag is set when any of its rules holds; the absent lists encode the
+# shot-type and outcome precedence (a 3pt dunk is a 3pt shot).
+TAG_RULES = (
+    # --- OFFENSIVE ACTIONS ---
+    ("pnr", ("pnr",), ()),
+    ("iso", ("iso",), ()),
+    ("handoff", ("handoff",), ()),
+    ("post_up", ("post",), ()),
+    ("drive", ("drive",), ()),
+    ("cut", ("cut",), ()),
+    # --- SHOT TYPES ---
+    ("3pt", ("three",), ()),
+    ("jumpshot", ("three",), ()),
+    ("dunk", ("dunk",), ("three",)),
+    ("rim_finish", ("dunk",), ("three",)),
+    ("layup", ("layup",), ("three", "dunk")),
+    ("rim_finish", ("layup",), ("three", "dunk")),
+    ("jumpshot", ("jumper",), ("three", "dunk", "layup")),
+    # --- OUTCOMES ---
+    ("made", ("made",), ()),
+    ("score", ("made",), ()),
+    ("missed", ("missed",), ("made",)),
+    ("turnover", ("turnover",), ()),
+    ("live_ball_turnover", ("turnover", "steal"), ()),
+    ("rebound", ("rebound",), ()),
+    ("oreb", ("rebound", "offensive"), ()),
+    ("dreb", ("rebound",), ("offensive",)),
+    ("foul", ("foul",), ()),
+    # --- TRANSITION / CONTEXT ---
+    ("transition", ("transition",), ()),
+)
+
+# (tag, limit): set when 0 < clock_seconds <= limit (seconds left in the period)
+CLOCK_RULES = (
+    ("late_clock", 5),
+    ("buzzer_beater_scenario", 2),
+)
+
+FEATURE_BITS = {feature: 1 << i for i, feature in enumerate(KEYWORDS)}
+_KEYWORD_FEATURE = {keyword: feature for feature, keywords in KEYWORDS.items() for keyword in keywords}
+# Joins descriptions in a batch; no keyword contains it, so no match spans two plays
+_SEPARATOR = "\x00"
+# Stands in for a NUL inside a description, so it can't split the batch; like
+# the NUL it replaces it is in no keyword, so the tags don't change
+_SEPARATOR_STANDIN = "\ufffd"
+
+
+def _compile_tokens() -> dict[str, int]:
+    """Regex tokens -> feature bits (negative: re-check the play exactly).
+
+    A plain scan resumes after each match, so a keyword starting inside
+    another one is skipped: "iso" inside "isolation" (handled here by giving
+    "isolation" the bits of every keyword it contains) or "offensive"
+    overlapping the end of "iso" in "isoffensive". Every such two-keyword
+    overlap is added as a composite token, and because the longest token
+    matching at a position wins, it beats the shorter keyword there. So a
+    plain scan without composite matches is exact, and the rare play with
+    one is re-scanned with the overlapping lookahead pattern.
     """
-    Analyzes a play description and game clock to assign tactical tags.
+
+    tokens = {}
+    for keyword in _KEYWORD_FEATURE:
+        bits = 0
+        for other, other_feature in _KEYWORD_FEATURE.items():
+            if other in keyword:
+                bits |= FEATURE_BITS[other_feature]
+        tokens[keyword] = bits
+    for first, first_feature in _KEYWORD_FEATURE.items():
+        for second, second_feature in _KEYWORD_FEATURE.items():
+            if first_feature == second_feature:
+                continue
+            for k in range(1, len(first)):
+                tail = first[k:]
+                if len(second) > len(tail) and second.startswith(tail):
+                    tokens.setdefault(first[:k] + second, -1)
+    return tokens
+
+
+def _trie_pattern(words) -> str:
+    """Regex matching any of `words`, factored into a prefix trie.
+
+    Python's re tries alternatives one by one, so "post|posteal|pick" costs
+    three attempts per candidate position where "p(?:ost(?:eal)?|ick)"
+    costs one; greedy `?` keeps the longest-token-first behaviour.
     """
-    tags = set()
-    desc = (description or "").lower()
 
-    # --- OFFENSIVE ACTIONS ---
-    if "screen" in desc or "pick" in desc:
-        tags.add("pnr")  # Pick and Roll
-    if "isolation" in desc or "iso" in desc:
-        tags.add("iso")
-    if "handoff" in desc or "dho" in desc:
-        tags.add("handoff")
-    if "post" in desc:
-        tags.add("post_up")
-    if "drive" in desc:
-        tags.add("drive")
-    if "cut" in desc:
-        tags.add("cut")
+    trie: dict = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}
 
-    # --- SHOT TYPES ---
-    if "3pt" in desc or "3-pt" in desc or "three" in desc:
-        tags.add("3pt")
-        tags.add("jumpshot")
-    elif "dunk" in desc:
-        tags.add("dunk")
-        tags.add("rim_finish")
-    elif "layup" in desc:
-        tags.add("layup")
-        tags.add("rim_finish")
-    elif "jumper" in desc or "jump shot" in desc:
-        tags.add("jumpshot")
+    def build(node) -> str:
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{body})?" if "" in node else body
 
-    # --- OUTCOMES ---
-    if "made" in desc:
-        tags.add("made")
-        tags.add("score")
-    elif "missed" in desc:
-        tags.add("missed")
-    
-    if "turnover" in desc:
-        tags.add("turnover")
-        if "steal" in desc:
-            tags.add("live_ball_turnover")
-            
-    if "rebound" in desc:
-        tags.add("rebound")
-        if "offensive" in desc:
-            tags.add("oreb")
-        else:
-            tags.add("dreb")
-            
-    if "foul" in desc:
-        tags.add("foul")
+    return build(trie)
 
-    # --- TRANSITION / CONTEXT ---
-    if "fast break" in desc or "transition" in desc:
-        tags.add("transition")
-    
-    # --- CLOCK SITUATIONS ---
-    # Assuming clock_seconds is seconds remaining in the period
+
+_TOKENS = _compile_tokens()
+_SCAN = re.compile(_trie_pattern([_SEPARATOR, *_TOKENS]))
+# token -> one-character code, and code -> feature bits
+_CODES = {_SEPARATOR: _SEPARATOR, **{token: chr(i + 1) for i, token in enumerate(_TOKENS)}}
+_CODE_BITS = {_CODES[token]: bits for token, bits in _TOKENS.items()}
+# Tries every position; only used for plays flagged by a composite token
+_EXACT_SCAN = re.compile(
+    "(?=(" + "|".join(re.escape(k) for k in sorted(_KEYWORD_FEATURE, key=len, reverse=True)) + "))"
+)
+_CLOCK_RULES = tuple((TAG_BITS[tag], limit) for tag, limit in CLOCK_RULES)
+_CLOCK_MAX = max(limit for _, limit in CLOCK_RULES)
+
+
+def _compile_rules():
+    rules = []
+    for tag, required, absent in TAG_RULES:
+        need = 0
+        for feature in required:
+            need |= FEATURE_BITS[feature]
+        block = 0
+        for feature in absent:
+            block |= FEATURE_BITS[feature]
+        rules.append((need, block, TAG_BITS[tag]))
+    return tuple(rules)
+
+
+_RULES = _compile_rules()
+
+
+@lru_cache(maxsize=None)
+def _tags_for_features(features: int) -> int:
+    mask = 0
+    for need, block, bit in _RULES:
+        if features & need == need and not features & block:
+            mask |= bit
+    return mask
+
+
+def _clock_mask(clock_seconds) -> int:
+    mask = 0
     if clock_seconds is not None:
-        if 0 < clock_seconds <= 5:
-            tags.add("late_clock")
-        if 0 < clock_seconds <= 2:
-            tags.add("buzzer_beater_scenario")
+        for bit, limit in _CLOCK_RULES:
+            if 0 < clock_seconds <= limit:
+                mask |= bit
+    return mask
+
+
+def _exact_features(desc: str) -> int:
+    features = 0
+    for keyword in _EXACT_SCAN.findall(desc):
+        features |= FEATURE_BITS[_KEYWORD_FEATURE[keyword]]
+    return features
+
+
+@lru_cache(maxsize=65536)
+def _codes_mask(codes: str) -> int:
+    """Tag mask for one play's token codes (see _CODES); -1: re-check exactly."""
+    features = 0
+    for code in codes:
+        bits = _CODE_BITS[code]
+        if bits < 0:
+            return -1
+        features |= bits
+    return _tags_for_features(features)
+
+
+def _text_mask(desc: str) -> int:
+    desc = desc.replace(_SEPARATOR, _SEPARATOR_STANDIN)
+    mask = _codes_mask("".join(map(_CODES.__getitem__, _SCAN.findall(desc))))
+    return mask if mask >= 0 else _tags_for_features(_exact_features(desc))
 
-    return sorted(list(tags))
+
+def tag_plays_batch(descriptions: Sequence[str | None], clocks: Iterable | None = None) -> list[int]:
+    """TAG_BITS bitmask per play, for parallel lists of descriptions and clocks.
+
+    All descriptions are scanned in one regex pass, so this is the call for
+    bulk (re-)tagging; clocks may be None (no clock tags).
+    """
+
+    lowered = [(description or "").lower() for description in descriptions]
+    if not lowered:
+        return []
+    joined = _SEPARATOR.join(lowered)
+    if joined.count(_SEPARATOR) != len(lowered) - 1:
+        lowered = [desc.replace(_SEPARATOR, _SEPARATOR_STANDIN) for desc in lowered]
+        joined = _SEPARATOR.join(lowered)
+    # Every token becomes one character and the separator stays itself, so
+    # splitting the code string gives each play's tokens; plays share the
+    # handful of distinct token sequences through the _codes_mask cache.
+    codes = "".join(map(_CODES.__getitem__, _SCAN.findall(joined)))
+    masks = list(map(_codes_mask, codes.split(_SEPARATOR)))
+    for i, mask in enumerate(masks):
+        if mask < 0:
+            masks[i] = _tags_for_features(_exact_features(lowered[i]))
+
+    if clocks is not None:
+        for i, clock_seconds in enumerate(clocks):
+            if clock_seconds is not None and clock_seconds <= _CLOCK_MAX:
+                masks[i] |= _clock_mask(clock_seconds)
+    return masks
+
+
+@lru_cache(maxsize=4096)
+def tags_from_mask(mask: int) -> list[str]:
+    """Bitmask -> sorted tag names (the tag_play() output; shared, do not mutate)."""
+    return sorted(tag for tag, bit in TAG_BITS.items() if mask & bit)
+
+
+def tag_play(description: str, clock_seconds: int = None) -> list[str]:
+    """
+    Analyzes a play description and game clock to assign tactical tags.
+    """
+    mask = _text_mask((description or "").lower()) | _clock_mask(clock_seconds)
+    # Copy: callers may mutate the list, the cached one is shared
+    return list(tags_from_mask(mask))
@@ -0,0 +1,107 @@
+"""Streaming helpers for the embedding/enrichment jobs.
+
+Those jobs read plays in batches, run a model over each batch and write the
+result to Chroma. iter_batches() keeps the read side at one batch in memory;
+BackgroundWriter runs the write side on its own thread behind a bounded
+queue, so encoding batch N+1 overlaps the upsert of batch N while at most
+`depth` encoded batches are ever waiting.
+"""
+
+from __future__ import annotations
+
+import queue
+import resource
+import sys
+import threading
+import time
+from typing import Any, Callable, Iterator
+
+_DONE = object()
+
+
+def iter_batches(cursor, batch_size: int) -> Iterator[list]:
+    """Yield lists of up to batch_size rows from an executed DB-API cursor."""
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            return
+        yield rows
+
+
+class BackgroundWriter:
+    """Apply `write(item)` on a worker thread, in submission order.
+
+    submit() blocks while `depth` items are already queued (back-pressure
+    instead of unbounded buffering) and re-raises the first error raised by
+    `write`. Use as a context manager: leaving the block drains the queue.
+    """
+
+    def __init__(self, write: Callable[[Any], None], depth: int = 2, name: str = "background-writer"):
+        self.write = write
+        self._queue: queue.Queue = queue.Queue(maxsize=max(1, depth))
+        self._error: BaseException | None = None
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is _DONE:
+                return
+            if self._error is None:
+                try:
+                    self.write(item)
+                except BaseException as exc:  # surfaced to the producer in submit()/close()
+                    self._error = exc
+
+    def _raise_if_failed(self) -> None:
+        if self._error is not None:
+            raise self._error
+
+    def submit(self, item: Any) -> None:
+        self._raise_if_failed()
+        self._queue.put(item)
+
+    def close(self) -> None:
+        """Wait for queued items to be written; re-raises a write error."""
+        if self._thread.is_alive():
+            self._queue.put(_DONE)
+            self._thread.join()
+        self._raise_if_failed()
+
+    def __enter__(self) -> BackgroundWriter:
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+            return
+        # The producer failed: stop after what is already queued, keep its error.
+        self._queue.put(_DONE)
+        self._thread.join()
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KB on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+class Throughput:
+    """Items/sec counter for progress reports."""
+
+    def __init__(self):
+        self.count = 0
+        self.started = time.perf_counter()
+
+    def add(self, n: int) -> None:
+        self.count += n
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    @property
+    def rate(self) -> float:
+        return self.count / self.elapsed if self.elapsed > 0 else 0.0
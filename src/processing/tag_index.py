@@ -0,0 +1,156 @@
+"""Normalized play tags: the play_tags inverted index.
+
+plays.tags keeps the human-readable "3pt, jumpshot, missed" string (it is
+what goes into the embedding text and Chroma metadata); play_tags holds one
+(tag, play_id, tag_mask) row per tag so tag filters never need LIKE scans.
+
+The table is clustered on (tag, play_id) and every row carries the play's
+full tag set as a bitmask over TAG_VOCAB. A conjunctive filter such as
+"made pnr 3pt in late clock" therefore reads only the range of its rarest
+tag and checks the other tags with one AND per row, with no joins or
+per-play lookups. play_tag_counts (maintained by triggers) says which tag
+is rarest.
+"""
+
+from __future__ import annotations
+
+from typing import Iterable, Sequence
+
+# TAG_BITS positions are stored in skout.db, so TAG_VOCAB is append-only.
+from src.processing.play_tagger import TAG_BITS, TAG_VOCAB
+
+
+def split_tags(tags: str | None) -> list[str]:
+    """Legacy plays.tags string -> list of tags."""
+    return [t.strip() for t in (tags or "").split(",") if t.strip()]
+
+
+def tag_metadata(tags: Iterable[str]) -> dict[str, bool]:
+    """Vector-store metadata flags: {"tag_<tag>": bool} for every tag in TAG_VOCAB.
+
+    All flags are stored (not just the True ones) so "without tag" filters
+    can match on False.
+    """
+    present = set(tags)
+    return {f"tag_{tag}": tag in present for tag in TAG_VOCAB}
+
+
+def validate_tags(tags: Iterable[str]) -> list[str]:
+    tags = list(dict.fromkeys(tags))
+    unknown = [t for t in tags if t not in TAG_BITS]
+    if unknown:
+        raise ValueError(f"Unknown tag(s) {unknown}; expected one of {list(TAG_VOCAB)}")
+    return tags
+
+
+def tag_mask(tags: Iterable[str]) -> int:
+    mask = 0
+    for tag in validate_tags(tags):
+        mask |= TAG_BITS[tag]
+    return mask
+
+
+def write_play_tags(conn, tagged: Iterable[tuple[str, Sequence[str]]], replace: bool = True) -> int:
+    """Write play_tags rows for each (play_id, tags) pair.
+
+    replace=True first drops the existing rows of those plays; pass False
+    when the table was just cleared for a full rebuild. Does not commit; the
+    caller owns the transaction (so plays.tags and play_tags change
+    together). Returns the number of tag rows written.
+    """
+
+    tagged = list(tagged)
+    if not tagged:
+        return 0
+
+    if replace:
+        conn.executemany("DELETE FROM play_tags WHERE play_id = ?", [(play_id,) for play_id, _ in tagged])
+
+    rows = []
+    for play_id, tags in tagged:
+        mask = tag_mask(tags)
+        rows.extend((tag, play_id, mask) for tag in dict.fromkeys(tags))
+    conn.executemany(
+        """
+        INSERT INTO play_tags (tag, play_id, tag_mask) VALUES (?, ?, ?)
+        ON CONFLICT(tag, play_id) DO UPDATE SET tag_mask = excluded.tag_mask
+        """,
+        rows,
+    )
+    return len(rows)
+
+
+def backfill_play_tags(conn, batch_size: int = 10_000) -> int:
+    """Populate play_tags from the legacy plays.tags strings (schema migration 3).
+
+    Tags outside TAG_VOCAB are skipped.
+    """
+
+    total = 0
+    cur = conn.execute("SELECT play_id, tags FROM plays WHERE tags IS NOT NULL AND tags != ''")
+    while True:
+        chunk = cur.fetchmany(batch_size)
+        if not chunk:
+            return total
+        tagged = [(play_id, [t for t in split_tags(tags) if t in TAG_BITS]) for play_id, tags in chunk]
+        total += write_play_tags(conn, tagged, replace=False)
+
+
+def tag_counts(conn) -> dict[str, int]:
+    return dict(conn.execute("SELECT tag, n FROM play_tag_counts WHERE n > 0").fetchall())
+
+
+def rarest_tag(conn, tags: Sequence[str]) -> str:
+    counts = dict(
+        conn.execute(
+            f"SELECT tag, n FROM play_tag_counts WHERE tag IN ({','.join('?' * len(tags))})",
+            list(tags),
+        ).fetchall()
+    )
+    return min(tags, key=lambda tag: counts.get(tag, 0))
+
+
+def tag_filter_sql(
+    all_of: Sequence[str],
+    none_of: Sequence[str] = (),
+    driver: str | None = None,
+) -> tuple[str, list]:
+    """SQL selecting play_id for plays carrying every tag in all_of and none in none_of.
+
+    `driver` is the all_of tag whose range is scanned (default: the first;
+    plays_with_tags() picks the rarest). Usable as a subquery, e.g.
+    `... WHERE play_id IN (<sql>)`.
+    """
+
+    all_of = validate_tags(all_of)
+    if not all_of:
+        raise ValueError("all_of needs at least one tag")
+    driver = driver or all_of[0]
+    if driver not in all_of:
+        raise ValueError(f"driver {driver!r} must be one of all_of")
+
+    required = tag_mask(all_of)
+    excluded = tag_mask(none_of)
+    sql = "SELECT play_id FROM play_tags WHERE tag = ? AND (tag_mask & ?) = ?"
+    params: list = [driver, required, required]
+    if excluded:
+        sql += " AND (tag_mask & ?) = 0"
+        params.append(excluded)
+    return sql, params
+
+
+def plays_with_tags(
+    conn,
+    all_of: Sequence[str],
+    none_of: Sequence[str] = (),
+    limit: int | None = None,
+) -> list[str]:
+    """play_ids having all tags in all_of and none in none_of (sorted by play_id)."""
+
+    all_of = validate_tags(all_of)
+    driver = rarest_tag(conn, all_of) if len(all_of) > 1 else None
+    sql, params = tag_filter_sql(all_of, none_of, driver=driver)
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(int(limit))
+    return [row[0] for row in conn.execute(sql, params)]
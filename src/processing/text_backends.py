@@ -0,0 +1,117 @@
+"""Inference backends for the play text embedding model.
+
+generate_embeddings, enrich_plays (through EncodePool) and query-time search
+(src/search/hybrid.text_query_embedder) all load TEXT_EMBEDDING_MODEL with
+load_text_model(), so TEXT_EMBEDDING_BACKEND switches all three at once:
+
+- torch:      SentenceTransformer on PyTorch, fp32 (the reference)
+- torch-int8: the same model with nn.Linear layers dynamically quantized
+              to int8 (torch.ao.quantization.quantize_dynamic)
+- onnx:       ONNX Runtime (sentence-transformers backend="onnx"; the model
+              is exported on first use if the repo has no ONNX file)
+- onnx-int8:  ONNX Runtime with the dynamically quantized int8 export
+              (TEXT_EMBEDDING_ONNX_INT8_FILE); exported and quantized under
+              data/models/ when the model repo does not ship it
+
+Backends produce slightly different vectors, so the backend is part of the
+model id used by the embedding cache and embedding_state (text_model_id()):
+switching it re-embeds the corpus rather than mixing vectors. Check
+cosine_agreement() with scripts/bench_text_backends.py first.
+"""
+
+from __future__ import annotations
+
+import os
+
+from config.settings import (
+    TEXT_EMBEDDING_BACKEND,
+    TEXT_EMBEDDING_MODEL,
+    TEXT_EMBEDDING_ONNX_INT8_FILE,
+)
+from src.ingestion.db import data_dir
+
+TEXT_BACKENDS = ("torch", "torch-int8", "onnx", "onnx-int8")
+
+
+def validate_backend(backend: str) -> str:
+    if backend not in TEXT_BACKENDS:
+        raise ValueError(f"Unknown text embedding backend {backend!r}; expected one of {list(TEXT_BACKENDS)}")
+    return backend
+
+
+def _onnx_int8_config(file_name: str) -> str:
+    # onnx/model_qint8_avx512_vnni.onnx -> avx512_vnni
+    stem = os.path.splitext(os.path.basename(file_name))[0]
+    return stem.split("qint8_", 1)[-1]
+
+
+def _load_onnx_int8(name: str, device: str):
+    from sentence_transformers import SentenceTransformer
+
+    model_kwargs = {"file_name": TEXT_EMBEDDING_ONNX_INT8_FILE}
+    try:
+        return SentenceTransformer(name, backend="onnx", device=device, model_kwargs=model_kwargs)
+    except (OSError, ValueError):
+        pass
+
+    # Not published with the model: export + quantize once, reuse afterwards
+    from sentence_transformers import export_dynamic_quantized_onnx_model
+
+    local = os.path.join(data_dir(), "models", f"{name.replace('/', '__')}-onnx")
+    if not os.path.exists(os.path.join(local, TEXT_EMBEDDING_ONNX_INT8_FILE)):
+        print(f"🔧 Exporting {name} to int8 ONNX ({local})...")
+        model = SentenceTransformer(name, backend="onnx", device=device)
+        model.save_pretrained(local)
+        export_dynamic_quantized_onnx_model(model, _onnx_int8_config(TEXT_EMBEDDING_ONNX_INT8_FILE), local)
+    return SentenceTransformer(local, backend="onnx", device=device, model_kwargs=model_kwargs)
+
+
+def load_text_model(
+    name: str = TEXT_EMBEDDING_MODEL,
+    backend: str = TEXT_EMBEDDING_BACKEND,
+    device: str | None = None,
+    torch_threads: int = 0,
+):
+    """A SentenceTransformer for `name` on `backend` (all expose .encode())."""
+
+    from sentence_transformers import SentenceTransformer
+
+    validate_backend(backend)
+    if torch_threads > 0:
+        import torch
+
+        torch.set_num_threads(torch_threads)
+
+    if backend == "torch":
+        return SentenceTransformer(name, device=device)
+    if backend == "torch-int8":
+        import torch
+
+        # Dynamic quantization is CPU-only
+        model = SentenceTransformer(name, device="cpu")
+        return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    if backend == "onnx":
+        return SentenceTransformer(name, backend="onnx", device=device)
+    return _load_onnx_int8(name, device or "cpu")
+
+
+def cosine_agreement(reference, candidate) -> dict[str, float]:
+    """Row-wise cosine similarity between two (n, dim) embedding matrices.
+
+    Compares a backend's vectors with the fp32 torch vectors of the same
+    texts: mean, min and 1st percentile (the worst 1% of plays).
+    """
+
+    import numpy as np
+
+    reference = np.asarray(reference, dtype=np.float32)
+    candidate = np.asarray(candidate, dtype=np.float32)
+    if reference.shape != candidate.shape:
+        raise ValueError(f"shape mismatch: {reference.shape} vs {candidate.shape}")
+    norms = np.linalg.norm(reference, axis=1) * np.linalg.norm(candidate, axis=1)
+    cosine = np.einsum("ij,ij->i", reference, candidate) / np.maximum(norms, 1e-12)
+    return {
+        "mean": float(cosine.mean()),
+        "min": float(cosine.min()),
+        "p01": float(np.percentile(cosine, 1)),
+    }
@@ -2,18 +2,28 @@ import torch
 from transformers import CLIPProcessor, CLIPModel
 from PIL import Image
 
+from src.processing.embedding_cache import CachedEmbedder, model_id
+
+CLIP_MODEL = "openai/clip-vit-base-patch32"
+
 # Load the model once (Global variable to avoid reloading it 100 times)
 print("🧠 Loading AI Model (CLIP)... this might take a minute...")
-model = CLIPModel.from_pretrained("openai/clip-vit-base-patch32", use_safetensors=True)
-processor = CLIPProcessor.from_pretrained("openai/clip-vit-base-patch32")
+model = CLIPModel.from_pretrained(CLIP_MODEL, use_safetensors=True)
+processor = CLIPProcessor.from_pretrained(CLIP_MODEL)
 
-def get_text_embedding(text):
-    """Converts a search query (e.g., 'aggressive defense') into numbers."""
+def _encode_text(text):
     inputs = processor(text=[text], return_tensors="pt", padding=True)
     with torch.no_grad():
         text_features = model.get_text_features(**inputs)
     return text_features[0].tolist() # Convert tensor to standard list
 
+# Text queries repeat a lot; cache them per model revision (shared with the play search cache)
+_text_embedder = CachedEmbedder(model_id(CLIP_MODEL, getattr(model.config, "_commit_hash", None)), _encode_text)
+
+def get_text_embedding(text):
+    """Converts a search query (e.g., 'aggressive defense') into numbers."""
+    return _text_embedder(text)
+
 def get_image_embedding(image_path_or_url):
     """Converts an image into numbers."""
     if isinstance(image_path_or_url, str):
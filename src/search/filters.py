@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass, field
+from typing import Any
+
+from src.processing.tag_index import tag_filter_sql, validate_tags
+
+
+@dataclass
+class PlayFilters:
+    """Structured filters shared by the search backends.
+
+    clock_min / clock_max bound plays.clock_seconds (inclusive); tags must
+    all be present and exclude_tags must all be absent (see tag_index).
+    """
+
+    season_id: str | None = None
+    game_id: str | None = None
+    team_id: str | None = None
+    period: int | None = None
+    clock_min: int | None = None
+    clock_max: int | None = None
+    tags: list[str] = field(default_factory=list)
+    exclude_tags: list[str] = field(default_factory=list)
+
+    def __post_init__(self):
+        self.tags = validate_tags(self.tags)
+        self.exclude_tags = validate_tags(self.exclude_tags)
+
+    @classmethod
+    def coerce(cls, filters: PlayFilters | dict[str, Any] | None) -> PlayFilters:
+        if filters is None:
+            return cls()
+        if isinstance(filters, cls):
+            return filters
+        return cls(**filters)
+
+    def is_empty(self) -> bool:
+        return not any(asdict(self).values())
+
+    def sql(
+        self,
+        alias: str = "p",
+        tag_driver: str | None = None,
+        correlated: bool = False,
+    ) -> tuple[list[str], list]:
+        """WHERE clauses (to AND together) and params against plays aliased `alias`.
+
+        By default tag filters are `play_id IN (<tag range>)`, which lets
+        SQLite drive the query from play_tags. Pass correlated=True when
+        another index drives it (e.g. FTS matches): tags are then checked
+        with one play_tags lookup per row instead of materializing the range.
+        """
+
+        clauses: list[str] = []
+        params: list = []
+        if self.season_id is not None:
+            clauses.append(f"{alias}.game_id IN (SELECT game_id FROM games WHERE season_id = ?)")
+            params.append(self.season_id)
+        for column in ("game_id", "team_id", "period"):
+            value = getattr(self, column)
+            if value is not None:
+                clauses.append(f"{alias}.{column} = ?")
+                params.append(value)
+        if self.clock_min is not None:
+            clauses.append(f"{alias}.clock_seconds >= ?")
+            params.append(self.clock_min)
+        if self.clock_max is not None:
+            clauses.append(f"{alias}.clock_seconds <= ?")
+            params.append(self.clock_max)
+        if self.tags and not correlated:
+            tag_sql, tag_params = tag_filter_sql(self.tags, self.exclude_tags, driver=tag_driver)
+            clauses.append(f"{alias}.play_id IN ({tag_sql})")
+            params.extend(tag_params)
+        elif self.tags:
+            tag_sql, tag_params = tag_filter_sql(self.tags, self.exclude_tags, driver=tag_driver)
+            clauses.append(f"EXISTS ({tag_sql} AND play_id = {alias}.play_id)")
+            params.extend(tag_params)
+        elif self.exclude_tags:
+            clauses.append(
+                f"NOT EXISTS (SELECT 1 FROM play_tags WHERE play_id = {alias}.play_id AND tag IN "
+                f"({','.join('?' * len(self.exclude_tags))}))"
+            )
+            params.extend(self.exclude_tags)
+        return clauses, params
+
+    def chroma_where(self) -> dict[str, Any] | None:
+        """Equivalent Chroma `where` filter over the play metadata written by
+        generate_embeddings (season_id, game_id, team_id, period,
+        clock_seconds and tag_<tag> flags), or None when there are no filters.
+        """
+
+        conditions: list[dict[str, Any]] = []
+        for key in ("season_id", "game_id", "team_id", "period"):
+            value = getattr(self, key)
+            if value is not None:
+                conditions.append({key: value})
+        if self.clock_min is not None:
+            conditions.append({"clock_seconds": {"$gte": self.clock_min}})
+        if self.clock_max is not None:
+            conditions.append({"clock_seconds": {"$lte": self.clock_max}})
+        conditions.extend({f"tag_{tag}": True} for tag in self.tags)
+        conditions.extend({f"tag_{tag}": False} for tag in self.exclude_tags)
+
+        if not conditions:
+            return None
+        if len(conditions) == 1:
+            return conditions[0]
+        return {"$and": conditions}
@@ -0,0 +1,183 @@
+"""Hybrid keyword + vector play search.
+
+Runs the FTS5/BM25 keyword search (src/search/keyword.py) and the Chroma
+similarity query concurrently, then merges the two ranked lists with
+reciprocal rank fusion:
+
+    score(play) = sum over lists of weight / (RRF_K + rank in that list)
+
+Structured filters are applied inside both backends (SQL WHERE clauses and
+a Chroma `where` filter), so each backend only ranks eligible plays instead
+of filtering its top-k afterwards.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+from src.processing.embedding_cache import CachedEmbedder, EmbeddingCache, text_model_id
+from src.processing.text_backends import load_text_model
+from src.search.filters import PlayFilters
+from src.search.keyword import keyword_search
+from src.search.vector_store import open_collection
+
+VECTOR_DB_PATH = os.path.join(os.getcwd(), "data/vector_db")
+PLAYS_COLLECTION = "skout_plays"
+
+# Standard RRF constant; larger values flatten the rank contribution.
+RRF_K = 60
+# Plays fetched from each backend before fusion (at least one page more
+# than requested).
+DEFAULT_CANDIDATES = 100
+
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="hybrid-search")
+
+
+def plays_collection(path: str = VECTOR_DB_PATH):
+    """The plays collection on the configured vector store (VECTOR_STORE_BACKEND)."""
+    return open_collection(PLAYS_COLLECTION, path, create=False)
+
+
+def text_query_embedder(cache: EmbeddingCache | None = None) -> CachedEmbedder:
+    """Cached query embedder for the plays collection.
+
+    Uses TEXT_EMBEDDING_MODEL on TEXT_EMBEDDING_BACKEND, the model
+    generate_embeddings indexes with. The model is only loaded on the first
+    cache miss.
+    """
+
+    model = None
+    lock = threading.Lock()
+
+    def encode(text: str) -> list[float]:
+        nonlocal model
+        with lock:
+            if model is None:
+                model = load_text_model()
+        return model.encode(text).tolist()
+
+    return CachedEmbedder(text_model_id(), encode, cache)
+
+
+def vector_search(
+    collection,
+    query: str,
+    filters: PlayFilters,
+    limit: int,
+    embed: Callable[[str], list[float]] | None = None,
+) -> list[dict[str, Any]]:
+    """Nearest plays to `query` in the Chroma collection, most similar first.
+
+    `embed` turns the query into a vector; by default Chroma embeds the text
+    with the collection's embedding function.
+    """
+
+    query_args: dict[str, Any] = {"n_results": limit, "where": filters.chroma_where()}
+    if embed is None:
+        query_args["query_texts"] = [query]
+    else:
+        query_args["query_embeddings"] = [embed(query)]
+    results = collection.query(**query_args)
+
+    hits = []
+    for play_id, meta, distance in zip(
+        results["ids"][0], results["metadatas"][0], results["distances"][0], strict=True
+    ):
+        meta = meta or {}
+        hits.append(
+            {
+                "play_id": play_id,
+                "game_id": meta.get("game_id"),
+                "period": meta.get("period"),
+                "clock_seconds": meta.get("clock_seconds"),
+                "clock_display": meta.get("clock"),
+                "description": meta.get("original_desc"),
+                "tags": meta.get("tags"),
+                "team_id": meta.get("team_id"),
+                "distance": distance,
+            }
+        )
+    return hits
+
+
+def reciprocal_rank_fusion(
+    ranked_lists: dict[str, list[dict[str, Any]]],
+    weights: dict[str, float] | None = None,
+    k: int = RRF_K,
+) -> list[dict[str, Any]]:
+    """Fuse ranked result lists (name -> hits, best first) keyed by play_id.
+
+    Each fused hit keeps the first-seen play fields and gains `score` plus a
+    `<name>_rank` (1-based, None when absent) for every list.
+    """
+
+    weights = weights or {}
+    fused: dict[str, dict[str, Any]] = {}
+    for name, hits in ranked_lists.items():
+        weight = weights.get(name, 1.0)
+        for rank, hit in enumerate(hits, start=1):
+            entry = fused.get(hit["play_id"])
+            if entry is None:
+                entry = {**hit, "score": 0.0, **{f"{n}_rank": None for n in ranked_lists}}
+                entry.pop("distance", None)
+                fused[hit["play_id"]] = entry
+            for key, value in hit.items():
+                if key not in ("score", "distance") and entry.get(key) is None:
+                    entry[key] = value
+            entry["score"] += weight / (k + rank)
+            entry[f"{name}_rank"] = rank
+
+    return sorted(fused.values(), key=lambda e: e["score"], reverse=True)
+
+
+def hybrid_search(
+    query: str,
+    filters: PlayFilters | dict[str, Any] | None = None,
+    page: int = 1,
+    page_size: int = 20,
+    collection=None,
+    conn=None,
+    connect: Callable[[], Any] | None = None,
+    weights: dict[str, float] | None = None,
+    candidates: int = DEFAULT_CANDIDATES,
+    embed: Callable[[str], list[float]] | None = None,
+) -> dict[str, Any]:
+    """Ranked, paginated hybrid search.
+
+    weights: per-backend RRF weights, e.g. {"keyword": 1.0, "vector": 2.0}.
+    The keyword search runs on a worker thread: pass `connect`, a zero-arg
+    callable returning a SQLite connection owned by the calling thread (see
+    PlaySearcher), or a `conn` opened with check_same_thread=False. By
+    default it opens its own connection.
+
+    Returns {"results", "page", "page_size", "has_more"}; each result has the
+    play fields, the fused `score` and `keyword_rank` / `vector_rank`.
+    """
+
+    if page < 1:
+        raise ValueError("page must be >= 1")
+    filters = PlayFilters.coerce(filters)
+    collection = collection if collection is not None else plays_collection()
+    end = page * page_size
+    # One extra hit tells whether another page exists.
+    limit = max(candidates, end + 1)
+
+    def run_keyword():
+        return keyword_search(query, filters, limit, 0, connect() if connect else conn)
+
+    keyword_future = _executor.submit(run_keyword)
+    vector_future = _executor.submit(vector_search, collection, query, filters, limit, embed)
+    fused = reciprocal_rank_fusion(
+        {"keyword": keyword_future.result(), "vector": vector_future.result()},
+        weights=weights,
+    )
+
+    return {
+        "results": fused[end - page_size : end],
+        "page": page,
+        "page_size": page_size,
+        "has_more": len(fused) > end,
+    }
@@ -0,0 +1,120 @@
+"""Keyword / exact-phrase search over plays via the plays_fts FTS5 index.
+
+Complements the Chroma similarity search for lookups embeddings handle
+poorly ("and-one", "charge", "alley oop"). Results are ranked by FTS5's
+bm25() over every match, with description matches weighted above tag
+matches; SQLite does the ranking, filtering and paging in one query.
+"""
+
+from __future__ import annotations
+
+import re
+import unicodedata
+from dataclasses import dataclass
+from typing import Any
+
+from src.ingestion.db import connect_db
+from src.processing.tag_index import rarest_tag
+from src.search.filters import PlayFilters
+
+# bm25() column weights (description, tags).
+BM25_WEIGHTS = (1.0, 0.5)
+
+PLAY_COLUMNS = ("play_id", "game_id", "period", "clock_seconds", "clock_display", "description", "tags", "team_id")
+
+_TERM_RE = re.compile(r'"([^"]*)"|(\S+)')
+# unicode61 with tokenchars '_': runs of letters, digits and '_'
+_TOKEN_RE = re.compile(r"\w+")
+
+
+@dataclass(frozen=True)
+class Term:
+    tokens: tuple[str, ...]
+    prefix: bool = False
+
+    def fts(self) -> str:
+        return '"' + " ".join(self.tokens) + '"' + ("*" if self.prefix else "")
+
+
+def tokenize(text: str | None) -> list[str]:
+    """Python mirror of the plays_fts tokenizer (case and diacritics folded)."""
+    text = (text or "").lower()
+    if not text.isascii():
+        text = unicodedata.normalize("NFKD", text)
+        text = "".join(c for c in text if not unicodedata.combining(c))
+    return _TOKEN_RE.findall(text)
+
+
+def parse_query(text: str) -> list[Term]:
+    """Every word or "quoted phrase" becomes a Term; a trailing * on a word means prefix."""
+
+    terms = []
+    for phrase, word in _TERM_RE.findall(text or ""):
+        prefix = bool(word) and word.endswith("*")
+        tokens = tuple(tokenize(phrase or word))
+        if tokens:
+            terms.append(Term(tokens, prefix))
+    return terms
+
+
+def fts_query(text: str) -> str:
+    """Turn free text into a safe FTS5 query (all terms must match).
+
+    Punctuation in user input (and-one, 3-pt) never reaches the FTS5 query
+    parser as syntax.
+    """
+    return " ".join(term.fts() for term in parse_query(text))
+
+
+def keyword_search(
+    query: str,
+    filters: PlayFilters | dict[str, Any] | None = None,
+    limit: int = 20,
+    offset: int = 0,
+    conn=None,
+) -> list[dict[str, Any]]:
+    """BM25-ranked plays matching every term of `query` and `filters`.
+
+    Each result holds the play's columns plus `score` (higher is better).
+    Pass `conn` to reuse an open connection; otherwise one is opened for
+    the call.
+    """
+
+    match = fts_query(query)
+    if not match:
+        return []
+
+    filters = PlayFilters.coerce(filters)
+    columns = ", ".join(f"p.{c}" for c in PLAY_COLUMNS)
+    weights = ", ".join(str(w) for w in BM25_WEIGHTS)
+    own_conn = conn is None
+    conn = conn or connect_db()
+    try:
+        tag_driver = rarest_tag(conn, filters.tags) if len(filters.tags) > 1 else None
+        # The FTS index drives the query, so tags are checked per match
+        clauses, params = filters.sql("p", tag_driver=tag_driver, correlated=True)
+        # Rank rowids first and read play columns only for the page; plays is
+        # joined into the ranking query only when filters need its columns.
+        join = " JOIN plays p ON p.rowid = plays_fts.rowid" if clauses else ""
+        where = "".join(f" AND {clause}" for clause in clauses)
+        rows = conn.execute(
+            f"""
+            SELECT {columns}, ranked.bm25_rank
+            FROM (
+                SELECT plays_fts.rowid AS play_rowid, bm25(plays_fts, {weights}) AS bm25_rank
+                FROM plays_fts{join}
+                WHERE plays_fts MATCH ?{where}
+                ORDER BY bm25_rank
+                LIMIT ? OFFSET ?
+            ) AS ranked
+            JOIN plays p ON p.rowid = ranked.play_rowid
+            ORDER BY ranked.bm25_rank
+            """,
+            [match, *params, int(limit), int(offset)],
+        ).fetchall()
+    finally:
+        if own_conn:
+            conn.close()
+
+    # bm25() is lower-is-better; flip it so `score` reads like the other backends
+    return [{**dict(zip(PLAY_COLUMNS, row[:-1], strict=True)), "score": -row[-1]} for row in rows]
@@ -0,0 +1,154 @@
+"""Long-lived play search service.
+
+PlaySearcher keeps the Chroma client/collection and one SQLite connection
+per thread open across queries, and hydrates hits with game metadata
+(matchup, video path) using a cached map filled by a single IN (...) query
+per search, instead of one SELECT per hit. Query texts are embedded through
+the embedding cache (src/processing/embedding_cache.py).
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from typing import Any, Callable
+
+from src.ingestion.db import connect_db
+from src.search.filters import PlayFilters
+from src.search.hybrid import (
+    VECTOR_DB_PATH,
+    hybrid_search,
+    plays_collection,
+    text_query_embedder,
+    vector_search,
+)
+
+# Game rows are cached this long; link_local_videos can attach a video to
+# an existing game, so entries must not live forever.
+GAME_CACHE_TTL_S = 300.0
+
+
+class PlaySearcher:
+    def __init__(
+        self,
+        vector_db_path: str = VECTOR_DB_PATH,
+        db_path: str | None = None,
+        collection=None,
+        embed: Callable[[str], list[float]] | None = None,
+    ):
+        self.vector_db_path = vector_db_path
+        self.db_path = db_path
+        # Query embeddings go through the shared embedding cache, so repeated
+        # searches skip model inference.
+        self.embed = embed if embed is not None else text_query_embedder()
+        self._collection = collection
+        self._collection_lock = threading.Lock()
+        self._local = threading.local()
+        self._games: dict[str, dict[str, Any] | None] = {}
+        self._games_loaded_at = time.monotonic()
+        self._games_lock = threading.Lock()
+
+    # ----------------------------
+    # Resources
+    # ----------------------------
+
+    @property
+    def collection(self):
+        if self._collection is None:
+            with self._collection_lock:
+                if self._collection is None:
+                    self._collection = plays_collection(self.vector_db_path)
+        return self._collection
+
+    def connection(self):
+        """This thread's SQLite connection (opened on first use, then reused)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = connect_db(self.db_path)
+            self._local.conn = conn
+        return conn
+
+    def embedding_stats(self) -> dict[str, Any]:
+        """Query-embedding cache hit/miss counters ({} for a custom `embed`)."""
+        stats = getattr(self.embed, "stats", None)
+        return stats() if stats else {}
+
+    def refresh_games(self) -> None:
+        with self._games_lock:
+            self._games.clear()
+            self._games_loaded_at = time.monotonic()
+
+    # ----------------------------
+    # Search
+    # ----------------------------
+
+    def search(
+        self,
+        query: str,
+        n_results: int = 5,
+        filters: PlayFilters | dict[str, Any] | None = None,
+    ) -> list[dict[str, Any]]:
+        """Vector similarity search (what search_demo has always done), hydrated."""
+        hits = vector_search(self.collection, query, PlayFilters.coerce(filters), n_results, self.embed)
+        return self.hydrate(hits)
+
+    def hybrid(
+        self,
+        query: str,
+        filters: PlayFilters | dict[str, Any] | None = None,
+        page: int = 1,
+        page_size: int = 20,
+        **kwargs,
+    ) -> dict[str, Any]:
+        """hybrid_search() on the searcher's clients; results are hydrated."""
+        result = hybrid_search(
+            query,
+            filters,
+            page=page,
+            page_size=page_size,
+            collection=self.collection,
+            connect=self.connection,
+            embed=self.embed,
+            **kwargs,
+        )
+        result["results"] = self.hydrate(result["results"])
+        return result
+
+    # ----------------------------
+    # Hydration
+    # ----------------------------
+
+    def games(self, game_ids) -> dict[str, dict[str, Any] | None]:
+        """game_id -> {video_path, home_team, away_team} (None if unknown)."""
+
+        with self._games_lock:
+            if time.monotonic() - self._games_loaded_at > GAME_CACHE_TTL_S:
+                self._games.clear()
+                self._games_loaded_at = time.monotonic()
+            missing = [g for g in dict.fromkeys(game_ids) if g is not None and g not in self._games]
+
+        if missing:
+            rows = self.connection().execute(
+                """
+                SELECT game_id, video_path, home_team, away_team
+                FROM games
+                WHERE game_id IN (SELECT value FROM json_each(?))
+                """,
+                (json.dumps(missing),),
+            ).fetchall()
+            found = {
+                game_id: {"video_path": video_path, "home_team": home, "away_team": away}
+                for game_id, video_path, home, away in rows
+            }
+            with self._games_lock:
+                for game_id in missing:
+                    self._games[game_id] = found.get(game_id)
+
+        with self._games_lock:
+            return {g: self._games.get(g) for g in game_ids if g is not None}
+
+    def hydrate(self, hits: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """Attach each hit's game (or None) under "game"."""
+        games = self.games([hit.get("game_id") for hit in hits])
+        return [{**hit, "game": games.get(hit.get("game_id"))} for hit in hits]
@@ -0,0 +1,972 @@
+"""Pluggable vector stores for play, clip and metadata embeddings.
+
+open_collection() returns a collection for VECTOR_STORE_BACKEND:
+
+- chroma: a chromadb.PersistentClient collection (the default)
+- matrix: MatrixStore, an in-process store that keeps the embeddings in one
+  contiguous memory-mapped matrix and answers queries with batched dot
+  products (exact) or an HNSW graph (hnswlib, optional) once the
+  collection is large
+
+The matrix is stored as float32 (1.5 KB per 384-dim play), float16 (half)
+or int8 with one float32 scale per vector (about a quarter), set by
+VECTOR_STORE_DTYPE when the store is created. It is opened with mmap, so
+search processes (dashboard workers, CLI) read it zero-copy and share the
+OS page cache instead of each holding a private copy; only the chunk
+being scored is decoded to float32. scripts/check_vector_compression.py
+measures the recall@10 cost of each dtype.
+
+Both speak the subset of Chroma's collection API this code base uses (add /
+upsert / update / delete / get / query / count, same argument names, result
+shapes and distances), so callers do not care which one they got.
+CollectionWriter turns the ingestion scripts' one-record-at-a-time writes
+into batched upserts against either.
+
+MatrixStore keeps scalar metadata as columns: strings dictionary-encoded to
+int32 codes, numbers as float64, and every boolean field (the tag_<tag>
+flags) as one bit of a per-row uint64. A Chroma `where` filter becomes a
+boolean row bitmap built from vectorized column comparisons (cached per
+filter until the next write), and the search only scores rows in it.
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import threading
+from typing import Any, Iterable, Sequence
+
+from config.settings import (
+    VECTOR_STORE_BACKEND,
+    VECTOR_STORE_DTYPE,
+    VECTOR_STORE_EXACT_MAX,
+    VECTOR_STORE_HNSW_EF,
+    VECTOR_STORE_HNSW_MIN,
+    VECTOR_WRITE_BATCH_SIZE,
+)
+from src.ingestion.db import connect_db
+
+VECTOR_STORE_BACKENDS = ("chroma", "matrix")
+VECTOR_DTYPES = ("float32", "float16", "int8")
+
+# Rows scored per top-k pass in exact search (bounds the distance arrays)
+EXACT_CHUNK_ROWS = 262_144
+# Rows gathered or decoded to float32 at a time; float16/int8 rows are never
+# expanded to float32 beyond one tile (a few MB), also at query time.
+DECODE_TILE_ROWS = 4096
+# Filter bitmaps kept between writes
+MASK_CACHE_SIZE = 64
+MAX_BOOL_FIELDS = 64
+
+
+def open_collection(name: str, path: str, backend: str = VECTOR_STORE_BACKEND, create: bool = True):
+    """The `name` collection under `path` on `backend`.
+
+    create=False raises if it does not exist (Chroma's get_collection).
+    """
+
+    if backend == "chroma":
+        import chromadb
+
+        client = chromadb.PersistentClient(path=path)
+        return client.get_or_create_collection(name=name) if create else client.get_collection(name=name)
+    if backend == "matrix":
+        store_path = os.path.join(path, "matrix", name)
+        if not create and not os.path.exists(os.path.join(store_path, "meta.db")):
+            raise ValueError(f"Collection {name} does not exist under {store_path}")
+        return MatrixStore(store_path, name=name)
+    raise ValueError(f"Unknown vector store backend {backend!r}; expected one of {list(VECTOR_STORE_BACKENDS)}")
+
+
+def copy_collection(source, target, batch_size: int = 1000) -> int:
+    """Copy every record (ids, embeddings, documents, metadatas) from one
+    collection to another, e.g. Chroma -> MatrixStore. Returns the count."""
+
+    copied = 0
+    while True:
+        page = source.get(limit=batch_size, offset=copied, include=["embeddings", "documents", "metadatas"])
+        if not len(page["ids"]):
+            return copied
+        target.upsert(
+            ids=list(page["ids"]),
+            embeddings=page["embeddings"],
+            documents=page["documents"],
+            metadatas=page["metadatas"],
+        )
+        copied += len(page["ids"])
+
+
+class CollectionWriter:
+    """Buffered writes to a collection: add() one record, upsert in batches.
+
+    Records are kept until `flush_size` are pending, then written with one
+    upsert (re-runs overwrite instead of failing on duplicate ids; a
+    repeated id within a batch keeps the last record). Pending records are
+    flushed by flush(), close(), leaving the `with` block, and at
+    interpreter exit. When a batch is rejected it is retried record by
+    record, so one malformed record costs only itself when skip_invalid is
+    set (otherwise its error is raised).
+    """
+
+    def __init__(self, collection, flush_size: int = VECTOR_WRITE_BATCH_SIZE, skip_invalid: bool = False):
+        self.collection = collection
+        self.flush_size = max(1, flush_size)
+        self.skip_invalid = skip_invalid
+        self.written = 0
+        self.skipped = 0
+        self._pending: dict[str, tuple[Any, Any, Any]] = {}
+        self._fields: tuple[bool, bool, bool] | None = None
+        self._lock = threading.Lock()
+        atexit.register(self.flush)
+
+    def add(self, id: str, document=None, metadata=None, embedding=None) -> None:
+        fields = (document is not None, metadata is not None, embedding is not None)
+        with self._lock:
+            # One upsert needs the same fields for every record
+            if self._fields is not None and fields != self._fields:
+                self._flush()
+            self._fields = fields
+            self._pending.pop(id, None)
+            self._pending[id] = (document, metadata, embedding)
+            if len(self._pending) >= self.flush_size:
+                self._flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush()
+
+    def _flush(self) -> None:
+        if not self._pending:
+            return
+        records, self._pending = self._pending, {}
+        try:
+            self._upsert(list(records.items()))
+        except Exception:
+            for record in records.items():
+                try:
+                    self._upsert([record])
+                except Exception as e:
+                    if not self.skip_invalid:
+                        raise
+                    self.skipped += 1
+                    print(f"⚠️  Skipped {record[0]}: {e}")
+
+    def _upsert(self, records: list[tuple[str, tuple[Any, Any, Any]]]) -> None:
+        has_document, has_metadata, has_embedding = self._fields
+        self.collection.upsert(
+            ids=[id for id, _ in records],
+            documents=[record[0] for _, record in records] if has_document else None,
+            metadatas=[record[1] for _, record in records] if has_metadata else None,
+            embeddings=[record[2] for _, record in records] if has_embedding else None,
+        )
+        self.written += len(records)
+
+    def close(self) -> None:
+        self.flush()
+        atexit.unregister(self.flush)
+
+    def __enter__(self) -> CollectionWriter:
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
+class _StringColumn:
+    def __init__(self, capacity: int):
+        import numpy as np
+
+        self.codes = np.full(capacity, -1, dtype=np.int32)
+        self.values: list[Any] = []
+        self.lookup: dict[Any, int] = {}
+
+    def code(self, value, add: bool = False) -> int:
+        code = self.lookup.get(value)
+        if code is None:
+            if not add:
+                return -2  # matches nothing
+            code = self.lookup[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+class MatrixStore:
+    """Memory-mapped embedding matrix with metadata columns and optional HNSW.
+
+    Files under `path`: meta.db (SQLite: id, document and metadata JSON per
+    row slot), vectors.npy (the matrix), scales.npy (int8 only: per-row
+    scales), columns.npz / columns.json (column snapshot) and hnsw.bin /
+    hnsw.json (the graph). Every write bumps a
+    generation counter in meta.db; readers in other processes reload when
+    it moves, and snapshots or graphs from an older generation are never
+    used (columns are rebuilt from meta.db, search falls back to exact).
+    Call persist() after a batch of writes to save the snapshot and graph.
+
+    Deleted rows keep their slot (masked out) until compact().
+    """
+
+    def __init__(
+        self,
+        path: str,
+        name: str | None = None,
+        dtype: str = VECTOR_STORE_DTYPE,
+        space: str = "l2",
+        hnsw_min: int = VECTOR_STORE_HNSW_MIN,
+        exact_max: int = VECTOR_STORE_EXACT_MAX,
+        hnsw_ef: int = VECTOR_STORE_HNSW_EF,
+    ):
+        if space not in ("l2", "cosine", "ip"):
+            raise ValueError(f"Unknown space {space!r}; expected l2, cosine or ip")
+        if dtype not in VECTOR_DTYPES:
+            raise ValueError(f"Unknown dtype {dtype!r}; expected one of {list(VECTOR_DTYPES)}")
+        self.path = path
+        self.name = name or os.path.basename(path)
+        self.hnsw_min = hnsw_min
+        self.exact_max = exact_max
+        self.hnsw_ef = hnsw_ef
+
+        os.makedirs(path, exist_ok=True)
+        self._lock = threading.RLock()
+        self._conn = connect_db(os.path.join(path, "meta.db"), check_same_thread=False)
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS items (
+                idx INTEGER PRIMARY KEY,
+                id TEXT NOT NULL UNIQUE,
+                document TEXT,
+                metadata TEXT
+            );
+            CREATE TABLE IF NOT EXISTS info (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            );
+            """
+        )
+        # Settings of an existing store win over constructor arguments
+        self.dtype = self._info("dtype") or dtype
+        self.space = self._info("space") or space
+        self._set_info("dtype", self.dtype)
+        self._set_info("space", self.space)
+        self._conn.commit()
+        self._load()
+
+    # ----------------------------
+    # State
+    # ----------------------------
+
+    def _info(self, key: str) -> str | None:
+        row = self._conn.execute("SELECT value FROM info WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_info(self, key: str, value) -> None:
+        self._conn.execute(
+            "INSERT INTO info (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (key, str(value)),
+        )
+
+    def _generation(self) -> int:
+        return int(self._info("generation") or 0)
+
+    def _load(self) -> None:
+        """(Re)load vectors, columns and graph for the current generation."""
+        import numpy as np
+
+        self.generation = self._generation()
+        self.dim = int(self._info("dim") or 0) or None
+        self.rows = int(self._info("rows") or 0)
+        self._masks: dict[str, Any] = {}
+        self._hnsw = None
+        self._hnsw_checked = False
+
+        vectors_path = os.path.join(self.path, "vectors.npy")
+        if self.dim and os.path.exists(vectors_path):
+            self._vectors = np.load(vectors_path, mmap_mode="r+")
+        else:
+            self._vectors = None
+        self._scales = None
+        if self._vectors is not None and self.dtype == "int8":
+            self._scales = np.load(os.path.join(self.path, "scales.npy"), mmap_mode="r+")
+        capacity = len(self._vectors) if self._vectors is not None else 0
+        if not self._load_columns(capacity):
+            self._rebuild_columns(capacity)
+
+    def _refresh(self) -> None:
+        # Another process (or connection) wrote since we loaded
+        if self._generation() != self.generation:
+            self._load()
+
+    def _bump(self) -> None:
+        self.generation += 1
+        self._set_info("generation", self.generation)
+        self._set_info("rows", self.rows)
+        self._masks.clear()
+
+    # ----------------------------
+    # Columns
+    # ----------------------------
+
+    def _empty_columns(self, capacity: int) -> None:
+        import numpy as np
+
+        self._live = np.zeros(capacity, dtype=bool)
+        self._norms = np.zeros(capacity, dtype=np.float32)
+        self._strings: dict[str, _StringColumn] = {}
+        self._numbers: dict[str, Any] = {}
+        self._bool_bits: dict[str, int] = {}
+        self._bool_set = np.zeros(capacity, dtype=np.uint64)
+        self._bool_value = np.zeros(capacity, dtype=np.uint64)
+
+    def _grow_columns(self, capacity: int) -> None:
+        import numpy as np
+
+        def grow(array, fill):
+            grown = np.full(capacity, fill, dtype=array.dtype)
+            grown[: len(array)] = array
+            return grown
+
+        self._live = grow(self._live, False)
+        self._norms = grow(self._norms, 0)
+        self._bool_set = grow(self._bool_set, 0)
+        self._bool_value = grow(self._bool_value, 0)
+        for column in self._strings.values():
+            column.codes = grow(column.codes, -1)
+        for key, values in self._numbers.items():
+            self._numbers[key] = grow(values, np.nan)
+
+    def _clear_row_columns(self, idx: int) -> None:
+        import numpy as np
+
+        self._bool_set[idx] = 0
+        self._bool_value[idx] = 0
+        for column in self._strings.values():
+            column.codes[idx] = -1
+        for values in self._numbers.values():
+            values[idx] = np.nan
+
+    def _set_row_columns(self, idx: int, metadata: dict | None) -> None:
+        import numpy as np
+
+        self._clear_row_columns(idx)
+        for key, value in (metadata or {}).items():
+            if isinstance(value, bool):
+                bit = self._bool_bits.get(key)
+                if bit is None:
+                    if len(self._bool_bits) >= MAX_BOOL_FIELDS:
+                        continue  # still stored in meta.db, just not filterable
+                    bit = self._bool_bits[key] = len(self._bool_bits)
+                mask = np.uint64(1 << bit)
+                self._bool_set[idx] |= mask
+                if value:
+                    self._bool_value[idx] |= mask
+            elif isinstance(value, (int, float)):
+                values = self._numbers.get(key)
+                if values is None:
+                    values = self._numbers[key] = np.full(len(self._live), np.nan)
+                values[idx] = value
+            elif isinstance(value, str):
+                column = self._strings.get(key)
+                if column is None:
+                    column = self._strings[key] = _StringColumn(len(self._live))
+                column.codes[idx] = column.code(value, add=True)
+
+    def _rebuild_columns(self, capacity: int) -> None:
+        import numpy as np
+
+        self._empty_columns(capacity)
+        if not capacity:
+            return
+        cursor = self._conn.execute("SELECT idx, metadata FROM items")
+        while True:
+            chunk = cursor.fetchmany(10_000)
+            if not chunk:
+                break
+            for idx, metadata in chunk:
+                self._live[idx] = True
+                self._set_row_columns(idx, json.loads(metadata) if metadata else None)
+        for start in range(0, self.rows, DECODE_TILE_ROWS):
+            block = self._block(slice(start, min(start + DECODE_TILE_ROWS, self.rows)))
+            self._norms[start : start + len(block)] = np.linalg.norm(block, axis=1)
+
+    def _save_columns(self) -> None:
+        import numpy as np
+
+        arrays = {
+            "live": self._live,
+            "norms": self._norms,
+            "bool_set": self._bool_set,
+            "bool_value": self._bool_value,
+        }
+        arrays.update({f"s:{key}": column.codes for key, column in self._strings.items()})
+        arrays.update({f"n:{key}": values for key, values in self._numbers.items()})
+        tmp = os.path.join(self.path, "columns.tmp.npz")
+        np.savez(tmp, **arrays)
+        os.replace(tmp, os.path.join(self.path, "columns.npz"))
+        header = {
+            "generation": self.generation,
+            "bool_bits": self._bool_bits,
+            "strings": {key: column.values for key, column in self._strings.items()},
+        }
+        with open(os.path.join(self.path, "columns.json"), "w") as f:
+            json.dump(header, f)
+
+    def _load_columns(self, capacity: int) -> bool:
+        import numpy as np
+
+        header_path = os.path.join(self.path, "columns.json")
+        arrays_path = os.path.join(self.path, "columns.npz")
+        if not capacity or not os.path.exists(header_path) or not os.path.exists(arrays_path):
+            return False
+        with open(header_path) as f:
+            header = json.load(f)
+        if header.get("generation") != self.generation:
+            return False
+
+        self._empty_columns(0)
+        with np.load(arrays_path) as arrays:
+            if len(arrays["live"]) != capacity:
+                return False
+            self._live = arrays["live"]
+            self._norms = arrays["norms"]
+            self._bool_set = arrays["bool_set"]
+            self._bool_value = arrays["bool_value"]
+            self._bool_bits = header["bool_bits"]
+            for key, values in header["strings"].items():
+                column = _StringColumn(0)
+                column.codes = arrays[f"s:{key}"]
+                column.values = values
+                column.lookup = {value: code for code, value in enumerate(values)}
+                self._strings[key] = column
+            for name in arrays.files:
+                if name.startswith("n:"):
+                    self._numbers[name[2:]] = arrays[name]
+        return True
+
+    # ----------------------------
+    # Vectors
+    # ----------------------------
+
+    def _ensure_capacity(self, needed: int, dim: int) -> None:
+        import numpy as np
+
+        if self.dim is None:
+            self.dim = dim
+            self._set_info("dim", dim)
+        elif dim != self.dim:
+            raise ValueError(f"Embedding dimension {dim} does not match collection dimensionality {self.dim}")
+
+        capacity = len(self._vectors) if self._vectors is not None else 0
+        if needed <= capacity:
+            return
+        new_capacity = max(1024, needed, capacity * 2)
+        self._vectors = self._grow_file("vectors", self._vectors, self.dtype, (new_capacity, self.dim))
+        if self.dtype == "int8":
+            self._scales = self._grow_file("scales", self._scales, np.float32, (new_capacity,))
+        self._grow_columns(new_capacity)
+        if self._hnsw is not None:
+            self._hnsw.resize_index(new_capacity)
+
+    def _grow_file(self, name: str, array, dtype, shape: tuple[int, ...]):
+        """Copy `array` into a larger .npy memmap and swap it in."""
+        import numpy as np
+
+        path = os.path.join(self.path, f"{name}.npy")
+        tmp = os.path.join(self.path, f"{name}.tmp.npy")
+        grown = np.lib.format.open_memmap(tmp, mode="w+", dtype=dtype, shape=shape)
+        capacity = len(array) if array is not None else 0
+        for start in range(0, capacity, EXACT_CHUNK_ROWS):
+            stop = min(start + EXACT_CHUNK_ROWS, capacity)
+            grown[start:stop] = array[start:stop]
+        grown.flush()
+        del grown, array
+        os.replace(tmp, path)
+        return np.load(path, mmap_mode="r+")
+
+    def _encode(self, matrix) -> tuple[Any, Any]:
+        """float32 rows -> (stored rows, per-row scales or None) for self.dtype.
+
+        int8 is symmetric per vector: scale = max|x| / 127, x ~ q * scale.
+        """
+        import numpy as np
+
+        if self.dtype != "int8":
+            return matrix.astype(self.dtype), None
+        scales = (np.abs(matrix).max(axis=1) / 127).astype(np.float32)
+        quantized = np.rint(matrix / np.maximum(scales, 1e-12)[:, None]).clip(-127, 127).astype(np.int8)
+        return quantized, scales
+
+    def _block(self, rows) -> Any:
+        """Stored rows (a slice or slot array) decoded to float32."""
+        import numpy as np
+
+        block = np.asarray(self._vectors[rows], dtype=np.float32)
+        if self._scales is not None:
+            block *= self._scales[rows][:, None]
+        return block
+
+    def _as_matrix(self, embeddings):
+        import numpy as np
+
+        matrix = np.asarray(embeddings, dtype=np.float32)
+        if matrix.ndim == 1:
+            matrix = matrix.reshape(1, -1)
+        return matrix
+
+    # ----------------------------
+    # Writes (Chroma collection API)
+    # ----------------------------
+
+    def add(self, ids, embeddings=None, metadatas=None, documents=None, **_) -> None:
+        self.upsert(ids=ids, embeddings=embeddings, metadatas=metadatas, documents=documents)
+
+    def upsert(self, ids, embeddings=None, metadatas=None, documents=None, **_) -> None:
+        self._write(ids, embeddings, metadatas, documents, insert=True)
+
+    def update(self, ids, embeddings=None, metadatas=None, documents=None, **_) -> None:
+        self._write(ids, embeddings, metadatas, documents, insert=False)
+
+    def _existing(self, ids: Sequence[str]) -> dict[str, tuple[int, str | None, str | None]]:
+        rows = self._conn.execute(
+            "SELECT id, idx, document, metadata FROM items WHERE id IN (SELECT value FROM json_each(?))",
+            (json.dumps(list(ids)),),
+        ).fetchall()
+        return {row[0]: row[1:] for row in rows}
+
+    def _write(self, ids, embeddings, metadatas, documents, insert: bool) -> None:
+        import numpy as np
+
+        ids = list(ids)
+        if not ids:
+            return
+        matrix = self._as_matrix(embeddings) if embeddings is not None else None
+        for name, values in (("embeddings", matrix), ("metadatas", metadatas), ("documents", documents)):
+            if values is not None and len(values) != len(ids):
+                raise ValueError(f"Got {len(values)} {name} for {len(ids)} ids")
+
+        with self._lock:
+            self._refresh()
+            existing = self._existing(ids)
+            new_ids = [play_id for play_id in dict.fromkeys(ids) if play_id not in existing]
+            if new_ids and not insert:
+                raise ValueError(f"Cannot update missing ids: {new_ids[:5]}")
+            if new_ids and matrix is None:
+                raise ValueError("MatrixStore cannot embed documents; pass embeddings")
+
+            slots = {play_id: (idx, document, metadata) for play_id, (idx, document, metadata) in existing.items()}
+            for play_id in new_ids:
+                slots[play_id] = (self.rows, None, None)
+                self.rows += 1
+            if matrix is not None:
+                self._ensure_capacity(self.rows, matrix.shape[1])
+
+            rows = []
+            changed = []
+            for i, play_id in enumerate(ids):
+                idx, old_document, old_metadata = slots[play_id]
+                # Chroma semantics: metadata keys merge into the existing ones, None deletes
+                metadata = json.loads(old_metadata) if old_metadata else {}
+                if metadatas is not None and metadatas[i] is not None:
+                    metadata.update(metadatas[i])
+                    metadata = {k: v for k, v in metadata.items() if v is not None}
+                document = documents[i] if documents is not None else old_document
+                rows.append((idx, play_id, document, json.dumps(metadata) if metadata else None))
+                self._live[idx] = True
+                self._set_row_columns(idx, metadata)
+                if matrix is not None:
+                    changed.append((idx, i))
+
+            if changed:
+                slots_idx = np.array([idx for idx, _ in changed])
+                stored, scales = self._encode(matrix[[i for _, i in changed]])
+                self._vectors[slots_idx] = stored
+                if scales is not None:
+                    self._scales[slots_idx] = scales
+                # Norms and the graph see the stored (rounded) vectors, like exact search
+                vectors = self._block(slots_idx)
+                self._norms[slots_idx] = np.linalg.norm(vectors, axis=1)
+                index = self._index()
+                if index is not None:
+                    index.add_items(vectors, slots_idx, replace_deleted=False)
+
+            self._conn.executemany(
+                """
+                INSERT INTO items (idx, id, document, metadata) VALUES (?, ?, ?, ?)
+                ON CONFLICT(idx) DO UPDATE SET document = excluded.document, metadata = excluded.metadata
+                """,
+                rows,
+            )
+            self._bump()
+            self._conn.commit()
+
+    def delete(self, ids=None, where=None, **_) -> None:
+        import numpy as np
+
+        with self._lock:
+            self._refresh()
+            if ids is not None:
+                existing = self._existing(ids)
+                doomed = [idx for idx, _, _ in existing.values()]
+            elif where is not None:
+                doomed = np.flatnonzero(self._mask(where)).tolist()
+            else:
+                return
+            if not doomed:
+                return
+            index = self._index()
+            for idx in doomed:
+                self._live[idx] = False
+                self._clear_row_columns(idx)
+                if index is not None:
+                    index.mark_deleted(idx)
+            self._conn.executemany("DELETE FROM items WHERE idx = ?", [(idx,) for idx in doomed])
+            self._bump()
+            self._conn.commit()
+
+    def persist(self, build_index: bool = True) -> None:
+        """Flush vectors and save the column snapshot and HNSW graph.
+
+        Builds the graph first when the store has reached hnsw_min vectors
+        and has none yet (writers keep an existing graph in sync).
+        """
+        with self._lock:
+            if build_index and self.count() >= self.hnsw_min and self._index() is None and self.build_index():
+                return
+            if self._vectors is not None:
+                self._vectors.flush()
+            if self._scales is not None:
+                self._scales.flush()
+            if self.rows:
+                self._save_columns()
+            if self._hnsw is not None:
+                self._hnsw.save_index(os.path.join(self.path, "hnsw.bin"))
+                with open(os.path.join(self.path, "hnsw.json"), "w") as f:
+                    json.dump({"generation": self.generation}, f)
+
+    def compact(self) -> None:
+        """Rewrite the store without deleted slots (renumbers rows, drops the graph)."""
+        import numpy as np
+
+        with self._lock:
+            self._refresh()
+            live = np.flatnonzero(self._live[: self.rows])
+            if len(live) == self.rows:
+                return
+            remap = {int(old): new for new, old in enumerate(live)}
+            # Move vectors down in order; new <= old, so nothing is overwritten early
+            for new, old in enumerate(live):
+                if new != old:
+                    self._vectors[new] = self._vectors[old]
+                    if self._scales is not None:
+                        self._scales[new] = self._scales[old]
+            items = self._conn.execute("SELECT idx, id, document, metadata FROM items ORDER BY idx").fetchall()
+            self._conn.execute("DELETE FROM items")
+            self._conn.executemany(
+                "INSERT INTO items (idx, id, document, metadata) VALUES (?, ?, ?, ?)",
+                [(remap[idx], play_id, document, metadata) for idx, play_id, document, metadata in items],
+            )
+            self.rows = len(live)
+            self._bump()
+            self._conn.commit()
+            for name in ("hnsw.bin", "hnsw.json"):
+                if os.path.exists(os.path.join(self.path, name)):
+                    os.remove(os.path.join(self.path, name))
+            self._load()
+            self.persist(build_index=False)
+
+    # ----------------------------
+    # HNSW
+    # ----------------------------
+
+    def _index(self):
+        """The HNSW graph if one exists for the current generation."""
+        if self._hnsw is not None or self._hnsw_checked:
+            return self._hnsw
+        self._hnsw_checked = True
+        header_path = os.path.join(self.path, "hnsw.json")
+        if not os.path.exists(header_path):
+            return None
+        with open(header_path) as f:
+            if json.load(f).get("generation") != self.generation:
+                return None  # stale: exact search until build_index()
+        try:
+            import hnswlib
+        except ImportError:
+            return None
+        index = hnswlib.Index(space=self.space, dim=self.dim)
+        index.load_index(os.path.join(self.path, "hnsw.bin"), max_elements=len(self._vectors))
+        index.set_ef(self.hnsw_ef)
+        self._hnsw = index
+        return index
+
+    def build_index(self, m: int = 16, ef_construction: int = 200, threads: int = -1) -> bool:
+        """Build (and persist) the HNSW graph; False when hnswlib is missing."""
+        import numpy as np
+
+        try:
+            import hnswlib
+        except ImportError:
+            return False
+        with self._lock:
+            self._refresh()
+            if not self.rows:
+                return False
+            index = hnswlib.Index(space=self.space, dim=self.dim)
+            index.init_index(max_elements=len(self._vectors), M=m, ef_construction=ef_construction)
+            for start in range(0, self.rows, EXACT_CHUNK_ROWS):
+                stop = min(start + EXACT_CHUNK_ROWS, self.rows)
+                labels = np.arange(start, stop)[self._live[start:stop]]
+                if len(labels):
+                    index.add_items(self._block(labels), labels, num_threads=threads)
+            index.set_ef(self.hnsw_ef)
+            self._hnsw = index
+            self._hnsw_checked = True
+            self.persist(build_index=False)
+        return True
+
+    # ----------------------------
+    # Filters
+    # ----------------------------
+
+    def _condition(self, key: str, condition) -> Any:
+        import numpy as np
+
+        n = self.rows
+        if isinstance(condition, dict):
+            if len(condition) != 1:
+                raise ValueError(f"Expected one operator for {key!r}, got {condition}")
+            op, value = next(iter(condition.items()))
+        else:
+            op, value = "$eq", condition
+
+        if key in self._bool_bits:
+            bit = np.uint64(1 << self._bool_bits[key])
+            present = (self._bool_set[:n] & bit) != 0
+            truth = (self._bool_value[:n] & bit) != 0
+            if op == "$eq":
+                return present & (truth == bool(value))
+            if op == "$ne":
+                return present & (truth != bool(value))
+            if op in ("$in", "$nin"):
+                wanted = {bool(v) for v in value}
+                hit = (truth & (True in wanted)) | (~truth & (False in wanted))
+                return present & (hit if op == "$in" else ~hit)
+            raise ValueError(f"Operator {op} is not supported for boolean field {key!r}")
+
+        if key in self._numbers:
+            values = self._numbers[key][:n]
+            with np.errstate(invalid="ignore"):
+                if op in ("$in", "$nin"):
+                    hit = np.isin(values, [float(v) for v in value])
+                    return hit if op == "$in" else ~hit & ~np.isnan(values)
+                compare = {
+                    "$eq": np.equal, "$ne": np.not_equal, "$gt": np.greater,
+                    "$gte": np.greater_equal, "$lt": np.less, "$lte": np.less_equal,
+                }.get(op)
+                if compare is None:
+                    raise ValueError(f"Unknown operator {op}")
+                return compare(values, value) & ~np.isnan(values)
+
+        if key in self._strings:
+            column = self._strings[key]
+            codes = column.codes[:n]
+            if op == "$eq":
+                return codes == column.code(value)
+            if op == "$ne":
+                return (codes >= 0) & (codes != column.code(value))
+            if op in ("$in", "$nin"):
+                hit = np.isin(codes, [column.code(v) for v in value])
+                return hit if op == "$in" else (codes >= 0) & ~hit
+            raise ValueError(f"Operator {op} is not supported for string field {key!r}")
+
+        # Field never seen: only negative operators could match, and Chroma
+        # requires the key to exist, so nothing does
+        return np.zeros(n, dtype=bool)
+
+    def _evaluate(self, where: dict) -> Any:
+        import numpy as np
+
+        masks = []
+        for key, condition in where.items():
+            if key == "$and":
+                masks.append(np.logical_and.reduce([self._evaluate(c) for c in condition]))
+            elif key == "$or":
+                masks.append(np.logical_or.reduce([self._evaluate(c) for c in condition]))
+            else:
+                masks.append(self._condition(key, condition))
+        return np.logical_and.reduce(masks) if len(masks) > 1 else masks[0]
+
+    def _mask(self, where: dict | None) -> Any:
+        """Bitmap of live rows matching `where` (cached until the next write)."""
+        if not where:
+            return self._live[: self.rows]
+        key = json.dumps(where, sort_keys=True)
+        mask = self._masks.get(key)
+        if mask is None:
+            mask = self._evaluate(where) & self._live[: self.rows]
+            if len(self._masks) >= MASK_CACHE_SIZE:
+                self._masks.pop(next(iter(self._masks)))
+            self._masks[key] = mask
+        return mask
+
+    # ----------------------------
+    # Reads (Chroma collection API)
+    # ----------------------------
+
+    def count(self) -> int:
+        with self._lock:
+            self._refresh()
+            return int(self._live[: self.rows].sum())
+
+    def _fetch(self, idxs: Sequence[int], include: Iterable[str]) -> dict[str, list]:
+        include = set(include)
+        rows = self._conn.execute(
+            "SELECT idx, id, document, metadata FROM items WHERE idx IN (SELECT value FROM json_each(?))",
+            (json.dumps([int(i) for i in idxs]),),
+        ).fetchall()
+        by_idx = {row[0]: row for row in rows}
+        found = [by_idx[int(i)] for i in idxs if int(i) in by_idx]
+        result: dict[str, list] = {"ids": [row[1] for row in found]}
+        if "documents" in include:
+            result["documents"] = [row[2] for row in found]
+        if "metadatas" in include:
+            result["metadatas"] = [json.loads(row[3]) if row[3] else None for row in found]
+        if "embeddings" in include:
+            result["embeddings"] = self._block([row[0] for row in found]) if found else []
+        return result
+
+    def get(self, ids=None, where=None, limit=None, offset=None, include=("metadatas", "documents"), **_) -> dict:
+        import numpy as np
+
+        with self._lock:
+            self._refresh()
+            if ids is not None:
+                existing = self._existing(ids)
+                idxs = [existing[i][0] for i in dict.fromkeys(ids) if i in existing]
+                if where:
+                    mask = self._mask(where)
+                    idxs = [i for i in idxs if mask[i]]
+            else:
+                idxs = np.flatnonzero(self._mask(where))
+            start = offset or 0
+            stop = start + limit if limit is not None else None
+            return self._fetch(list(idxs[start:stop]), include)
+
+    def _dots(self, queries, rows) -> Any:
+        """queries @ stored rows (a slice or slot array).T as float32.
+
+        A float32 slice is multiplied in place on the memmap. Otherwise rows
+        are gathered and decoded one DECODE_TILE_ROWS tile at a time into a
+        reused float32 buffer; int8 scales are applied to the dot products
+        rather than to the rows.
+        """
+        import numpy as np
+
+        contiguous = isinstance(rows, slice)
+        if contiguous and self._vectors.dtype == np.float32:
+            dots = queries @ self._vectors[rows].T
+        else:
+            view = self._vectors[rows] if contiguous else None
+            n_rows = len(view) if contiguous else len(rows)
+            dots = np.empty((len(queries), n_rows), dtype=np.float32)
+            tile = np.empty((min(DECODE_TILE_ROWS, n_rows), self.dim), dtype=np.float32)
+            for start in range(0, n_rows, DECODE_TILE_ROWS):
+                stop = min(start + DECODE_TILE_ROWS, n_rows)
+                part = view[start:stop] if contiguous else self._vectors[rows[start:stop]]
+                decoded = tile[: stop - start]
+                np.copyto(decoded, part, casting="unsafe")
+                np.matmul(queries, decoded.T, out=dots[:, start:stop])
+        if self._scales is not None:
+            dots *= self._scales[rows]
+        return dots
+
+    def _exact(self, queries, k: int, mask) -> tuple[Any, Any]:
+        """Top-k (distances, slots) per query over the rows set in `mask`."""
+        import numpy as np
+
+        n_queries = len(queries)
+        q_norms = np.linalg.norm(queries, axis=1)
+        best_d = np.full((n_queries, 0), np.inf, dtype=np.float32)
+        best_i = np.zeros((n_queries, 0), dtype=np.int64)
+
+        selected = np.flatnonzero(mask)
+        dense = len(selected) > self.rows // 4
+        blocks = range(0, self.rows if dense else len(selected), EXACT_CHUNK_ROWS)
+        for start in blocks:
+            if dense:
+                # Contiguous slice of the memmap (no gather), masked afterwards
+                stop = min(start + EXACT_CHUNK_ROWS, self.rows)
+                slots = np.arange(start, stop)
+                rows = slice(start, stop)
+                keep = mask[start:stop]
+            else:
+                slots = selected[start : start + EXACT_CHUNK_ROWS]
+                rows = slots
+                keep = None
+
+            dots = self._dots(queries, rows)
+            if self.space == "l2":
+                distances = self._norms[slots] ** 2 - 2 * dots + (q_norms**2)[:, None]
+            elif self.space == "cosine":
+                distances = 1 - dots / np.maximum(self._norms[slots][None, :] * q_norms[:, None], 1e-12)
+            else:
+                distances = 1 - dots
+            if keep is not None:
+                distances[:, ~keep] = np.inf
+
+            take = min(k, distances.shape[1])
+            part = np.argpartition(distances, take - 1, axis=1)[:, :take]
+            best_d = np.concatenate([best_d, np.take_along_axis(distances, part, axis=1)], axis=1)
+            best_i = np.concatenate([best_i, slots[part]], axis=1)
+            if best_d.shape[1] > k:
+                part = np.argpartition(best_d, k - 1, axis=1)[:, :k]
+                best_d = np.take_along_axis(best_d, part, axis=1)
+                best_i = np.take_along_axis(best_i, part, axis=1)
+
+        order = np.argsort(best_d, axis=1)
+        return np.take_along_axis(best_d, order, axis=1), np.take_along_axis(best_i, order, axis=1)
+
+    def query(
+        self,
+        query_embeddings=None,
+        n_results: int = 10,
+        where=None,
+        include=("metadatas", "documents", "distances"),
+        query_texts=None,
+        **_,
+    ) -> dict:
+        import numpy as np
+
+        if query_embeddings is None:
+            raise ValueError("MatrixStore cannot embed query_texts; pass query_embeddings")
+        queries = self._as_matrix(query_embeddings)
+        result: dict[str, list] = {"ids": []}
+        for name in include:
+            result[name] = []
+
+        with self._lock:
+            self._refresh()
+            mask = self._mask(where)
+            matches = int(mask.sum())
+            k = min(n_results, matches)
+            if k == 0:
+                for name in result:
+                    result[name] = [[] for _ in range(len(queries))]
+                return result
+
+            index = self._index() if matches > self.exact_max and self.rows >= self.hnsw_min else None
+            if index is not None:
+                filter_fn = None if not where else (lambda label: bool(mask[label]))
+                index.set_ef(max(self.hnsw_ef, k))
+                slots, distances = index.knn_query(queries, k=k, filter=filter_fn, num_threads=1 if filter_fn else -1)
+            else:
+                distances, slots = self._exact(queries, k, mask)
+
+            for row_slots, row_distances in zip(slots, distances, strict=True):
+                fetched = self._fetch(row_slots, include)
+                result["ids"].append(fetched["ids"])
+                for name in include:
+                    if name == "distances":
+                        result["distances"].append([float(d) for d in np.asarray(row_distances)[: len(fetched["ids"])]])
+                    else:
+                        result[name].append(fetched[name])
+        return result
@@ -1,47 +1,40 @@
 import os
-import chromadb
-import sqlite3
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+from src.search.searcher import PlaySearcher  # noqa: E402
 
 VECTOR_DB_PATH = os.path.join(os.getcwd(), "data/vector_db")
-DB_PATH = os.path.join(os.getcwd(), "data/skout.db")
-
-def search_plays(query, n_results=5):
-    # 1. Search the Vector DB
-    client = chromadb.PersistentClient(path=VECTOR_DB_PATH)
-    collection = client.get_collection(name="skout_plays")
-    
-    results = collection.query(
-        query_texts=[query],
-        n_results=n_results
-    )
-    
-    # 2. Correlate with SQL DB to get Video Path
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
+
+_searcher = None
+
+def get_searcher():
+    # One searcher per process: keeps the Chroma client and SQLite connection open
+    global _searcher
+    if _searcher is None:
+        _searcher = PlaySearcher(vector_db_path=VECTOR_DB_PATH)
+    return _searcher
+
+def search_plays(query, n_results=5, searcher=None):
+    # 1. Search the Vector DB, 2. correlate with the SQL DB for matchup + video path
+    results = (searcher or get_searcher()).search(query, n_results=n_results)
 
     print(f"\n🔍 Search Results for: '{query}'")
     print("-" * 50)
-    
-    for i, play_id in enumerate(results['ids'][0]):
-        desc = results['metadatas'][0][i]['original_desc']
-        tags = results['metadatas'][0][i]['tags']
-        clock = results['metadatas'][0][i]['clock']
-        game_id = results['metadatas'][0][i]['game_id']
-        
-        # Get Video Path
-        cursor.execute("SELECT video_path, home_team, away_team FROM games WHERE game_id = ?", (game_id,))
-        game_row = cursor.fetchone()
-        
-        if game_row:
-            v_path = os.path.basename(game_row[0]) if game_row[0] else "No Video"
-            matchup = f"{game_row[1]} vs {game_row[2]}"
+
+    for i, hit in enumerate(results):
+        game = hit["game"]
+        if game:
+            v_path = os.path.basename(game["video_path"]) if game["video_path"] else "No Video"
+            matchup = f"{game['home_team']} vs {game['away_team']}"
         else:
             v_path = "Unknown"
             matchup = "Unknown"
 
-        print(f"[{i+1}] {matchup} @ {clock}")
-        print(f"    Play: {desc}")
-        print(f"    Tags: [{tags}]")
+        print(f"[{i+1}] {matchup} @ {hit['clock_display']}")
+        print(f"    Play: {hit['description']}")
+        print(f"    Tags: [{hit['tags']}]")
         print(f"    File: {v_path}")
         print("")
 
@@ -1,10 +1,13 @@
-import sqlite3
 import os
+import sys
 
-DB_PATH = os.path.join(os.getcwd(), "data/skout.db")
+# Add project root to PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.ingestion.db import connect_db  # noqa: E402
 
 def list_teams():
-    conn = sqlite3.connect(DB_PATH)
+    conn = connect_db()
     cursor = conn.cursor()
     
     # Get all unique home and away teams